@@ -6,7 +6,67 @@ class Settings(BaseSettings):
     max_upload_bytes: int = 25 * 1024 * 1024
     max_preview_rows: int = 20
     max_numeric_cols_for_corr: int = 12
+    # Strongest column pairs reported, searched across all numeric columns
+    correlation_top_k: int = 10
     use_pyarrow: bool = True
+    analysis_engine: str = "pandas"  # "pandas" or "arrow"
+    # With the Arrow engine, answer Parquet row/null counts and min/max from the footer
+    parquet_metadata_fast_path: bool = True
+    worker_pool_kind: str = "thread"  # "thread" or "process"
+    worker_pool_size: int = 4
+    max_in_flight_analyses: int = 8
+    worker_retry_after_seconds: int = 1
+    # Processes per analysis for sharding the columns of wide tables (0 or 1 disables)
+    shard_workers: int = 0
+    shard_min_columns: int = 512
+    # "exact" quantiles (one partition pass) or "sketch" (mergeable sketches within quantile_error rank error)
+    quantile_mode: str = "exact"
+    quantile_error: float = 0.005
+    # Sampled analysis: rows sampled, and the estimated row count at which uploads are sampled
+    # automatically when the request does not choose a mode (0 disables)
+    sample_rows: int = 100_000
+    sample_row_threshold: int = 5_000_000
+    # Narrow integer columns and dictionary-encode repetitive strings after parsing (pandas engine)
+    optimize_memory: bool = True
+    # Whole CSV/TSV parsing: "pandas" (C parser, one thread) or "pyarrow" (pyarrow.csv, parallel blocks);
+    # pyarrow's block size and CPU pool (0 keeps its default), and leading rows that fix column types (0: all)
+    csv_engine: str = "pandas"
+    csv_block_bytes: int = 1024 * 1024
+    csv_threads: int = 0
+    csv_infer_rows: int = 0
+    # CSV/TSV uploads at or above this size are analyzed in streaming mode
+    streaming_threshold_bytes: int = 25 * 1024 * 1024
+    max_streaming_upload_bytes: int = 4 * 1024 * 1024 * 1024
+    stream_block_bytes: int = 4 * 1024 * 1024
+    upload_chunk_bytes: int = 1024 * 1024
+    # Result cache: in-process LRU (0 disables) and optional on-disk tier
+    result_cache_max_bytes: int = 64 * 1024 * 1024
+    result_cache_dir: str = ""
+    result_cache_disk_max_bytes: int = 1024 * 1024 * 1024
+    # Incremental re-analysis (/v1/analyze/datasets): states kept in memory, optional on-disk copy
+    dataset_state_max_entries: int = 256
+    dataset_state_dir: str = ""
+    # Dataset profiles (/v1/analyze/profiles): SQLite database and Parquet row copies (default: a temp
+    # directory), rows kept per profile, highest-variance columns and strongest pairs kept for re-analysis,
+    # and the largest page of rows served
+    profile_dir: str = ""
+    profile_sample_rows: int = 100_000
+    profile_correlation_columns: int = 256
+    profile_top_correlations: int = 100
+    profile_page_max_rows: int = 1000
+    # "orjson" encodes trusted results directly; "pydantic" validates through AnalyzeResponse first
+    response_encoder: str = "orjson"
+    # Responses at least this large are gzip/brotli-compressed when the client accepts it
+    compression_min_bytes: int = 1024
+    # Send the per-stage breakdown of each analysis in an X-Analytica-Timing header
+    timing_header: bool = False
+    # Batch analysis (/v1/analyze/batch): files per batch, uploaded or unpacked from archives, and their total bytes
+    batch_max_files: int = 64
+    batch_max_bytes: int = 4 * 1024 * 1024 * 1024
+    # Background analysis jobs (/v1/analyze/jobs)
+    job_max_concurrent: int = 2
+    job_max_pending: int = 16
+    job_ttl_seconds: int = 3600
 
     model_config = SettingsConfigDict(env_prefix="", case_sensitive=False)
 
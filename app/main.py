@@ -1,11 +1,30 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import pyarrow as pa
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
 from .routers import analyze
+from .services.analyzer import shutdown_shard_executors
+from .services.jobs import job_store
+from .services.metrics import analysis_metrics
+from .services.worker_pool import worker_pool
 from .utils.errors import install_exception_handlers
+from .utils.limits import UploadLimitMiddleware
 
-app = FastAPI(title="Analytica API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if settings.csv_threads > 1:
+        # pyarrow's CPU pool is process-wide (forked analysis workers inherit it), so it is sized once
+        pa.set_cpu_count(settings.csv_threads)
+    yield
+    job_store.shutdown()
+    worker_pool.shutdown()
+    shutdown_shard_executors()
 
+app = FastAPI(title="Analytica API", version="0.1.0", lifespan=lifespan)
+
+# Added first so it runs inside CORS, whose headers its 413 responses then carry
+app.add_middleware(UploadLimitMiddleware, max_bytes=analyze.max_request_upload_bytes)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins or ["*"],
@@ -20,3 +39,7 @@ app.include_router(analyze.router)
 @app.get("/healthz")
 def healthz():
     return {"status": "ok"}
+
+@app.get("/metrics")
+def metrics():
+    return Response(content=analysis_metrics.render(), media_type="text/plain; version=0.0.4")
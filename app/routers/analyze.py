@@ -1,37 +1,859 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from ..schemas.analyze import AnalyzeResponse
-from ..services.analyzer import analyze_dataframe, load_dataframe_from_upload
+import asyncio
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, List, Optional, Tuple
+import orjson
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException, Path, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from ..schemas.analyze import (
+    AnalyzeResponse, JobResponse, ProfileAnalysisResponse, ProfileResponse, ProfileRowsResponse,
+)
+from ..services.analyzer import (
+    IncompatibleDatasetState, UploadParseError, analyze_delimited_stream, analyze_excel_stream, analyze_sample,
+    analyze_schema, analyze_upload_file, compare_results, estimate_row_count, profile_upload_file, resolve_stages,
+    update_dataset,
+)
+from ..services.analyzer.constants import ANALYZER_VERSION, DELIMITED_EXTENSIONS
+from ..services.analyzer.selection import HEAD_STAGES
+from ..services.analyzer.types import CsvOptions
+from ..services.analyzer.utils import get_file_extension
+from ..services.analyzer.instrumentation import StageRecorder, run_recorded
+from ..services.batch import ArchiveError, BatchItem, BatchTooLarge, extract_archive, is_archive, schedule
+from ..services.dataset_store import dataset_store
+from ..services.jobs import job_store
+from ..services.metrics import analysis_metrics, timing_header
+from ..services.profile_store import profile_store
+from ..services.result_cache import make_cache_key, result_cache
+from ..services.serialization import LAYOUTS, compress, encode_entry, encode_line, encode_result, negotiate_encoding
+from ..services.worker_pool import WorkerPoolSaturated, worker_pool
 from ..config import settings
 
 router = APIRouter(prefix="/v1/analyze", tags=["analyze"])
 
 _ALLOWED_EXT = {".csv", ".tsv", ".xlsx", ".xls", ".parquet"}
+_STREAMING_EXT = {".csv", ".tsv", ".xlsx"}
+_MODES = {"exact", "sample"}
+_DATASET_ID = r"^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$"
+_PROFILE_ID = r"^[0-9a-f]{64}$"
 _ALLOWED_CT = {"text/csv","text/tab-separated-values","application/vnd.ms-excel",
                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-               "application/octet-stream","application/x-parquet","application/parquet"}
+               "application/octet-stream","application/x-parquet","application/parquet",
+               "application/gzip","application/x-gzip","application/x-bzip2","application/zstd"}
+_ARCHIVE_CT = {"application/zip","application/x-zip-compressed","application/x-tar","application/x-gtar",
+               "application/gzip","application/x-gzip","application/x-bzip2","application/x-xz",
+               "application/octet-stream"}
 
-@router.post("/upload", response_model=AnalyzeResponse, status_code=status.HTTP_200_OK)
-async def analyze_upload(file: UploadFile = File(...)):
-    ext = (file.filename or "").lower().rpartition(".")[2]
-    ext = f".{ext}" if ext else ""
-    if ext not in _ALLOWED_EXT or (file.content_type and file.content_type not in _ALLOWED_CT):
+def _format_extension(filename: str) -> Optional[str]:
+    """A supported file's format extension, or ``None``; CSV/TSV may carry a compression suffix (``.csv.gz``)."""
+    name = filename.lower()
+    ext = get_file_extension(name)
+    compressed = ext != os.path.splitext(name)[1]
+    if ext not in _ALLOWED_EXT or (compressed and ext not in DELIMITED_EXTENSIONS):
+        return None
+    return ext
+
+def _upload_extension(file: UploadFile) -> str:
+    ext = _format_extension(file.filename or "")
+    if ext is None or (file.content_type and file.content_type not in _ALLOWED_CT):
         raise HTTPException(status_code=415, detail="Unsupported file type.")
+    return ext
+
+def _max_upload_bytes(ext: str) -> int:
+    """Size limit of a file whose streaming is decided by its size: the streaming limit for types that stream."""
+    return settings.max_streaming_upload_bytes if ext in _STREAMING_EXT else settings.max_upload_bytes
+
+def max_request_upload_bytes(path: str) -> int:
+    """Largest upload a request to ``path`` may carry, whatever its files' types turn out to be."""
+    if path.startswith(f"{router.prefix}/batch"):
+        return settings.batch_max_bytes
+    if path.startswith(f"{router.prefix}/profiles"):
+        return settings.max_upload_bytes
+    return max(settings.max_upload_bytes, settings.max_streaming_upload_bytes)
+
+def _check_declared_size(file: UploadFile, max_bytes: int) -> None:
+    if (file.size or 0) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File too large. Max {max_bytes} bytes.")
 
-    raw = await file.read()
-    if len(raw) > settings.max_upload_bytes:
-        raise HTTPException(status_code=413, detail=f"File too large. Max {settings.max_upload_bytes} bytes.")
+async def _spool_to_tempfile(
+    file: UploadFile, suffix: str, hasher, max_bytes: int, directory: Optional[str] = None
+) -> str:
+    """
+    Copy the upload to a named temp file chunk by chunk, hashing as it goes, and return its path.
 
+    Uploads over ``max_bytes`` are rejected (413) as soon as the limit is
+    crossed, after at most one chunk beyond it, whatever size they declared.
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=directory)
     try:
-        df = load_dataframe_from_upload(file.filename or "upload", raw, use_pyarrow=settings.use_pyarrow)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Could not parse file: {e}")
+        written = 0
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(settings.upload_chunk_bytes):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"File too large. Max {max_bytes} bytes.")
+                hasher.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+def _streaming_analysis(ext: str, sheet: Optional[str], max_rows: Optional[int]) -> Tuple[Callable, Dict[str, Any]]:
+    """The streaming analysis function for a file type, with its format-specific options."""
+    if ext == ".xlsx":
+        return analyze_excel_stream, {"sheet": sheet, "max_rows": max_rows, "quantile_error": settings.quantile_error}
+    return analyze_delimited_stream, {
+        "use_pyarrow": settings.use_pyarrow,
+        "block_size": settings.stream_block_bytes,
+        "quantile_error": settings.quantile_error,
+    }
+
+def _split_list(values: Optional[List[str]]) -> Optional[List[str]]:
+    """Query values given repeated (``?a=x&a=y``) and/or comma-separated (``?a=x,y``)."""
+    if not values:
+        return None
+    return [item for value in values for item in value.split(",") if item]
+
+def _selection(
+    columns: Optional[List[str]],
+    include: Optional[List[str]],
+    exclude: Optional[List[str]],
+) -> Tuple[Optional[List[str]], Optional[FrozenSet[str]]]:
+    """The requested columns and stages (``None`` for all), or 422 for unknown stage names."""
+    try:
+        stages = resolve_stages(_split_list(include), _split_list(exclude))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return _split_list(columns), stages
 
+def _schema_options(sheet: Optional[str], max_rows: Optional[int]) -> Dict[str, Any]:
+    return {
+        "use_pyarrow": settings.use_pyarrow,
+        "sheet": sheet,
+        "max_rows": max_rows,
+        "optimize_memory": settings.optimize_memory,
+        "csv_options": _csv_options(),
+    }
+
+def _csv_options() -> CsvOptions:
+    return {
+        "engine": settings.csv_engine,
+        "block_size": settings.csv_block_bytes,
+        "threads": settings.csv_threads,
+        "infer_rows": settings.csv_infer_rows,
+    }
+
+def _check_mode(mode: Optional[str]) -> None:
+    if mode is not None and mode not in _MODES:
+        raise HTTPException(status_code=422, detail=f"Unsupported mode: {mode}")
+
+async def _resolve_mode(mode: Optional[str], filename: str, source, sheet: Optional[str]) -> str:
+    """The requested mode, or "sample" when the upload's estimated row count reaches the threshold."""
+    if mode is not None:
+        return mode
+    if settings.sample_row_threshold <= 0:
+        return "exact"
+    try:
+        rows = await run_in_threadpool(estimate_row_count, filename, source, sheet)
+    except Exception:
+        rows = None  # unreadable uploads fail with a proper error during analysis
+    return "sample" if rows is not None and rows >= settings.sample_row_threshold else "exact"
+
+def _sample_options(sheet: Optional[str], max_rows: Optional[int]) -> Dict[str, Any]:
+    return {
+        "sample_rows": settings.sample_rows,
+        "use_pyarrow": settings.use_pyarrow,
+        "block_size": settings.stream_block_bytes,
+        "sheet": sheet,
+        "max_rows": max_rows,
+        "quantile_mode": settings.quantile_mode,
+        "quantile_error": settings.quantile_error,
+    }
+
+def _analysis_call(
+    mode: str,
+    ext: str,
+    streaming: bool,
+    sheet: Optional[str],
+    max_rows: Optional[int],
+    selection: Dict[str, Any],
+) -> Tuple[Callable, Dict[str, Any]]:
+    """The analysis function for a spooled upload and its options; it is called with the filename and path."""
+    if mode == "schema":
+        return analyze_schema, {
+            "max_preview_rows": settings.max_preview_rows, **_schema_options(sheet, max_rows), **selection,
+        }
+    options = {
+        "max_preview_rows": settings.max_preview_rows,
+        "max_corr_cols": settings.max_numeric_cols_for_corr,
+        "top_correlations": settings.correlation_top_k,
+        **selection,
+    }
+    if mode == "sample":
+        return analyze_sample, {**options, **_sample_options(sheet, max_rows)}
+    if streaming:
+        stream_fn, stream_options = _streaming_analysis(ext, sheet, max_rows)
+        return stream_fn, {**options, **stream_options}
+    return analyze_upload_file, {
+        **options,
+        "use_pyarrow": settings.use_pyarrow,
+        "engine": settings.analysis_engine,
+        "parquet_fast_path": settings.parquet_metadata_fast_path,
+        "shard_workers": settings.shard_workers,
+        "shard_min_columns": settings.shard_min_columns,
+        "quantile_mode": settings.quantile_mode,
+        "quantile_error": settings.quantile_error,
+        "sheet": sheet,
+        "max_rows": max_rows,
+        "optimize_memory": settings.optimize_memory,
+        "csv_options": _csv_options(),
+    }
+
+def _cache_key(
+    digest: str,
+    filename: str,
+    streaming: bool,
+    layout: str,
+    sheet: Optional[str],
+    max_rows: Optional[int],
+    mode: str,
+    selection: Dict[str, Any],
+) -> str:
+    """Result cache key (and ETag) of an upload's analysis under the current settings."""
+    stages = selection["stages"]
+    return make_cache_key(
+        digest,
+        filename=filename,
+        streaming=streaming,
+        max_preview_rows=settings.max_preview_rows,
+        max_corr_cols=settings.max_numeric_cols_for_corr,
+        top_correlations=settings.correlation_top_k,
+        use_pyarrow=settings.use_pyarrow,
+        engine=settings.analysis_engine,
+        parquet_fast_path=settings.parquet_metadata_fast_path,
+        optimize_memory=settings.optimize_memory,
+        csv_options=_csv_options(),
+        quantile_mode=settings.quantile_mode,
+        quantile_error=settings.quantile_error,
+        layout=layout,
+        sheet=sheet,
+        max_rows=max_rows,
+        mode=mode,
+        sample_rows=settings.sample_rows if mode == "sample" else None,
+        columns=selection["columns"],
+        stages=sorted(stages) if stages is not None else None,
+        analyzer_version=ANALYZER_VERSION,
+    )
+
+def _analysis_error(e: Exception) -> HTTPException:
+    """The HTTP error reporting an analysis that could not run or failed."""
+    if isinstance(e, WorkerPoolSaturated):
+        return HTTPException(status_code=503, detail="Analysis capacity exhausted, retry later.",
+                             headers={"Retry-After": str(e.retry_after)})
+    if isinstance(e, UploadParseError):
+        return HTTPException(status_code=400, detail=f"Could not parse file: {e}")
+    if isinstance(e, IncompatibleDatasetState):
+        return HTTPException(status_code=409, detail=str(e))
+    return HTTPException(status_code=500, detail=f"Analysis failed: {e}")
+
+async def _run_analysis(fn, *args, **kwargs):
+    """Run ``fn`` in the worker pool with stage recording; returns ``(result, stage timings)``."""
     try:
-        return analyze_dataframe(
-            df,
-            max_preview_rows=settings.max_preview_rows,
-            max_corr_cols=settings.max_numeric_cols_for_corr,
-            filename=file.filename,
-        )
+        return await worker_pool.run(run_recorded, fn, *args, **kwargs)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {e}")
+        raise _analysis_error(e)
+
+def _variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """Compressed representations get their own ETag, e.g. ``"<key>-gzip"``."""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or any(tag == etag or tag.startswith(f"{etag[:-1]}-") for tag in candidates)
+
+def _not_modified(etag: str, accept_encoding: Optional[str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers={"ETag": _variant_etag(etag, negotiate_encoding(accept_encoding)), "Vary": "Accept-Encoding"})
+
+def _json_response(
+    body: bytes,
+    etag: str,
+    cache_status: str,
+    accept_encoding: Optional[str] = None,
+    timing: Optional[str] = None
+) -> Response:
+    body, encoding = compress(body, negotiate_encoding(accept_encoding), settings.compression_min_bytes)
+    headers = {"ETag": _variant_etag(etag, encoding), "X-Analytica-Cache": cache_status, "Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    if timing is not None:
+        headers["X-Analytica-Timing"] = timing
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _serialize(result, layout: str) -> bytes:
+    if settings.response_encoder == "orjson" or layout != "records":
+        return encode_result(result, layout)
+    return AnalyzeResponse.model_validate(result).model_dump_json().encode("utf-8")
+
+@router.post("/upload", response_model=AnalyzeResponse, status_code=status.HTTP_200_OK)
+async def analyze_upload(
+    file: UploadFile = File(...),
+    layout: str = Query("records", description="'records' or 'columnar' (correlations and numeric_stats as arrays)"),
+    sheet: Optional[str] = Query(None, description="Excel only: worksheet name or 0-based position"),
+    max_rows: Optional[int] = Query(None, ge=1, description="Excel only: read at most this many data rows"),
+    mode: Optional[str] = Query(None, description="'exact' or 'sample' (default: sample above the configured row count)"),
+    columns: Optional[List[str]] = Query(None, description="Analyze only these columns (comma-separated or repeated)"),
+    include: Optional[List[str]] = Query(None, description="Run only these stages: columns, preview, stats, correlations, trends, insights"),
+    exclude: Optional[List[str]] = Query(None, description="Skip these stages"),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    if layout not in LAYOUTS:
+        raise HTTPException(status_code=422, detail=f"Unsupported layout: {layout}")
+    _check_mode(mode)
+    selected_columns, selected_stages = _selection(columns, include, exclude)
+    selection = {"columns": selected_columns, "stages": selected_stages}
+    ext = _upload_extension(file)
+    filename = file.filename or "upload"
+    streaming = ext in _STREAMING_EXT and (file.size or 0) >= settings.streaming_threshold_bytes
+    max_bytes = settings.max_streaming_upload_bytes if streaming else settings.max_upload_bytes
+    _check_declared_size(file, max_bytes)
+    hasher = hashlib.sha256()
+    path = await _spool_to_tempfile(file, ext, hasher, max_bytes)
+    size = os.path.getsize(path)
+
+    try:
+        if selected_stages is not None and selected_stages <= HEAD_STAGES:
+            mode = "schema"  # answered from the first rows, whatever the file's size
+        else:
+            mode = await _resolve_mode(mode, filename, path, sheet)
+        key = _cache_key(hasher.hexdigest(), filename, streaming, layout, sheet, max_rows, mode, selection)
+        etag = f'"{key}"'
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag, accept_encoding)
+
+        cached = await run_in_threadpool(result_cache.get, key) if result_cache.enabled else None
+        if cached is not None:
+            return _json_response(cached, etag, "hit", accept_encoding)
+
+        analysis, options = _analysis_call(mode, ext, streaming, sheet, max_rows, selection)
+        result, stages = await _run_analysis(analysis, filename, path, **options)
+    finally:
+        os.unlink(path)
+
+    recorder = StageRecorder()
+    with recorder.stage("serialization"):
+        body = _serialize(result, layout)
+    stages.update(recorder.stages)
+    analysis_metrics.observe(stages, ext.lstrip("."), size)
+
+    if result_cache.enabled:
+        await run_in_threadpool(result_cache.put, key, body)
+    return _json_response(body, etag, "miss", accept_encoding,
+                          timing_header(stages) if settings.timing_header else None)
+
+def _job_response(job, status_code: int = status.HTTP_200_OK) -> Response:
+    """A job's snapshot, encoded like ``/upload`` results rather than validated against ``JobResponse``."""
+    return Response(content=job.encode(), status_code=status_code, media_type="application/json")
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    file: UploadFile = File(...),
+    sheet: Optional[str] = Query(None, description="Excel only: worksheet name or 0-based position"),
+    max_rows: Optional[int] = Query(None, ge=1, description="Excel only: read at most this many data rows"),
+    mode: Optional[str] = Query(None, description="'exact' or 'sample' (default: sample above the configured row count)"),
+    columns: Optional[List[str]] = Query(None, description="Analyze only these columns (comma-separated or repeated)"),
+    include: Optional[List[str]] = Query(None, description="Run only these stages: columns, preview, stats, correlations, trends, insights"),
+    exclude: Optional[List[str]] = Query(None, description="Skip these stages"),
+):
+    _check_mode(mode)
+    selected_columns, selected_stages = _selection(columns, include, exclude)
+    selection = {"columns": selected_columns, "stages": selected_stages}
+    ext = _upload_extension(file)
+    filename = file.filename or "upload"
+    streaming = ext in _STREAMING_EXT and (file.size or 0) >= settings.streaming_threshold_bytes
+    max_bytes = _max_upload_bytes(ext)
+    _check_declared_size(file, max_bytes)
+
+    path = await _spool_to_tempfile(file, ext, hashlib.sha256(), max_bytes)
+    try:
+        if selected_stages is not None and selected_stages <= HEAD_STAGES:
+            mode = "schema"
+        else:
+            mode = await _resolve_mode(mode, filename, path, sheet)
+        analysis, options = _analysis_call(mode, ext, streaming, sheet, max_rows, selection)
+        job = job_store.submit(filename, path, analysis, filename, path, **options)
+    except WorkerPoolSaturated as e:
+        os.unlink(path)
+        raise HTTPException(status_code=503, detail="Too many pending analysis jobs, retry later.",
+                            headers={"Retry-After": str(e.retry_after)})
+    return _job_response(job, status.HTTP_202_ACCEPTED)
+
+def _member_limit(filename: str) -> Optional[int]:
+    ext = _format_extension(filename)
+    return None if ext is None else _max_upload_bytes(ext)
+
+async def _spool_batch(files: List[UploadFile], directory: str) -> List[BatchItem]:
+    """Spool a batch's uploads into ``directory``, unpacking archives; failures become per-file errors."""
+    items: List[BatchItem] = []
+    total = 0
+    for file in files:
+        filename = file.filename or "upload"
+        if is_archive(filename) and (not file.content_type or file.content_type in _ARCHIVE_CT):
+            _check_declared_size(file, settings.batch_max_bytes - total)
+            path = await _spool_to_tempfile(file, ".archive", hashlib.sha256(), settings.batch_max_bytes - total,
+                                            directory)
+            try:
+                members = await run_in_threadpool(
+                    extract_archive,
+                    path,
+                    directory,
+                    len(items),
+                    settings.batch_max_files - len(items),
+                    settings.batch_max_bytes - total,
+                    _member_limit,
+                    settings.upload_chunk_bytes,
+                )
+            finally:
+                os.unlink(path)
+            items.extend(members)
+            total += sum(item.size for item in members if item.error is None)
+            continue
+        if len(items) >= settings.batch_max_files:
+            raise BatchTooLarge(f"Too many files. Max {settings.batch_max_files} per batch.")
+        item = BatchItem(len(items), filename, None, file.size or 0)
+        items.append(item)
+        try:
+            ext = _upload_extension(file)
+            max_bytes = _max_upload_bytes(ext)
+            _check_declared_size(file, max_bytes)
+            hasher = hashlib.sha256()
+            item.path = await _spool_to_tempfile(file, ext, hasher, max_bytes, directory)
+        except HTTPException as e:
+            item.error = (e.status_code, e.detail)
+            continue
+        item.size, item.digest = os.path.getsize(item.path), hasher.hexdigest()
+        total += item.size
+        if total > settings.batch_max_bytes:
+            raise BatchTooLarge(f"Batch too large. Max {settings.batch_max_bytes} bytes.")
+    return items
+
+async def _run_batch_analysis(fn, *args, **kwargs):
+    """``_run_analysis`` that waits for a saturated pool to free up instead of failing."""
+    while True:
+        try:
+            return await worker_pool.run(run_recorded, fn, *args, **kwargs)
+        except WorkerPoolSaturated as e:
+            await asyncio.sleep(e.retry_after)
+        except Exception as e:
+            raise _analysis_error(e)
+
+async def _analyze_batch_item(
+    item: BatchItem,
+    layout: str,
+    mode: Optional[str],
+    selection: Dict[str, Any],
+    compare: bool,
+) -> Tuple[BatchItem, bytes, Optional[Dict[str, Any]]]:
+    """One file's NDJSON line, and its result when the batch is compared."""
+    entry = {"index": item.index, "filename": item.filename}
+    if item.error is not None:
+        status_code, detail = item.error
+        return item, encode_line({**entry, "status": status_code, "detail": detail}), None
+
+    ext = get_file_extension(item.filename.lower())
+    streaming = ext in _STREAMING_EXT and item.size >= settings.streaming_threshold_bytes
+    try:
+        if selection["stages"] is not None and selection["stages"] <= HEAD_STAGES:
+            item_mode = "schema"
+        else:
+            item_mode = await _resolve_mode(mode, item.filename, item.path, None)
+        key = _cache_key(item.digest, item.filename, streaming, layout, None, None, item_mode, selection)
+        # Comparisons read the cached records layout back; columnar results are re-analyzed
+        cached = None
+        if result_cache.enabled and (not compare or layout == "records"):
+            cached = await run_in_threadpool(result_cache.get, key)
+        if cached is not None:
+            return (item, encode_line({**entry, "status": 200, "cache": "hit"}, cached),
+                    orjson.loads(cached) if compare else None)
+
+        analysis, options = _analysis_call(item_mode, ext, streaming, None, None, selection)
+        result, stages = await _run_batch_analysis(analysis, item.filename, item.path, **options)
+    except HTTPException as e:
+        return item, encode_line({**entry, "status": e.status_code, "detail": e.detail}), None
+    finally:
+        os.unlink(item.path)
+
+    recorder = StageRecorder()
+    with recorder.stage("serialization"):
+        body = _serialize(result, layout)
+    stages.update(recorder.stages)
+    analysis_metrics.observe(stages, ext.lstrip("."), item.size)
+    if result_cache.enabled:
+        await run_in_threadpool(result_cache.put, key, body)
+    return item, encode_line({**entry, "status": 200, "cache": "miss"}, body), result if compare else None
+
+async def _batch_lines(
+    items: List[BatchItem],
+    directory: str,
+    layout: str,
+    mode: Optional[str],
+    selection: Dict[str, Any],
+    compare: bool,
+) -> AsyncIterator[bytes]:
+    try:
+        analyzed: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        concurrency = min(worker_pool.max_workers, worker_pool.max_in_flight)
+        run = functools.partial(_analyze_batch_item, layout=layout, mode=mode, selection=selection, compare=compare)
+        async for item, line, result in schedule(items, run, concurrency):
+            if result is not None:
+                analyzed[item.index] = (item.filename, result)
+            yield line
+        if compare:
+            compared = [analyzed[index] for index in sorted(analyzed)]
+            yield encode_line({"comparison": await run_in_threadpool(
+                compare_results, [name for name, _ in compared], [result for _, result in compared],
+            )})
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+@router.post("/batch")
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    layout: str = Query("records", description="'records' or 'columnar' (correlations and numeric_stats as arrays)"),
+    mode: Optional[str] = Query(None, description="'exact' or 'sample' (default: sample above the configured row count)"),
+    compare: bool = Query(False, description="End with a cross-file comparison of schemas and numeric statistics"),
+    columns: Optional[List[str]] = Query(None, description="Analyze only these columns (comma-separated or repeated)"),
+    include: Optional[List[str]] = Query(None, description="Run only these stages: columns, preview, stats, correlations, trends, insights"),
+    exclude: Optional[List[str]] = Query(None, description="Skip these stages"),
+):
+    """
+    Analyze several files, or the files of zip/tar archives, streaming one NDJSON line per file.
+
+    Files are analyzed in the worker pool largest first and each line is
+    sent as soon as its analysis completes: ``{"index", "filename",
+    "status": 200, "cache", "result"}`` with the ``AnalyzeResponse``, or
+    ``{"index", "filename", "status", "detail"}`` for a file that failed.
+    ``index`` is the file's position in the upload, archives expanded in
+    place. With ``compare``, a last ``{"comparison": ...}`` line compares
+    the analyzed files' schemas and numeric statistics.
+    """
+    if layout not in LAYOUTS:
+        raise HTTPException(status_code=422, detail=f"Unsupported layout: {layout}")
+    _check_mode(mode)
+    selected_columns, selected_stages = _selection(columns, include, exclude)
+    selection = {"columns": selected_columns, "stages": selected_stages}
+
+    directory = tempfile.mkdtemp(prefix="analytica-batch-")
+    try:
+        items = await _spool_batch(files, directory)
+    except (BatchTooLarge, ArchiveError) as e:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise HTTPException(status_code=413 if isinstance(e, BatchTooLarge) else 400, detail=str(e))
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    return StreamingResponse(_batch_lines(items, directory, layout, mode, selection, compare),
+                             media_type="application/x-ndjson")
+
+async def _update_dataset(
+    dataset_id: str,
+    file: UploadFile,
+    appended: bool,
+    layout: str,
+    sheet: Optional[str],
+    accept_encoding: Optional[str],
+) -> Response:
+    """Fold an upload into a dataset's stored state and respond with the updated analysis."""
+    if layout not in LAYOUTS:
+        raise HTTPException(status_code=422, detail=f"Unsupported layout: {layout}")
+    ext = _upload_extension(file)
+    filename = file.filename or "upload"
+    max_bytes = _max_upload_bytes(ext)
+    _check_declared_size(file, max_bytes)
+
+    async with dataset_store.lock(dataset_id):
+        state = await run_in_threadpool(dataset_store.get, dataset_id)
+        if appended and state is None:
+            raise HTTPException(status_code=404, detail="Dataset not found; upload its full content first.")
+        path = await _spool_to_tempfile(file, ext, hashlib.sha256(), max_bytes)
+        try:
+            (result, new_state, outcome), stages = await _run_analysis(
+                update_dataset,
+                state,
+                filename,
+                path,
+                appended=appended,
+                max_preview_rows=settings.max_preview_rows,
+                max_corr_cols=settings.max_numeric_cols_for_corr,
+                top_correlations=settings.correlation_top_k,
+                use_pyarrow=settings.use_pyarrow,
+                block_size=settings.stream_block_bytes,
+                sheet=sheet,
+                quantile_error=settings.quantile_error,
+            )
+        finally:
+            os.unlink(path)
+        if new_state is not state:
+            await run_in_threadpool(dataset_store.put, dataset_id, new_state)
+
+    recorder = StageRecorder()
+    with recorder.stage("serialization"):
+        body = _serialize(result, layout)
+    stages.update(recorder.stages)
+    analysis_metrics.observe(stages, ext.lstrip("."), file.size or 0)
+
+    response = _json_response(body, f'"{hashlib.sha256(body).hexdigest()}"', "bypass", accept_encoding,
+                              timing_header(stages) if settings.timing_header else None)
+    response.headers["X-Analytica-Dataset"] = outcome
+    return response
+
+@router.put("/datasets/{dataset_id}", response_model=AnalyzeResponse)
+async def put_dataset(
+    dataset_id: str = Path(..., pattern=_DATASET_ID),
+    file: UploadFile = File(...),
+    layout: str = Query("records", description="'records' or 'columnar' (correlations and numeric_stats as arrays)"),
+    sheet: Optional[str] = Query(None, description="Excel only: worksheet name or 0-based position"),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Analyze the full content of a dataset, reusing its stored state where possible.
+
+    If the stored state covers a byte prefix of this CSV/TSV upload (the
+    previous export plus appended rows), only the new rows are analyzed.
+    The X-Analytica-Dataset header reports "created", "rebuilt", "appended"
+    or "unchanged". Quantiles are sketched, as in streaming analysis.
+    """
+    return await _update_dataset(dataset_id, file, False, layout, sheet, accept_encoding)
+
+@router.post("/datasets/{dataset_id}/rows", response_model=AnalyzeResponse)
+async def append_dataset_rows(
+    dataset_id: str = Path(..., pattern=_DATASET_ID),
+    file: UploadFile = File(...),
+    layout: str = Query("records", description="'records' or 'columnar' (correlations and numeric_stats as arrays)"),
+    sheet: Optional[str] = Query(None, description="Excel only: worksheet name or 0-based position"),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """Fold a file holding only new rows (with a header row) into a known dataset's analysis."""
+    return await _update_dataset(dataset_id, file, True, layout, sheet, accept_encoding)
+
+@router.delete("/datasets/{dataset_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_dataset(dataset_id: str = Path(..., pattern=_DATASET_ID)):
+    # Waits for an update in progress, which would otherwise store the dataset again after it is deleted
+    async with dataset_store.lock(dataset_id):
+        deleted = await run_in_threadpool(dataset_store.delete, dataset_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+def _profile_id(digest: str, filename: str, sheet: Optional[str], max_rows: Optional[int]) -> str:
+    """Id of an upload's profile under the current settings, so uploading the same file again finds it."""
+    return make_cache_key(
+        digest,
+        filename=filename,
+        sheet=sheet,
+        max_rows=max_rows,
+        max_preview_rows=settings.max_preview_rows,
+        max_corr_cols=settings.max_numeric_cols_for_corr,
+        top_correlations=settings.correlation_top_k,
+        use_pyarrow=settings.use_pyarrow,
+        optimize_memory=settings.optimize_memory,
+        csv_options=_csv_options(),
+        quantile_mode=settings.quantile_mode,
+        quantile_error=settings.quantile_error,
+        sample_rows=settings.profile_sample_rows,
+        correlation_columns=settings.profile_correlation_columns,
+        kept_pairs=settings.profile_top_correlations,
+        analyzer_version=ANALYZER_VERSION,
+    )
+
+def _profile_response(
+    profile_id: str, cache_status: str, accept_encoding: Optional[str], timing: Optional[str] = None
+) -> Response:
+    found = profile_store.summary(profile_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    summary, result = found
+    return _json_response(encode_entry(summary, result), f'"{profile_id}"', cache_status, accept_encoding, timing)
+
+def _percentiles(values: Optional[List[str]]) -> Optional[List[float]]:
+    """Requested percentiles (0-100) as probabilities, or 422."""
+    percentiles = _split_list(values)
+    if percentiles is None:
+        return None
+    try:
+        probabilities = [float(value) / 100 for value in percentiles]
+    except ValueError:
+        probabilities = [-1.0]
+    if any(not 0.0 <= probability <= 1.0 for probability in probabilities):
+        raise HTTPException(status_code=422, detail="Percentiles must be numbers between 0 and 100.")
+    return probabilities
+
+@router.post("/profiles", response_model=ProfileResponse)
+async def create_profile(
+    file: UploadFile = File(...),
+    sheet: Optional[str] = Query(None, description="Excel only: worksheet name or 0-based position"),
+    max_rows: Optional[int] = Query(None, ge=1, description="Excel only: read at most this many data rows"),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Analyze an upload and keep its profile for later queries.
+
+    The profile keeps the analysis with the column metadata, quantile sketches,
+    correlation blocks and a downsampled copy of the rows, so the endpoints
+    below answer without the file. Its id depends on the upload's content and
+    the analysis settings: uploading the same file again returns the stored
+    profile (X-Analytica-Cache: hit).
+    """
+    ext = _upload_extension(file)
+    filename = file.filename or "upload"
+    _check_declared_size(file, settings.max_upload_bytes)
+    hasher = hashlib.sha256()
+    path = await _spool_to_tempfile(file, ext, hasher, settings.max_upload_bytes)
+    size = os.path.getsize(path)
+
+    profile, stages = None, {}
+    try:
+        profile_id = _profile_id(hasher.hexdigest(), filename, sheet, max_rows)
+        if not await run_in_threadpool(profile_store.exists, profile_id):
+            profile, stages = await _run_analysis(
+                profile_upload_file,
+                filename,
+                path,
+                max_preview_rows=settings.max_preview_rows,
+                max_corr_cols=settings.max_numeric_cols_for_corr,
+                top_correlations=settings.correlation_top_k,
+                use_pyarrow=settings.use_pyarrow,
+                sheet=sheet,
+                max_rows=max_rows,
+                csv_options=_csv_options(),
+                optimize_memory=settings.optimize_memory,
+                quantile_mode=settings.quantile_mode,
+                quantile_error=settings.quantile_error,
+                sample_rows=settings.profile_sample_rows,
+                correlation_columns=settings.profile_correlation_columns,
+                kept_pairs=settings.profile_top_correlations,
+            )
+    finally:
+        os.unlink(path)
+
+    if profile is None:
+        return await run_in_threadpool(_profile_response, profile_id, "hit", accept_encoding)
+    recorder = StageRecorder()
+    with recorder.stage("profile_store"):
+        await run_in_threadpool(profile_store.put, profile_id, filename, profile)
+    stages.update(recorder.stages)
+    analysis_metrics.observe(stages, ext.lstrip("."), size)
+    return await run_in_threadpool(_profile_response, profile_id, "miss", accept_encoding,
+                                   timing_header(stages) if settings.timing_header else None)
+
+@router.get("/profiles/{profile_id}", response_model=ProfileResponse)
+def get_profile(
+    profile_id: str = Path(..., pattern=_PROFILE_ID),
+    accept_encoding: Optional[str] = Header(None),
+):
+    return _profile_response(profile_id, "hit", accept_encoding)
+
+@router.get("/profiles/{profile_id}/rows", response_model=ProfileRowsResponse)
+def get_profile_rows(
+    profile_id: str = Path(..., pattern=_PROFILE_ID),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """A page of the profile's downsampled rows; ``row_numbers`` are their 0-based positions in the upload."""
+    if limit > settings.profile_page_max_rows:
+        raise HTTPException(status_code=422, detail=f"limit must be at most {settings.profile_page_max_rows}.")
+    found = profile_store.rows(profile_id, offset, limit)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    total, frame = found
+    body = encode_entry({
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "row_numbers": frame.index.tolist(),
+        "rows": frame.to_dict("records"),
+    })
+    return _json_response(body, f'"{profile_id}.{offset}.{limit}"', "hit", accept_encoding)
+
+@router.get("/profiles/{profile_id}/analysis", response_model=ProfileAnalysisResponse)
+def reanalyze_profile(
+    profile_id: str = Path(..., pattern=_PROFILE_ID),
+    max_corr_cols: Optional[int] = Query(None, ge=0, description="Correlate this many highest-variance columns"),
+    top_correlations: Optional[int] = Query(None, ge=0, description="Report this many strongest pairs"),
+    percentiles: Optional[List[str]] = Query(None, description="Also report these percentiles (0-100) of every numeric column"),
+    layout: str = Query("records", description="'records' or 'columnar' (correlations and numeric_stats as arrays)"),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    The profiled analysis with its cheap stages re-run, without the upload.
+
+    Correlations come from the stored blocks and percentiles from the
+    columns' quantile sketches (within the configured rank error). Asking
+    for more columns or pairs than the profile kept is a 422.
+    """
+    if layout not in LAYOUTS:
+        raise HTTPException(status_code=422, detail=f"Unsupported layout: {layout}")
+    probabilities = _percentiles(percentiles)
+    etag = '"{}"'.format(make_cache_key(
+        profile_id,
+        max_corr_cols=max_corr_cols,
+        top_correlations=top_correlations,
+        probabilities=probabilities,
+        layout=layout,
+    ))
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag, accept_encoding)
+
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    try:
+        result = profile.reanalyze(max_corr_cols, top_correlations, probabilities)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return _json_response(encode_result(result, layout), etag, "hit", accept_encoding)
+
+@router.delete("/profiles/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_profile(profile_id: str = Path(..., pattern=_PROFILE_ID)):
+    if not profile_store.delete(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return _job_response(job)
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+def cancel_job(job_id: str):
+    job = job_store.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return _job_response(job)
+
+@router.get("/jobs")
+def job_stats():
+    return job_store.stats()
+
+@router.get("/pool")
+def pool_stats():
+    return worker_pool.stats()
+
+@router.get("/cache")
+def cache_stats():
+    return result_cache.stats()
+
+@router.get("/profiles")
+def profile_stats():
+    return profile_store.stats()
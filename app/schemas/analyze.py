@@ -11,16 +11,58 @@ class NumericStats(BaseModel):
     mean: float | None
     std: float | None
     min: float | None
+    p1: float | None = None
+    p5: float | None = None
     p25: float | None
     median: float | None
     p75: float | None
+    p95: float | None = None
+    p99: float | None = None
     max: float | None
+    confidence: Dict[str, List[float | None]] | None = None
 
 class TrendInfo(BaseModel):
     column: str
     slope: float
     r2: float
     direction: Optional[str]
+    slope_ci: List[float] | None = None
+    unit: Optional[str] = None
+    recent_slope: float | None = None
+    segments: List["TrendSegment"] | None = None
+
+class TrendSegment(BaseModel):
+    start: str
+    end: str
+    slope: float
+
+class ChangePoint(BaseModel):
+    column: str
+    at: str
+    level_before: float
+    level_after: float
+    slope_before: float
+    slope_after: float
+    score: float
+
+class Seasonality(BaseModel):
+    column: str
+    period: int
+    strength: float
+
+class TimeSeriesInfo(BaseModel):
+    column: str
+    unit: str
+    points: int
+    rows: int
+    duplicates: int
+    change_points: List[ChangePoint]
+    seasonality: List[Seasonality]
+
+class CorrelationPair(BaseModel):
+    column_a: str
+    column_b: str
+    correlation: float
 
 class AnalyzeResponse(BaseModel):
     meta: Dict[str, Any]
@@ -29,5 +71,47 @@ class AnalyzeResponse(BaseModel):
     missing: Dict[str, int]
     numeric_stats: Dict[str, NumericStats]
     correlations: Dict[str, Dict[str, float]]
+    top_correlations: List[CorrelationPair] = Field(default_factory=list)
     trends: List[TrendInfo]
+    time_series: Optional[TimeSeriesInfo] = None
     insights: List[str]
+
+class JobResponse(BaseModel):
+    id: str
+    filename: str
+    status: str
+    stage: Optional[str] = None
+    progress: Dict[str, str]
+    created_at: float
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[AnalyzeResponse] = None
+
+class ProfileColumn(BaseModel):
+    name: str
+    dtype: str
+    inferred_semantic: Optional[str] = None
+    missing: Optional[int] = None
+    numeric: bool
+    correlation_rank: Optional[int] = None
+
+class ProfileResponse(BaseModel):
+    id: str
+    filename: str
+    created_at: float
+    rows: int
+    sample_rows: int
+    correlation_columns: int
+    top_correlations: int
+    columns: List[ProfileColumn]
+    result: AnalyzeResponse
+
+class ProfileRowsResponse(BaseModel):
+    offset: int
+    limit: int
+    total: int
+    row_numbers: List[int]
+    rows: List[Dict[str, Any]]
+
+class ProfileAnalysisResponse(AnalyzeResponse):
+    quantiles: Optional[Dict[str, Dict[str, Optional[float]]]] = None
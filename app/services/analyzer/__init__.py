@@ -9,12 +9,58 @@ This package provides comprehensive DataFrame analysis capabilities including:
 """
 
 from .core import DataFrameAnalyzer
+from .context import AnalysisContext
+from .arrow_engine import ArrowAnalysisContext
 from .loader import DataFrameLoader
-from .api import analyze_dataframe, load_dataframe_from_upload
+from .delimited import sniff_dialect
+from .streaming import StreamingAnalyzer
+from .selection import resolve_stages
+from .comparison import compare_results
+from .sampling import RowSampler, SampledAnalysisContext, estimate_row_count
+from .sharding import ShardedAnalyzer, shutdown_shard_executors
+from .profile import DatasetProfile
+from .incremental import DatasetState, IncompatibleDatasetState, update_dataset
+from .api import (
+    UploadParseError,
+    analyze_dataframe,
+    analyze_delimited_stream,
+    analyze_excel_stream,
+    analyze_sample,
+    analyze_schema,
+    analyze_upload_bytes,
+    analyze_upload_file,
+    load_dataframe_from_upload,
+    profile_dataframe,
+    profile_upload_file,
+)
 
 __all__ = [
+    "AnalysisContext",
+    "ArrowAnalysisContext",
     "DataFrameAnalyzer",
     "DataFrameLoader", 
+    "DatasetProfile",
+    "DatasetState",
+    "RowSampler",
+    "SampledAnalysisContext",
+    "IncompatibleDatasetState",
+    "ShardedAnalyzer",
+    "StreamingAnalyzer",
+    "UploadParseError",
     "analyze_dataframe",
-    "load_dataframe_from_upload"
+    "analyze_delimited_stream",
+    "analyze_excel_stream",
+    "analyze_sample",
+    "analyze_schema",
+    "analyze_upload_bytes",
+    "analyze_upload_file",
+    "compare_results",
+    "estimate_row_count",
+    "load_dataframe_from_upload",
+    "profile_dataframe",
+    "profile_upload_file",
+    "resolve_stages",
+    "sniff_dialect",
+    "shutdown_shard_executors",
+    "update_dataset"
 ]
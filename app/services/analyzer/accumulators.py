@@ -0,0 +1,304 @@
+"""Mergeable online accumulators for batch-by-batch (streaming) analysis.
+
+Every accumulator supports ``update`` with a new batch and ``merge`` with an
+accumulator built over other rows, so partial results from chunks, shards or
+earlier uploads can be combined without revisiting the data. Moments are kept
+centered and combined with Chan et al.'s parallel update, which stays
+numerically stable for large offsets such as epoch-nanosecond timestamps.
+"""
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+import pandas as pd
+import numpy as np
+
+from .constants import DEFAULT_HLL_PRECISION, DEFAULT_SKETCH_K
+
+CoMomentState = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Elementwise division returning NaN where the denominator is zero."""
+    numerator = np.asarray(numerator, dtype="float64")
+    denominator = np.asarray(denominator, dtype="float64")
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def merge_co_moments(a: CoMomentState, b: CoMomentState) -> CoMomentState:
+    """
+    Combine two centered co-moment states ``(n, mean_x, mean_y, c_xy, m2_x, m2_y)``.
+
+    All members are arrays of identical shape; cells with ``n == 0`` on either
+    side simply take the other side's values.
+    """
+    n_a, mx_a, my_a, c_a, m2x_a, m2y_a = a
+    n_b, mx_b, my_b, c_b, m2x_b, m2y_b = b
+    n = n_a + n_b
+    weight_b = _safe_divide(n_b, n)
+    weight_b = np.where(n > 0, weight_b, 0.0)
+    cross = np.where(n > 0, _safe_divide(n_a * n_b, n), 0.0)
+
+    dx = np.where(n_b > 0, mx_b, 0.0) - np.where(n_a > 0, mx_a, 0.0)
+    dy = np.where(n_b > 0, my_b, 0.0) - np.where(n_a > 0, my_a, 0.0)
+    mean_x = np.where(n_a > 0, mx_a, 0.0) + dx * weight_b
+    mean_y = np.where(n_a > 0, my_a, 0.0) + dy * weight_b
+    c_xy = c_a + c_b + dx * dy * cross
+    m2_x = m2x_a + m2x_b + dx * dx * cross
+    m2_y = m2y_a + m2y_b + dy * dy * cross
+    return n, mean_x, mean_y, c_xy, m2_x, m2_y
+
+
+class ColumnMoments:
+    """Per-column count, mean, M2 (for variance), min and max."""
+
+    def __init__(self, n_columns: int):
+        self.count = np.zeros(n_columns, dtype="float64")
+        self.mean = np.zeros(n_columns, dtype="float64")
+        self.m2 = np.zeros(n_columns, dtype="float64")
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+
+    def update(self, matrix: np.ndarray) -> None:
+        """Fold a ``rows x columns`` float64 batch (NaN = missing) into the moments."""
+        valid = ~np.isnan(matrix)
+        count = valid.sum(axis=0).astype("float64")
+        mean = _safe_divide(np.where(valid, matrix, 0.0).sum(axis=0), count)
+        m2 = (np.where(valid, matrix - np.nan_to_num(mean), 0.0) ** 2).sum(axis=0)
+        batch = ColumnMoments(matrix.shape[1])
+        batch.count, batch.mean, batch.m2 = count, np.nan_to_num(mean), m2
+        batch.min = np.where(valid, matrix, np.inf).min(axis=0, initial=np.inf)
+        batch.max = np.where(valid, matrix, -np.inf).max(axis=0, initial=-np.inf)
+        self.merge(batch)
+
+    def merge(self, other: "ColumnMoments") -> None:
+        """Merge moments computed over a disjoint set of rows."""
+        zeros = np.zeros_like(self.count)
+        n, mean, _, _, m2, _ = merge_co_moments(
+            (self.count, self.mean, zeros, zeros, self.m2, zeros),
+            (other.count, other.mean, zeros, zeros, other.m2, zeros),
+        )
+        self.count, self.mean, self.m2 = n, mean, m2
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        """Per-column variance (NaN where fewer than ``ddof + 1`` observations)."""
+        return np.where(self.count > ddof, _safe_divide(self.m2, self.count - ddof), np.nan)
+
+
+class PairwiseCoMoments:
+    """
+    Pairwise-complete co-moments for a set of columns.
+
+    Cell ``(i, j)`` only uses rows where both columns are present, matching
+    ``DataFrame.corr``'s pairwise NaN handling. Batches are centered on their
+    own column means before the masked matrix products.
+    """
+
+    def __init__(self, n_columns: int):
+        shape = (n_columns, n_columns)
+        self.state: CoMomentState = tuple(np.zeros(shape) for _ in range(6))  # type: ignore[assignment]
+
+    def update(self, matrix: np.ndarray) -> None:
+        """Fold a ``rows x columns`` float64 batch (NaN = missing) into the co-moments."""
+        valid = ~np.isnan(matrix)
+        present = valid.astype("float64")
+        shift = np.nan_to_num(_safe_divide(np.where(valid, matrix, 0.0).sum(axis=0), present.sum(axis=0)))
+        centered = np.where(valid, matrix - shift, 0.0)
+
+        n = present.T @ present
+        mean_x = _safe_divide(centered.T @ present, n)
+        mean_y = mean_x.T
+        mean_x, mean_y = np.nan_to_num(mean_x), np.nan_to_num(mean_y)
+        c_xy = centered.T @ centered - n * mean_x * mean_y
+        m2_x = (centered ** 2).T @ present - n * mean_x ** 2
+        m2_y = m2_x.T
+        batch = (n, mean_x + shift[:, None], mean_y + shift[None, :], c_xy, m2_x, m2_y)
+        self.state = merge_co_moments(self.state, batch)
+
+    def merge(self, other: "PairwiseCoMoments") -> None:
+        """Merge co-moments computed over a disjoint set of rows."""
+        self.state = merge_co_moments(self.state, other.state)
+
+    def correlation(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Pearson correlation matrix (NaN where undefined), optionally for a subset."""
+        n, _, _, c_xy, m2_x, m2_y = self.state
+        if indices is not None:
+            grid = np.ix_(indices, indices)
+            n, c_xy, m2_x, m2_y = n[grid], c_xy[grid], m2_x[grid], m2_y[grid]
+        corr = _safe_divide(c_xy, np.sqrt(np.clip(m2_x, 0.0, None) * np.clip(m2_y, 0.0, None)))
+        corr = np.clip(np.where(n > 1, corr, np.nan), -1.0, 1.0)
+        diagonal = np.diagonal(corr).copy()
+        np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return corr
+
+
+class RegressionSums:
+    """Per-column centered sums for an OLS fit of each column against a shared x."""
+
+    def __init__(self, n_columns: int):
+        self.state: CoMomentState = tuple(np.zeros(n_columns) for _ in range(6))  # type: ignore[assignment]
+
+    def update(self, x_values: np.ndarray, matrix: np.ndarray) -> None:
+        """Fold a batch of x values and their ``rows x columns`` y values into the sums."""
+        finite_x = np.isfinite(x_values)
+        valid = finite_x[:, None] & np.isfinite(matrix)
+        n = valid.sum(axis=0).astype("float64")
+
+        # Shift x by its batch mean and center each y column, then reduce with
+        # matrix-vector products instead of materializing per-column x grids
+        x_shift = float(x_values[finite_x].mean()) if finite_x.any() else 0.0
+        shifted_x = np.where(finite_x, x_values - x_shift, 0.0)
+        present = valid.astype("float64")
+        centered_y = np.where(valid, matrix, 0.0)
+        mean_y = np.nan_to_num(_safe_divide(centered_y.sum(axis=0), n))
+        centered_y -= mean_y
+        centered_y *= present
+
+        sum_x = shifted_x @ present
+        mean_x = np.nan_to_num(_safe_divide(sum_x, n))
+        m2_x = (shifted_x * shifted_x) @ present - sum_x * mean_x
+        c_xy = shifted_x @ centered_y
+        m2_y = np.einsum("ij,ij->j", centered_y, centered_y)
+        batch = (n, mean_x + x_shift, mean_y, c_xy, m2_x, m2_y)
+        self.state = merge_co_moments(self.state, batch)
+
+    def merge(self, other: "RegressionSums") -> None:
+        """Merge sums computed over a disjoint set of rows."""
+        self.state = merge_co_moments(self.state, other.state)
+
+    def fit(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return per-column ``(slope, intercept, r2, n)`` of the least-squares line."""
+        n, mean_x, mean_y, c_xy, m2_x, m2_y = self.state
+        slope = np.nan_to_num(_safe_divide(c_xy, m2_x))
+        intercept = mean_y - slope * mean_x
+        r2 = np.where((m2_x > 0) & (m2_y > 0), np.nan_to_num(_safe_divide(c_xy * c_xy, m2_x * m2_y)), 0.0)
+        return slope, intercept, r2, n
+
+    def slope_standard_error(self) -> np.ndarray:
+        """Per-column standard error of the fitted slope (NaN with fewer than three points)."""
+        n, _, _, c_xy, m2_x, m2_y = self.state
+        residual = np.clip(m2_y - np.nan_to_num(_safe_divide(c_xy * c_xy, m2_x)), 0.0, None)
+        return np.where(n > 2, np.sqrt(_safe_divide(residual, (n - 2) * m2_x)), np.nan)
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL-style quantile sketch for a single column.
+
+    Level ``h`` holds items of weight ``2**h``; when a level exceeds ``k``
+    items it is sorted and every other item (random offset) is promoted. The
+    rank error is roughly ``O(log(n / k) / k)`` with ``O(k log(n / k))`` memory.
+    """
+
+    def __init__(self, k: int = DEFAULT_SKETCH_K, seed: Optional[int] = None):
+        self.k = max(2, k)
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of values; NaNs are ignored."""
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Merge another sketch into this one."""
+        for height, items in enumerate(other.levels):
+            if height >= len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[height] = np.concatenate([self.levels[height], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self) -> None:
+        height = 0
+        while height < len(self.levels):
+            items = self.levels[height]
+            if items.size > self.k:
+                items = np.sort(items)
+                keep = items[-1:] if items.size % 2 else items[:0]
+                paired = items[:-1] if items.size % 2 else items
+                promoted = paired[int(self._rng.integers(2))::2]
+                self.levels[height] = keep
+                if height + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[height + 1] = np.concatenate([self.levels[height + 1], promoted])
+            height += 1
+
+    def quantiles(self, probabilities: Iterable[float]) -> np.ndarray:
+        """Estimate the given quantiles (NaN if the sketch is empty)."""
+        probabilities = np.asarray(list(probabilities), dtype="float64")
+        if self.count == 0:
+            return np.full(probabilities.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, weights = items[order], weights[order]
+        cumulative = np.cumsum(weights)
+        if cumulative[-1] <= 1:
+            return np.full(probabilities.shape, items[0])
+        # Each item stands for the ranks it absorbed; using their centre makes an
+        # uncompressed sketch match pandas' linear interpolation exactly
+        positions = (cumulative - (weights + 1) / 2) / (cumulative[-1] - 1)
+        return np.interp(probabilities, positions, items)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Exact bit length of each element of a uint64 array."""
+    remaining = values.copy()
+    length = np.zeros(values.shape, dtype="int64")
+    for shift in (32, 16, 8, 4, 2, 1):
+        wide = remaining >= (np.uint64(1) << np.uint64(shift))
+        length += wide * shift
+        remaining = np.where(wide, remaining >> np.uint64(shift), remaining)
+    return length + (remaining > 0)
+
+
+class HyperLogLog:
+    """
+    Mergeable HyperLogLog cardinality sketch.
+
+    Uses ``2**precision`` one-byte registers over pandas' 64-bit value hashes;
+    the relative standard error is about ``1.04 / sqrt(2**precision)``.
+    """
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype="uint8")
+
+    def update(self, values: pd.Series) -> None:
+        """Add the non-null values of a Series."""
+        values = values.dropna()
+        if len(values):
+            self.update_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        """Add precomputed uint64 hashes."""
+        suffix_bits = 64 - self.precision
+        buckets = (hashes >> np.uint64(suffix_bits)).astype("int64")
+        suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+        ranks = (suffix_bits - _bit_length(suffix) + 1).astype("uint8")
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Merge a sketch with the same precision."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        """Estimated number of distinct values."""
+        m = float(len(self.registers))
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype("int64"))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * float(np.log(m / zeros))  # linear counting for small cardinalities
+        return raw
@@ -1,11 +1,25 @@
 """Public API functions for DataFrame analysis (backward compatibility)."""
 
-from typing import Optional
+import io
+from typing import BinaryIO, Callable, FrozenSet, Iterator, Optional, Sequence, Tuple, Union
 import pandas as pd
 
+from .arrow_engine import table_to_frame
+from .constants import (
+    DEFAULT_PROFILE_CORRELATION_COLUMNS, DEFAULT_PROFILE_SAMPLE_ROWS, DEFAULT_PROFILE_TOP_CORRELATIONS,
+    DEFAULT_QUANTILE_ERROR, DEFAULT_SAMPLE_ROWS, DEFAULT_SHARD_MIN_COLUMNS, DEFAULT_STREAM_BLOCK_BYTES, DEFAULT_TOP_CORRELATIONS, EXCEL_BATCH_ROWS,
+    DELIMITED_EXTENSIONS, PARQUET_EXTENSIONS, SCHEMA_EXACT_COUNT_BYTES, SCHEMA_SAMPLE_ROWS,
+)
 from .core import DataFrameAnalyzer
+from .instrumentation import record_stage
 from .loader import DataFrameLoader
-from .types import AnalysisResults
+from .profile import DatasetProfile
+from .sampling import RowSampler, estimate_row_count, extrapolate_row_count
+from .selection import HEAD_STAGES
+from .sharding import ShardedAnalyzer, can_shard
+from .streaming import StreamingAnalyzer
+from .types import AnalysisResults, CsvOptions, ProgressCallback
+from .utils import get_file_extension, open_arrow_source
 
 
 def analyze_dataframe(
@@ -13,7 +27,14 @@ def analyze_dataframe(
     *, 
     max_preview_rows: int, 
     max_corr_cols: int, 
-    filename: Optional[str] = None
+    filename: Optional[str] = None,
+    top_correlations: int = DEFAULT_TOP_CORRELATIONS,
+    shard_workers: int = 0,
+    shard_min_columns: int = DEFAULT_SHARD_MIN_COLUMNS,
+    quantile_mode: str = "exact",
+    quantile_error: float = DEFAULT_QUANTILE_ERROR,
+    optimize_memory: bool = False,
+    stages: Optional[FrozenSet[str]] = None
 ) -> AnalysisResults:
     """
     Analyze a DataFrame and return comprehensive statistics and insights.
@@ -23,12 +44,25 @@ def analyze_dataframe(
         max_preview_rows: Maximum number of rows to include in preview
         max_corr_cols: Maximum number of columns to include in correlation analysis
         filename: Optional filename for metadata
+        top_correlations: Number of strongest column pairs to report, searched across all numeric columns
+        shard_workers: With 2 or more, frames of at least ``shard_min_columns`` columns are
+            analyzed by sharding their columns across that many processes
+        shard_min_columns: Narrowest frame worth sharding
+        quantile_mode: "exact" for exact quantiles, "sketch" for mergeable sketches
+        quantile_error: Rank error bound of sketched quantiles
+        optimize_memory: Narrow integer columns and dictionary-encode repetitive
+            strings before analysis (the caller's frame is not modified)
+        stages: Run only these of ``SELECTABLE_STAGES`` (default: all); see ``resolve_stages``
     
     Returns:
         Dictionary containing analysis results including metadata, statistics, and insights
     """
-    analyzer = DataFrameAnalyzer(df, filename)
-    return analyzer.analyze(max_preview_rows, max_corr_cols)
+    quantile_options = {"quantile_mode": quantile_mode, "quantile_error": quantile_error}
+    if shard_workers > 1 and can_shard(df, shard_min_columns):
+        analyzer = ShardedAnalyzer(df, filename, workers=shard_workers, **quantile_options)
+    else:
+        analyzer = DataFrameAnalyzer(df, filename, optimize_memory=optimize_memory, **quantile_options)
+    return analyzer.analyze(max_preview_rows, max_corr_cols, top_correlations=top_correlations, stages=stages)
 
 
 def load_dataframe_from_upload(filename: str, raw: bytes, use_pyarrow: bool = True) -> pd.DataFrame:
@@ -48,3 +82,497 @@ def load_dataframe_from_upload(filename: str, raw: bytes, use_pyarrow: bool = Tr
     """
     loader = DataFrameLoader()
     return loader.load_from_upload(filename, raw, use_pyarrow)
+
+
+class UploadParseError(ValueError):
+    """Raised when an uploaded file cannot be parsed into a DataFrame."""
+
+
+def analyze_upload_bytes(
+    filename: str,
+    raw: Union[bytes, str],
+    *,
+    max_preview_rows: int,
+    max_corr_cols: int,
+    use_pyarrow: bool = True,
+    engine: str = "pandas",
+    parquet_fast_path: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    top_correlations: int = DEFAULT_TOP_CORRELATIONS,
+    shard_workers: int = 0,
+    shard_min_columns: int = DEFAULT_SHARD_MIN_COLUMNS,
+    quantile_mode: str = "exact",
+    quantile_error: float = DEFAULT_QUANTILE_ERROR,
+    sheet: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    optimize_memory: bool = False,
+    csv_options: Optional[CsvOptions] = None,
+    columns: Optional[Sequence[str]] = None,
+    stages: Optional[FrozenSet[str]] = None
+) -> AnalysisResults:
+    """
+    Load and analyze an uploaded file in one call.
+    
+    This is the unit of work submitted to the analysis worker pool, so parsing
+    and analysis both run off the event loop (and, with a process pool, without
+    shipping a DataFrame between processes). The loaded frame is owned by this
+    call, so the analyzer skips its defensive copy.
+    
+    Args:
+        raw: The upload's bytes, or the path it was spooled to; paths are
+            memory-mapped by the parsers rather than read into memory
+        engine: "pandas" for the DataFrame path, "arrow" to load a ``pyarrow.Table``
+            and compute statistics with ``pyarrow.compute``
+        parquet_fast_path: With the Arrow engine, read only the Parquet columns
+            that need a full pass and answer the rest from footer statistics
+        progress: Called with each stage name ("load", then the analyzer's
+            stages) as it starts; raising from it aborts the work
+        top_correlations: Number of strongest column pairs to report
+        shard_workers: With 2 or more, wide tables (at least ``shard_min_columns``
+            columns) are analyzed by ``ShardedAnalyzer`` across that many processes;
+            Parquet answered from footer statistics is never sharded
+        shard_min_columns: Narrowest table worth sharding
+        quantile_mode: "exact" for exact quantiles, "sketch" for mergeable sketches
+        quantile_error: Rank error bound of sketched quantiles
+        sheet: Excel only: worksheet name or position to analyze (default: the first)
+        max_rows: Excel only: read at most this many data rows
+        optimize_memory: With the pandas engine, narrow integer columns and
+            dictionary-encode repetitive strings right after parsing; the
+            frame's size before and after is reported in ``meta["memory"]``,
+            while ``columns`` still reports the dtypes as parsed
+        csv_options: CSV/TSV parse engine, block size, threads and type
+            inference window (see ``CsvOptions``)
+        columns: Parse and analyze only these columns, in this order
+        stages: Run only these of ``SELECTABLE_STAGES`` (default: all); the
+            sections of the others are left empty
+    
+    Raises:
+        UploadParseError: If the file cannot be parsed
+        Exception: If analysis of the parsed DataFrame fails
+    """
+    if progress is not None:
+        progress("load")
+    quantile_options = {"quantile_mode": quantile_mode, "quantile_error": quantile_error}
+    if engine == "arrow" and parquet_fast_path and get_file_extension(filename) in PARQUET_EXTENSIONS:
+        try:
+            analyzer = DataFrameAnalyzer.from_parquet(
+                open_arrow_source(raw), filename, columns=columns, **quantile_options
+            )
+        except Exception as e:
+            raise UploadParseError(str(e)) from e
+        return analyzer.analyze(max_preview_rows, max_corr_cols, progress, top_correlations, stages)
+
+    loader = DataFrameLoader(csv_options)
+    try:
+        with record_stage("parse"):
+            if engine == "arrow":
+                table = loader.load_table_from_upload(filename, raw, sheet, max_rows, columns)
+            else:
+                df = loader.load_from_upload(filename, raw, use_pyarrow, sheet, max_rows, columns)
+    except Exception as e:
+        raise UploadParseError(str(e)) from e
+
+    if shard_workers > 1:
+        frame = table_to_frame(table) if engine == "arrow" else df
+        if can_shard(frame, shard_min_columns):
+            analyzer = ShardedAnalyzer(frame, filename, workers=shard_workers, engine=engine, **quantile_options)
+            return analyzer.analyze(max_preview_rows, max_corr_cols, progress, top_correlations, stages)
+
+    if engine == "arrow":
+        analyzer = DataFrameAnalyzer.from_arrow(table, filename, **quantile_options)
+    else:
+        analyzer = DataFrameAnalyzer(
+            df, filename, copy=False, engine=engine, optimize_memory=optimize_memory, **quantile_options
+        )
+    return analyzer.analyze(max_preview_rows, max_corr_cols, progress, top_correlations, stages)
+
+
+def analyze_upload_file(filename: str, path: str, **kwargs) -> AnalysisResults:
+    """
+    Analyze an upload spooled to ``path`` with ``analyze_upload_bytes``.
+    
+    The file is memory-mapped rather than read, and only the path crosses
+    into a worker process. Keyword arguments are passed through to
+    ``analyze_upload_bytes``.
+    """
+    return analyze_upload_bytes(filename, path, **kwargs)
+
+
+def profile_dataframe(
+    df: pd.DataFrame,
+    *,
+    max_preview_rows: int,
+    max_corr_cols: int,
+    filename: Optional[str] = None,
+    top_correlations: int = DEFAULT_TOP_CORRELATIONS,
+    quantile_mode: str = "exact",
+    quantile_error: float = DEFAULT_QUANTILE_ERROR,
+    optimize_memory: bool = False,
+    sample_rows: int = DEFAULT_PROFILE_SAMPLE_ROWS,
+    correlation_columns: int = DEFAULT_PROFILE_CORRELATION_COLUMNS,
+    kept_pairs: int = DEFAULT_PROFILE_TOP_CORRELATIONS,
+    copy: bool = True,
+    progress: Optional[ProgressCallback] = None
+) -> DatasetProfile:
+    """
+    Analyze a DataFrame like ``analyze_dataframe`` and keep a ``DatasetProfile`` of it.
+
+    Profiles are always built in one process, whatever the frame's width.
+    
+    Args:
+        sample_rows: Rows of the downsampled copy kept for paging
+        correlation_columns: Highest-variance numeric columns whose correlations are kept,
+            bounding the ``max_corr_cols`` a re-analysis can ask for
+        kept_pairs: Strongest pairs kept, bounding the ``top_correlations`` a re-analysis can ask for
+        copy: Whether the analyzer works on a shallow copy of ``df`` (see ``DataFrameAnalyzer``)
+
+    The other arguments are those of ``analyze_dataframe``.
+    """
+    analyzer = DataFrameAnalyzer(
+        df, filename, copy=copy, optimize_memory=optimize_memory,
+        quantile_mode=quantile_mode, quantile_error=quantile_error,
+    )
+    return DatasetProfile.build(
+        analyzer,
+        max_preview_rows=max_preview_rows,
+        max_corr_cols=max_corr_cols,
+        top_correlations=top_correlations,
+        sample_rows=sample_rows,
+        correlation_columns=correlation_columns,
+        kept_pairs=kept_pairs,
+        progress=progress,
+    )
+
+
+def profile_upload_file(
+    filename: str,
+    path: str,
+    *,
+    use_pyarrow: bool = True,
+    sheet: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    csv_options: Optional[CsvOptions] = None,
+    columns: Optional[Sequence[str]] = None,
+    progress: Optional[ProgressCallback] = None,
+    **kwargs
+) -> DatasetProfile:
+    """
+    Parse an upload spooled to ``path`` and profile it with ``profile_dataframe``.
+
+    Parsing takes the options of ``analyze_upload_bytes``; the remaining
+    keyword arguments are passed through to ``profile_dataframe``.
+    
+    Raises:
+        UploadParseError: If the file cannot be parsed
+    """
+    if progress is not None:
+        progress("load")
+    loader = DataFrameLoader(csv_options)
+    try:
+        with record_stage("parse"):
+            df = loader.load_from_upload(filename, path, use_pyarrow, sheet, max_rows, columns)
+    except Exception as e:
+        raise UploadParseError(str(e)) from e
+    return profile_dataframe(df, filename=filename, copy=False, progress=progress, **kwargs)
+
+
+def analyze_delimited_stream(
+    filename: str,
+    source: Union[str, BinaryIO],
+    *,
+    max_preview_rows: int,
+    max_corr_cols: int,
+    use_pyarrow: bool = True,
+    block_size: int = DEFAULT_STREAM_BLOCK_BYTES,
+    progress: Optional[ProgressCallback] = None,
+    top_correlations: int = DEFAULT_TOP_CORRELATIONS,
+    quantile_error: float = DEFAULT_QUANTILE_ERROR,
+    columns: Optional[Sequence[str]] = None,
+    stages: Optional[FrozenSet[str]] = None
+) -> AnalysisResults:
+    """
+    Analyze a CSV or TSV file batch by batch with bounded memory.
+    
+    Args:
+        filename: Name of the uploaded file (selects the delimiter)
+        source: Path or binary file object to read from
+        max_preview_rows: Maximum number of rows to include in preview
+        max_corr_cols: Maximum number of columns to include in correlation analysis
+        use_pyarrow: Whether batches use pyarrow-backed dtypes
+        block_size: Approximate number of bytes parsed per batch
+        progress: Called with "load" before every batch, then with each
+            result stage; raising from it aborts the work
+        top_correlations: Number of strongest column pairs to report
+        quantile_error: Rank error bound of the per-column quantile sketches
+        columns: Parse and analyze only these columns, in this order
+        stages: Run only these of ``SELECTABLE_STAGES`` (default: all); with
+            only ``HEAD_STAGES``, parsing stops after the preview rows
+    
+    Returns:
+        Analysis results in the same shape as ``analyze_dataframe``
+    
+    Raises:
+        UploadParseError: If the file cannot be parsed
+    """
+    loader = DataFrameLoader()
+    batches = loader.iter_delimited_batches(source, get_file_extension(filename), use_pyarrow, block_size, columns)
+    row_count = (lambda: extrapolate_row_count(source, SCHEMA_EXACT_COUNT_BYTES)) if isinstance(source, str) else None
+    return _analyze_batches(
+        filename, batches, max_preview_rows, max_corr_cols, progress, top_correlations, quantile_error, stages,
+        row_count,
+    )
+
+
+def analyze_excel_stream(
+    filename: str,
+    source: Union[str, BinaryIO],
+    *,
+    max_preview_rows: int,
+    max_corr_cols: int,
+    sheet: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    batch_rows: int = EXCEL_BATCH_ROWS,
+    progress: Optional[ProgressCallback] = None,
+    top_correlations: int = DEFAULT_TOP_CORRELATIONS,
+    quantile_error: float = DEFAULT_QUANTILE_ERROR,
+    columns: Optional[Sequence[str]] = None,
+    stages: Optional[FrozenSet[str]] = None
+) -> AnalysisResults:
+    """
+    Analyze one sheet of an .xlsx workbook batch by batch with bounded memory.
+    
+    Args:
+        filename: Name of the uploaded file
+        source: Path or binary file object to read from
+        max_preview_rows: Maximum number of rows to include in preview
+        max_corr_cols: Maximum number of columns to include in correlation analysis
+        sheet: Worksheet name or position (default: the first sheet)
+        max_rows: Read at most this many data rows
+        batch_rows: Number of rows parsed per batch
+        progress: Called with "load" before every batch, then with each
+            result stage; raising from it aborts the work
+        top_correlations: Number of strongest column pairs to report
+        quantile_error: Rank error bound of the per-column quantile sketches
+        columns: Parse and analyze only these columns, in this order
+        stages: Run only these of ``SELECTABLE_STAGES`` (default: all); with
+            only ``HEAD_STAGES``, parsing stops after the preview rows
+    
+    Returns:
+        Analysis results in the same shape as ``analyze_dataframe``
+    
+    Raises:
+        UploadParseError: If the workbook cannot be parsed
+    """
+    loader = DataFrameLoader()
+    batches = loader.iter_excel_batches(source, sheet, max_rows, batch_rows, columns)
+
+    def row_count() -> Optional[Tuple[int, bool]]:
+        rows = estimate_row_count(filename, source, sheet) if isinstance(source, str) else None
+        return None if rows is None else (rows if max_rows is None else min(rows, max_rows), True)
+
+    return _analyze_batches(
+        filename, batches, max_preview_rows, max_corr_cols, progress, top_correlations, quantile_error, stages,
+        row_count,
+    )
+
+
+def analyze_sample(
+    filename: str,
+    source: Union[str, bytes, BinaryIO],
+    *,
+    max_preview_rows: int,
+    max_corr_cols: int,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    use_pyarrow: bool = True,
+    block_size: int = DEFAULT_STREAM_BLOCK_BYTES,
+    sheet: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    top_correlations: int = DEFAULT_TOP_CORRELATIONS,
+    quantile_mode: str = "exact",
+    quantile_error: float = DEFAULT_QUANTILE_ERROR,
+    seed: int = 0,
+    columns: Optional[Sequence[str]] = None,
+    stages: Optional[FrozenSet[str]] = None
+) -> AnalysisResults:
+    """
+    Analyze a uniform random sample of an upload's rows.
+    
+    The upload is parsed batch by batch while a ``RowSampler`` keeps
+    ``sample_rows`` rows, so the analysis costs the same however large the
+    file is. Row counts, missing values, non-missing counts, min/max and the
+    preview are exact; every other statistic is estimated from the sample and
+    reported with a confidence interval. ``meta["sample"]`` records the
+    sample size and fraction.
+    
+    Args:
+        filename: Name of the uploaded file (selects the format)
+        source: Raw bytes, a path, or a binary file object
+        max_preview_rows: Maximum number of rows to include in preview
+        max_corr_cols: Maximum number of columns to include in correlation analysis
+        sample_rows: Number of rows to sample
+        use_pyarrow: Whether batches use pyarrow-backed dtypes
+        block_size: Approximate number of bytes parsed per CSV/TSV batch
+        sheet: Worksheet name or position for Excel workbooks
+        max_rows: Read at most this many data rows
+        progress: Called with "load" before every batch, then with each
+            result stage; raising from it aborts the work
+        top_correlations: Number of strongest column pairs to report
+        quantile_mode: "exact" or "sketch" quantiles over the sample
+        quantile_error: Rank error bound when ``quantile_mode`` is "sketch"
+        seed: Seed of the sampler, so repeated runs pick the same rows
+        columns: Parse and analyze only these columns, in this order
+        stages: Run only these of ``SELECTABLE_STAGES`` (default: all)
+    
+    Returns:
+        Analysis results in the same shape as ``analyze_dataframe``
+    
+    Raises:
+        UploadParseError: If the upload cannot be parsed
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    sampler = RowSampler(sample_rows, max_preview_rows=max_preview_rows, seed=seed)
+    loader = DataFrameLoader()
+    batches = loader.iter_upload_batches(filename, source, use_pyarrow, block_size, sheet, max_rows, columns)
+    fold_batches(sampler, batches, progress)
+    analyzer = DataFrameAnalyzer.from_sample(
+        sampler, filename, quantile_mode=quantile_mode, quantile_error=quantile_error
+    )
+    return analyzer.analyze(max_preview_rows, max_corr_cols, progress, top_correlations, stages)
+
+
+def analyze_schema(
+    filename: str,
+    source: Union[str, bytes],
+    *,
+    max_preview_rows: int,
+    use_pyarrow: bool = True,
+    sheet: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    optimize_memory: bool = False,
+    csv_options: Optional[CsvOptions] = None,
+    columns: Optional[Sequence[str]] = None,
+    stages: FrozenSet[str] = HEAD_STAGES
+) -> AnalysisResults:
+    """
+    Describe an upload's columns and first rows without parsing the rest of it.
+    
+    Only the first ``SCHEMA_SAMPLE_ROWS`` data rows are parsed, so the cost
+    does not grow with the file. Column types and semantics are inferred
+    from those rows (``meta["schema_rows"]``). ``meta["rows"]`` comes from
+    the Parquet footer, the .xlsx sheet dimension, or the line breaks of a
+    CSV/TSV file; beyond ``SCHEMA_EXACT_COUNT_BYTES`` those are extrapolated
+    from the file's prefix and ``meta["rows_estimated"]`` is set.
+    
+    Args:
+        filename: Name of the uploaded file (selects the format)
+        source: Raw bytes or a path
+        max_preview_rows: Maximum number of rows to include in preview
+        use_pyarrow: Whether columns use pyarrow-backed dtypes
+        sheet: Worksheet name or position for Excel workbooks
+        max_rows: Excel only: consider at most this many data rows
+        progress: Called with "load", then with each stage as it starts
+        optimize_memory: Optimize dtypes as ``analyze_upload_bytes`` would, so
+            the reported dtypes match a full analysis
+        csv_options: Parse CSV/TSV heads with this engine, as ``analyze_upload_bytes`` would
+        columns: Describe only these columns, in this order
+        stages: A subset of ``HEAD_STAGES``
+    
+    Raises:
+        ValueError: If ``stages`` needs more than the first rows
+        UploadParseError: If the upload cannot be parsed
+    """
+    if not stages <= HEAD_STAGES:
+        raise ValueError(f"Schema analysis only covers the stages: {', '.join(sorted(HEAD_STAGES))}")
+    if progress is not None:
+        progress("load")
+    limit = SCHEMA_SAMPLE_ROWS if max_rows is None else min(SCHEMA_SAMPLE_ROWS, max_rows)
+    loader = DataFrameLoader(csv_options)
+    try:
+        with record_stage("parse"):
+            head = loader.load_head(
+                filename, source, limit, use_pyarrow, sheet, columns
+            )
+            rows, exact = len(head), True
+            if len(head) >= limit:
+                if get_file_extension(filename) in DELIMITED_EXTENSIONS:
+                    rows, exact = extrapolate_row_count(source, SCHEMA_EXACT_COUNT_BYTES)
+                else:
+                    rows = estimate_row_count(filename, source, sheet) or rows
+    except Exception as e:
+        raise UploadParseError(str(e)) from e
+
+    analyzer = DataFrameAnalyzer(head, filename, copy=False, optimize_memory=optimize_memory)
+    results = analyzer.analyze(max_preview_rows, 0, progress, stages=stages)
+    meta = results["meta"]
+    meta["rows"] = rows if max_rows is None else min(rows, max_rows)
+    meta["schema_rows"] = len(head)
+    if not exact:
+        meta["rows_estimated"] = True
+    return results
+
+
+def _analyze_batches(
+    filename: str,
+    batches: Iterator[pd.DataFrame],
+    max_preview_rows: int,
+    max_corr_cols: int,
+    progress: Optional[ProgressCallback],
+    top_correlations: int,
+    quantile_error: float,
+    stages: Optional[FrozenSet[str]] = None,
+    row_count: Optional[Callable[[], Optional[Tuple[int, bool]]]] = None
+) -> AnalysisResults:
+    """
+    Analyze parsed batches with a new ``StreamingAnalyzer`` accumulating only what ``stages`` report.
+
+    When only ``HEAD_STAGES`` are requested, parsing stops once the preview
+    is complete and ``meta["rows"]`` comes from ``row_count``, which returns
+    a cheap count and whether it is exact (``None`` if there is none: the
+    remaining rows are then parsed and counted).
+    """
+    analyzer = StreamingAnalyzer(
+        filename, max_preview_rows=max_preview_rows, quantile_error=quantile_error, stages=stages
+    )
+    counted = None
+    if stages is not None and stages <= HEAD_STAGES:
+        fold_batches(analyzer, _head_batches(analyzer, batches), progress)
+        if "preview" not in stages or len(analyzer.preview) >= max_preview_rows:
+            counted = row_count() if row_count is not None else None
+    if counted is None:
+        fold_batches(analyzer, batches, progress)
+    results = analyzer.results(max_corr_cols, progress, top_correlations, stages)
+    if counted is not None:
+        results["meta"]["rows"], exact = counted
+        if not exact:
+            results["meta"]["rows_estimated"] = True
+    return results
+
+
+def _head_batches(analyzer: StreamingAnalyzer, batches: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """``batches`` up to the one completing the analyzer's preview (at least one)."""
+    for batch in batches:
+        yield batch
+        if "preview" not in analyzer.stages or len(analyzer.preview) >= analyzer.max_preview_rows:
+            return
+
+
+def fold_batches(
+    analyzer: Union[StreamingAnalyzer, RowSampler],
+    batches: Iterator[pd.DataFrame],
+    progress: Optional[ProgressCallback] = None
+) -> None:
+    """Fold parsed batches into ``analyzer``; parse errors become ``UploadParseError``."""
+    while True:
+        if progress is not None:
+            progress("load")
+        try:
+            with record_stage("parse"):
+                batch = next(batches)
+        except StopIteration:
+            break
+        except Exception as e:
+            raise UploadParseError(str(e)) from e
+        analyzer.update(batch)
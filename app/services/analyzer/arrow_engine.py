@@ -0,0 +1,129 @@
+"""Arrow-native analysis engine backed by ``pyarrow.compute``."""
+
+from typing import Any, Dict, Optional, Tuple
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .constants import REPORTED_QUANTILES
+from .context import AnalysisContext
+from .quantiles import quantile_label
+
+SUMMARY_COLUMNS = ["count", "mean", "std", "min", *map(quantile_label, REPORTED_QUANTILES), "max"]
+
+
+def frame_dtype(arrow_type: pa.DataType) -> Optional[pd.ArrowDtype]:
+    """
+    The ``ArrowDtype`` an Arrow column is wrapped as, or ``None`` for timestamps and dates.
+
+    Those convert to ``datetime64[ns]`` instead, as the pandas engine loads
+    them, so time columns are recognized as such whichever engine read them.
+    """
+    if pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def table_to_frame(table: pa.Table) -> pd.DataFrame:
+    """Wrap an Arrow table as a DataFrame of ``ArrowDtype`` columns without copying buffers (see ``frame_dtype``)."""
+    return table.to_pandas(types_mapper=frame_dtype, date_as_object=False, coerce_temporal_nanoseconds=True)
+
+
+def column_array(series: pd.Series) -> pa.ChunkedArray:
+    """The Arrow data behind a Series (zero-copy for ``ArrowDtype`` and null-free numeric columns)."""
+    array = pa.array(series.array) if not isinstance(series.dtype, pd.ArrowDtype) else series.array.__arrow_array__()
+    return array if isinstance(array, pa.ChunkedArray) else pa.chunked_array([array])
+
+
+def _without_nan(array: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Treat NaN as missing in floating columns, matching pandas' skipna semantics."""
+    if pa.types.is_floating(array.type) and pc.any(pc.is_nan(array)).as_py():
+        return pc.if_else(pc.is_nan(array), pa.scalar(None, array.type), array)
+    return array
+
+
+class ArrowAnalysisContext(AnalysisContext):
+    """
+    Analysis context that computes statistics directly on Arrow arrays.
+
+    Null counts come from Arrow metadata, and count/mean/variance/min/max and
+    exact quantiles run as ``pyarrow.compute`` kernels. NumPy buffers are only
+    materialized for the float64 matrix used by trends and correlations, and
+    zero-copy where the Arrow layout allows it.
+    """
+
+    def arrow_column(self, column: str) -> pa.ChunkedArray:
+        """Arrow array of a column, with NaN treated as missing for numeric columns."""
+        return self.memoize(("arrow_column", column), lambda: _without_nan(column_array(self.df[column])))
+
+    def _numeric_vector(self, column: str) -> np.ndarray:
+        array = self.arrow_column(column)
+        if array.num_chunks == 1 and array.null_count == 0 and pa.types.is_float64(array.type):
+            return array.chunk(0).to_numpy(zero_copy_only=True)
+        # Unchecked, so integers beyond 2**53 round as they do in pandas instead of failing the cast
+        return array.cast(pa.float64(), safe=False).to_numpy(zero_copy_only=False)
+
+    @property
+    def numeric_matrix(self) -> np.ndarray:
+        def build() -> np.ndarray:
+            matrix = np.empty((len(self.df), len(self.numeric_columns)), dtype="float64", order="F")
+            for index, column in enumerate(self.numeric_columns):
+                matrix[:, index] = self._numeric_vector(column)
+            return matrix
+
+        return self.memoize("numeric_matrix", build)
+
+    def missing_counts(self) -> Dict[str, int]:
+        numeric = set(self.numeric_columns)
+        return {
+            column: int(self.arrow_column(column).null_count if column in numeric
+                        else column_array(self.df[column]).null_count)
+            for column in self.df.columns
+        }
+
+    def _compute_quantiles(self) -> np.ndarray:
+        if self.quantile_mode != "exact":
+            return super()._compute_quantiles()
+        # One selection kernel per column for all reported quantiles
+        result = np.full((len(REPORTED_QUANTILES), len(self.numeric_columns)), np.nan)
+        for index, column in enumerate(self.numeric_columns):
+            array = self.arrow_column(column)
+            if len(array) > array.null_count:
+                result[:, index] = pc.quantile(array, q=list(REPORTED_QUANTILES), interpolation="linear").to_pylist()
+        return result
+
+    def numeric_summary(self) -> pd.DataFrame:
+        quantiles = self.quantiles().to_numpy()
+        rows = {}
+        for index, column in enumerate(self.numeric_columns):
+            array = self.arrow_column(column)
+            count = len(array) - array.null_count
+            if count == 0:
+                rows[column] = [0.0] + [np.nan] * (len(SUMMARY_COLUMNS) - 1)
+                continue
+            minimum, maximum = self._min_max(column, array)
+            rows[column] = [
+                float(count),
+                pc.mean(array).as_py(),
+                pc.stddev(array, ddof=1).as_py() if count > 1 else np.nan,
+                minimum,
+                *quantiles[:, index].tolist(),
+                maximum,
+            ]
+        return pd.DataFrame.from_dict(rows, orient="index", columns=SUMMARY_COLUMNS, dtype="float64")
+
+    def _min_max(self, column: str, array: pa.ChunkedArray) -> Tuple[Any, Any]:
+        """Minimum and maximum of a non-empty numeric column."""
+        min_max = pc.min_max(array)
+        return min_max["min"].as_py(), min_max["max"].as_py()
+
+    def column_variances(self) -> pd.Series:
+        return pd.Series(
+            {
+                column: pc.variance(self.arrow_column(column), ddof=1).as_py()
+                for column in self.numeric_columns
+            },
+            index=self.numeric_columns,
+            dtype="float64",
+        )
@@ -0,0 +1,96 @@
+"""Cross-file comparison of analysis results: schema differences and shifts in numeric statistics."""
+
+from typing import Dict, List, Optional, Sequence
+
+from .types import AnalysisResults, NumericComparison, ResultComparison, SchemaComparison
+
+_COMPARED_STATS = ("count", "mean", "std", "min", "max")
+# Logical kinds by dtype name prefix (NumPy, pandas and Arrow names); anything else is text
+_DTYPE_KINDS = (
+    (("int", "uint"), "integer"),
+    (("float", "double", "halffloat", "decimal"), "float"),
+    (("bool",), "boolean"),
+    (("datetime", "timestamp", "date"), "datetime"),
+    (("timedelta", "duration"), "timedelta"),
+)
+
+
+def _dtype_kind(dtype: str) -> str:
+    """
+    The logical kind of a dtype name.
+
+    Storage choices, such as Arrow-backed, downcast or dictionary-encoded
+    columns, do not change the kind, so files read by different engines
+    compare equal.
+    """
+    name = dtype.lower().removesuffix("[pyarrow]")
+    for prefixes, kind in _DTYPE_KINDS:
+        if name.startswith(prefixes):
+            return kind
+    return "text"
+
+
+def _compare_schemas(results: Sequence[AnalysisResults]) -> SchemaComparison:
+    dtypes = [{column["name"]: column["dtype"] for column in result["columns"]} for result in results]
+    ordered: Dict[str, None] = {}
+    for file_dtypes in dtypes:
+        ordered.update(dict.fromkeys(file_dtypes))
+
+    common, differences = [], {}
+    for column in ordered:
+        per_file = [file_dtypes.get(column) for file_dtypes in dtypes]
+        if None not in per_file:
+            common.append(column)
+        if None in per_file or len({_dtype_kind(dtype) for dtype in per_file}) > 1:
+            differences[column] = per_file
+    return {"common_columns": common, "differences": differences}
+
+
+def _mean_shift(
+    mean: Optional[float], reference_mean: Optional[float], reference_std: Optional[float]
+) -> Optional[float]:
+    if mean is None or reference_mean is None:
+        return None
+    if not reference_std:
+        return 0.0 if mean == reference_mean else None
+    return (mean - reference_mean) / reference_std
+
+
+def _compare_numeric(results: Sequence[AnalysisResults]) -> Dict[str, NumericComparison]:
+    ordered: Dict[str, None] = {}
+    for result in results:
+        ordered.update(dict.fromkeys(result["numeric_stats"]))
+
+    comparisons = {}
+    for column in ordered:
+        stats = [result["numeric_stats"].get(column) for result in results]
+        comparison = {
+            field: [entry[field] if entry is not None else None for entry in stats] for field in _COMPARED_STATS
+        }
+        comparison["missing"] = [
+            result["missing"].get(column) if entry is not None else None for result, entry in zip(results, stats)
+        ]
+        reference_mean, reference_std = comparison["mean"][0], comparison["std"][0]
+        comparison["mean_shift"] = [_mean_shift(mean, reference_mean, reference_std) for mean in comparison["mean"]]
+        comparisons[column] = comparison
+    return comparisons
+
+
+def compare_results(filenames: List[str], results: Sequence[AnalysisResults]) -> ResultComparison:
+    """
+    Compare the analyses of several files, the first being the reference.
+
+    Reports the columns every file shares, each column whose presence or
+    kind of dtype (integer, float, text...) differs between files, and, for every numeric column, its count,
+    missing values, mean, spread and range in each file with the shift of
+    its mean from the reference's, in reference standard deviations. Per-file
+    values are lists in file order, ``None`` where a file lacks the column.
+    Only what the analyses computed is compared: without the stats stage,
+    ``numeric`` is empty.
+    """
+    return {
+        "files": list(filenames),
+        "rows": [result["meta"]["rows"] for result in results],
+        "schema": _compare_schemas(results),
+        "numeric": _compare_numeric(results),
+    }
@@ -1,6 +1,9 @@
 """Constants and configuration for DataFrame analysis."""
 
-from typing import Tuple
+from typing import Dict, Tuple
+
+# Bump whenever analysis output changes so cached results are invalidated
+ANALYZER_VERSION = "9"
 
 # Data type constants
 NUMERIC_DTYPES = [
@@ -17,10 +20,102 @@ ID_KEYWORDS: Tuple[str, ...] = ("id", "_id")
 # Thresholds for analysis
 CATEGORICAL_THRESHOLD_RATIO = 0.05
 CATEGORICAL_MIN_UNIQUE = 20
+# Memory optimization: string columns with at most this share of distinct values become ``category``
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+SEMANTIC_SAMPLE_SIZE = 2048
+DATETIME_PROBE_SIZE = 32
+CARDINALITY_CHUNK_ROWS = 65536
+DEFAULT_HLL_PRECISION = 12
 MIN_TREND_R2 = 0.2
 MIN_TREND_OBSERVATIONS = 5
 MAX_TRENDS_TO_RETURN = 5
 
+# Time-aware trends over a datetime x-axis. Slopes are reported per calendar unit: the largest no
+# longer than the typical spacing of distinct timestamps (months and years of average length),
+# or coarser for long spans
+TIME_UNITS: Tuple[Tuple[str, float], ...] = (
+    ("second", 1e9),
+    ("minute", 60e9),
+    ("hour", 3600e9),
+    ("day", 86400e9),
+    ("week", 7 * 86400e9),
+    ("month", 30.436875 * 86400e9),
+    ("quarter", 91.310625 * 86400e9),
+    ("year", 365.2425 * 86400e9),
+)
+# Rows are resampled to per-unit means; the unit is coarsened until the span fits in this many
+MAX_TIME_SERIES_POINTS = 10_000
+# Most recent resampled points of the rolling trend
+ROLLING_TREND_POINTS = 30
+# Change points: binary segmentation of piecewise-linear fits, splitting while a split lowers the
+# squared error by more than CHANGE_POINT_PENALTY noise variances per log(points)
+MIN_SEGMENT_POINTS = 8
+MAX_CHANGE_POINTS = 5
+CHANGE_POINT_PENALTY = 6.0
+MAX_CHANGE_POINTS_TO_RETURN = 10
+# Columns resampled and segmented together
+TIME_SERIES_BLOCK_COLUMNS = 64
+# Seasonal period checked at each unit, and the share of variance around the trend reported from
+SEASONAL_PERIODS: Dict[str, int] = {"second": 60, "minute": 60, "hour": 24, "day": 7, "week": 52, "month": 12, "quarter": 4}
+MIN_SEASONAL_STRENGTH = 0.3
+DEFAULT_TOP_CORRELATIONS = 10
+
+# Quantiles reported for every numeric column, all taken from one shared pass
+REPORTED_QUANTILES: Tuple[float, ...] = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+# Rank error bound of sketched quantiles, as a fraction of the column's count
+DEFAULT_QUANTILE_ERROR = 0.005
+# Values sorted per block for exact quantiles, bounding the sorted copy
+QUANTILE_BLOCK_VALUES = 1 << 23
+
+# Streaming analysis
+DEFAULT_SKETCH_K = 256
+DEFAULT_STREAM_BLOCK_BYTES = 4 * 1024 * 1024
+# Rows per batch when streaming Excel sheets
+EXCEL_BATCH_ROWS = 16384
+# Row block size for matrix passes, bounding temporary arrays on tall frames
+ANALYSIS_BLOCK_ROWS = 65536
+# Column block width of correlation tiles, bounding the pairwise accumulators
+CORRELATION_BLOCK_COLUMNS = 256
+# Column sharding across processes: only worth the IPC setup for wide tables
+DEFAULT_SHARD_MIN_COLUMNS = 512
+# Bytes read at a time when fingerprinting or scanning uploads
+FINGERPRINT_CHUNK_BYTES = 1024 * 1024
+# Sampled analysis: rows kept in the uniform sample, and the confidence level of its intervals
+DEFAULT_SAMPLE_ROWS = 100_000
+SAMPLE_CONFIDENCE_LEVEL = 0.95
+# Dataset profiles: rows of the downsampled copy, highest-variance columns whose correlations
+# are kept, and strongest pairs kept for re-ranking without the data
+DEFAULT_PROFILE_SAMPLE_ROWS = 100_000
+DEFAULT_PROFILE_CORRELATION_COLUMNS = 256
+DEFAULT_PROFILE_TOP_CORRELATIONS = 100
+# CSV/TSV parsing: "pandas" (C parser, one thread) or "pyarrow" (pyarrow.csv, multi-threaded blocks)
+CSV_ENGINES: Tuple[str, ...] = ("pandas", "pyarrow")
+DEFAULT_CSV_BLOCK_BYTES = 1024 * 1024
+# Cells read as missing by every CSV engine: pandas' default ``na_values``
+CSV_NULL_VALUES: Tuple[str, ...] = (
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+)
+# Leading text inspected to sniff the delimiter and encoding, and the complete lines compared
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_SNIFF_LINES = 20
+# Delimiters tried after the one the extension implies
+CSV_DELIMITERS: Tuple[str, ...] = (",", "\t", ";", "|")
+# Compressed CSV/TSV uploads, recognized by magic number (the suffix is only a hint for routing)
+COMPRESSION_MAGIC: Dict[bytes, str] = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\x28\xb5\x2f\xfd": "zstd"}
+COMPRESSION_SUFFIXES = {".gz", ".bz2", ".zst"}
+# Row groups sampled to describe Parquet columns that are not read in full
+PARQUET_SAMPLE_ROW_GROUPS = 8
+
+# Analysis stages, in the order they run (reported to progress callbacks)
+ANALYSIS_STAGES: Tuple[str, ...] = ("load", "columns", "stats", "correlations", "trends", "insights")
+# Result stages a request can include or exclude, in the order they run
+SELECTABLE_STAGES: Tuple[str, ...] = ("columns", "preview", "stats", "correlations", "trends", "insights")
+# Rows parsed to describe columns when only the schema and preview are requested; CSV/TSV rows
+# are counted exactly up to SCHEMA_EXACT_COUNT_BYTES and extrapolated from that prefix beyond
+SCHEMA_SAMPLE_ROWS = 10_000
+SCHEMA_EXACT_COUNT_BYTES = 64 * 1024 * 1024
+
 # File format constants
 EXCEL_EXTENSIONS = {".xlsx", ".xls"}
 DELIMITED_EXTENSIONS = {".csv", ".tsv"}
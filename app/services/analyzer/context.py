@@ -0,0 +1,173 @@
+"""Shared, memoized analysis context for a single DataFrame."""
+
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, TypeVar
+import pandas as pd
+import numpy as np
+
+from .constants import DEFAULT_QUANTILE_ERROR, REPORTED_QUANTILES
+from .correlation import CorrelationEngine
+from .quantiles import QUANTILE_MODES, exact_quantiles, quantile_label, sketch_quantiles
+from .types import ConfidenceIntervals, SampleInfo
+
+T = TypeVar("T")
+
+
+class AnalysisContext:
+    """
+    Single-pass view of a DataFrame shared by every analyzer.
+
+    Expensive intermediate results (numeric column extraction, the float64
+    matrix, statistics, correlations, trends) are computed at most once per
+    context and reused by all consumers. ``stage_counts`` records how many
+    times each stage was actually computed, which makes the caching easy to
+    assert on.
+
+    Quantiles are exact by default (``quantile_mode="exact"``); ``"sketch"``
+    estimates them from mergeable sketches whose rank error stays within
+    ``quantile_error``.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        quantile_mode: str = "exact",
+        quantile_error: float = DEFAULT_QUANTILE_ERROR
+    ):
+        if quantile_mode not in QUANTILE_MODES:
+            raise ValueError(f"Unknown quantile mode {quantile_mode!r}; expected one of {', '.join(QUANTILE_MODES)}")
+        self.df = df
+        self.quantile_mode = quantile_mode
+        self.quantile_error = quantile_error
+        self.stage_counts: Counter = Counter()
+        self._cache: Dict[Hashable, Any] = {}
+
+    def memoize(self, stage: Hashable, compute: Callable[[], T]) -> T:
+        """Return the cached value for ``stage``, computing it on first use."""
+        if stage not in self._cache:
+            self.stage_counts[stage] += 1
+            self._cache[stage] = compute()
+        return self._cache[stage]
+
+    def get(self, stage: Hashable, default: Any = None) -> Any:
+        """Return a cached stage value without computing it."""
+        return self._cache.get(stage, default)
+
+    def store(self, stage: Hashable, value: Any) -> None:
+        """Store (or replace) the cached value of a stage and count the computation."""
+        self.stage_counts[stage] += 1
+        self._cache[stage] = value
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows in the dataset."""
+        return len(self.df)
+
+    @property
+    def column_names(self) -> List[str]:
+        """Names of all columns in the dataset."""
+        return list(self.df.columns)
+
+    def column_sample(self, column: str) -> pd.Series:
+        """Values used to describe a column (dtype, semantics); the full column here."""
+        return self.df[column]
+
+    def column_chunks(self, column: str) -> Optional[Iterator[pd.Series]]:
+        """Lazily yield a column in chunks when ``column_sample`` is only a sample."""
+        return None
+
+    def preview_frame(self, max_rows: int) -> pd.DataFrame:
+        """The first ``max_rows`` rows of the dataset."""
+        return self.df.head(max_rows)
+
+    def sample_info(self) -> Optional[SampleInfo]:
+        """How ``df`` was sampled from the dataset, or ``None`` when it holds every row."""
+        return None
+
+    def row_positions(self) -> np.ndarray:
+        """Position of each row of ``df`` in the dataset, as float64 (the trend x-axis without dates)."""
+        return np.arange(len(self.df), dtype="float64")
+
+    @property
+    def numeric_columns(self) -> List[str]:
+        """Names of numeric columns, in DataFrame order."""
+        return list(self.numeric_frame.columns)
+
+    @property
+    def numeric_frame(self) -> pd.DataFrame:
+        """Numeric columns of the DataFrame (selected once)."""
+        return self.memoize("numeric_columns", lambda: self.df.select_dtypes(include=np.number))
+
+    @property
+    def numeric_matrix(self) -> np.ndarray:
+        """Numeric columns as a 2D float64 array with NaN for missing values."""
+        return self.memoize(
+            "numeric_matrix",
+            lambda: self.numeric_frame.to_numpy(dtype="float64", na_value=np.nan),
+        )
+
+    def missing_counts(self) -> Dict[str, int]:
+        """Missing-value count per column."""
+        return self.df.isna().sum().astype(int).to_dict()
+
+    def quantiles(self) -> pd.DataFrame:
+        """
+        ``REPORTED_QUANTILES`` (rows) of every numeric column (columns).
+
+        Computed in one pass and shared by every consumer (statistics,
+        trend spreads), so extra percentiles cost no extra pass.
+        """
+        return self.memoize(
+            "quantiles",
+            lambda: pd.DataFrame(self._compute_quantiles(), index=list(REPORTED_QUANTILES), columns=self.numeric_columns),
+        )
+
+    def _compute_quantiles(self) -> np.ndarray:
+        if self.quantile_mode == "sketch":
+            return sketch_quantiles(self.numeric_matrix, REPORTED_QUANTILES, self.quantile_error)
+        return exact_quantiles(self.numeric_matrix, REPORTED_QUANTILES)
+
+    def numeric_summary(self) -> pd.DataFrame:
+        """
+        One row per numeric column with ``count``, ``mean``, ``std``, ``min``,
+        one ``describe()``-style label per reported quantile (``1%`` ... ``99%``)
+        and ``max``.
+        """
+        frame = self.numeric_frame
+        summary = pd.DataFrame({
+            "count": frame.count(),
+            "mean": frame.mean(),
+            "std": frame.std(),
+            "min": frame.min(),
+        }).astype("float64")
+        for probability, values in self.quantiles().iterrows():
+            summary[quantile_label(probability)] = values
+        summary["max"] = frame.max().astype("float64")
+        return summary
+
+    def statistic_intervals(self) -> Optional[Dict[str, ConfidenceIntervals]]:
+        """Confidence intervals of each numeric column's estimated statistics; ``None`` when they are exact."""
+        return None
+
+    def slope_intervals(self, slopes: np.ndarray, standard_errors: np.ndarray) -> Optional[np.ndarray]:
+        """``[low, high]`` rows of confidence intervals for fitted trend slopes; ``None`` when fits are exact."""
+        return None
+
+    def column_variances(self) -> pd.Series:
+        """Sample variance of each numeric column."""
+        return self.numeric_frame.var()
+
+    @property
+    def correlation_engine(self) -> CorrelationEngine:
+        """Correlation engine over the numeric matrix, standardized once."""
+        return self.memoize("correlation_engine", lambda: CorrelationEngine(self.numeric_matrix))
+
+    def correlation_matrix(self, columns: List[str]) -> pd.DataFrame:
+        """Pairwise-complete Pearson correlation matrix of the given numeric columns."""
+        positions = [self.numeric_columns.index(column) for column in columns]
+        return pd.DataFrame(self.correlation_engine.correlation_matrix(positions), index=columns, columns=columns)
+
+    def strongest_correlations(self, k: int) -> List[Tuple[str, str, float]]:
+        """The ``k`` most strongly correlated pairs among all numeric columns, strongest first."""
+        names = self.numeric_columns
+        return [(names[i], names[j], r) for i, j, r in self.correlation_engine.strongest_pairs(k)]
@@ -1,68 +1,198 @@
 """Core DataFrame analyzer implementation."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, FrozenSet, Optional
 import pandas as pd
+import pyarrow as pa
 
-from .types import AnalysisResults, ColumnInfo, MetadataInfo
+from .constants import DEFAULT_QUANTILE_ERROR, DEFAULT_TOP_CORRELATIONS, SELECTABLE_STAGES
+from .types import AnalysisResults, ColumnInfo, MemoryInfo, MetadataInfo, ProgressCallback
+from .context import AnalysisContext
+from .arrow_engine import ArrowAnalysisContext, table_to_frame
+from .memory import optimize_frame_memory
+from .parquet_engine import ParquetAnalysisContext
+from .sampling import RowSampler, SampledAnalysisContext
 from .semantic_inference import SemanticTypeInferencer
 from .statistics import StatisticalAnalyzer
 from .trends import TrendAnalyzer
 from .insights import InsightGenerator
+from .instrumentation import record_stage
 from .utils import preprocess_datetime_columns
 
 
+ENGINES = {
+    "pandas": AnalysisContext,
+    "arrow": ArrowAnalysisContext,
+}
+
+
 class DataFrameAnalyzer:
     """Analyzes pandas DataFrames to extract insights, statistics, and metadata."""
 
-    def __init__(self, df: pd.DataFrame, filename: Optional[str] = None):
-        self.df = df.copy()  # Work with a copy to avoid modifying original
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        filename: Optional[str] = None,
+        *,
+        copy: bool = True,
+        engine: str = "pandas",
+        context: Optional[AnalysisContext] = None,
+        quantile_mode: str = "exact",
+        quantile_error: float = DEFAULT_QUANTILE_ERROR,
+        optimize_memory: bool = False
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unsupported analysis engine: {engine}")
+
+        # Unless the caller hands over ownership, work on a shallow copy: preprocessing only ever
+        # replaces whole columns, so the caller's frame and its buffers are never modified
+        self.df = df.copy(deep=False) if copy and context is None else df
         self.filename = filename or ""
+        self.optimize_memory = optimize_memory
+        self.memory: Optional[MemoryInfo] = None
+        # Dtypes as loaded of the columns memory optimization replaced, which is what ``columns`` reports
+        self.loaded_dtypes: Dict[str, str] = {}
         
-        # Initialize specialized analyzers
+        # Initialize specialized analyzers around one shared, memoized context
+        # (a prebuilt context, e.g. for Parquet, already owns its frame)
+        self.context = context if context is not None else ENGINES[engine](
+            self.df, quantile_mode=quantile_mode, quantile_error=quantile_error
+        )
         self.semantic_inferencer = SemanticTypeInferencer()
-        self.stats_analyzer = StatisticalAnalyzer(self.df)
-        self.trend_analyzer = TrendAnalyzer(self.df)
-        self.insight_generator = InsightGenerator(self.df, self.filename)
+        self.stats_analyzer = StatisticalAnalyzer(self.context)
+        self.trend_analyzer = TrendAnalyzer(self.context)
+        self.insight_generator = InsightGenerator(self.context, self.filename)
         
         # Preprocess the data
         self._preprocess_data()
 
+    @classmethod
+    def from_arrow(cls, table: pa.Table, filename: Optional[str] = None, **options: Any) -> "DataFrameAnalyzer":
+        """Analyze an Arrow table with the Arrow engine, wrapping its buffers without copying."""
+        return cls(table_to_frame(table), filename, copy=False, engine="arrow", **options)
+
+    @classmethod
+    def from_parquet(cls, source: Any, filename: Optional[str] = None, **options: Any) -> "DataFrameAnalyzer":
+        """Analyze a Parquet file with the Arrow engine, answering what it can from the footer."""
+        with record_stage("parse"):
+            context = ParquetAnalysisContext.open(source, **options)
+        return cls(context.df, filename, copy=False, context=context)
+
+    @classmethod
+    def from_sample(cls, sampler: RowSampler, filename: Optional[str] = None, **options: Any) -> "DataFrameAnalyzer":
+        """Analyze the rows collected by a ``RowSampler``, reporting estimates with confidence intervals."""
+        context = SampledAnalysisContext(sampler, **options)
+        return cls(context.df, filename, copy=False, context=context)
+
     def _preprocess_data(self) -> None:
         """Preprocess the DataFrame for analysis."""
-        preprocess_datetime_columns(self.df)
+        if self.optimize_memory:
+            with record_stage("memory_optimize"):
+                loaded = self.df.dtypes
+                self.memory = optimize_frame_memory(self.df)
+                self.loaded_dtypes = {
+                    column: str(dtype)
+                    for column, dtype, optimized in zip(self.df.columns, loaded, self.df.dtypes)
+                    if optimized != dtype
+                }
+        with record_stage("datetime_preprocess"):
+            preprocess_datetime_columns(self.df)
 
-    def analyze(self, max_preview_rows: int, max_corr_cols: int) -> AnalysisResults:
-        """Perform complete analysis of the DataFrame."""
+    def analyze(
+        self,
+        max_preview_rows: int,
+        max_corr_cols: int,
+        progress: Optional[ProgressCallback] = None,
+        top_correlations: int = DEFAULT_TOP_CORRELATIONS,
+        stages: Optional[FrozenSet[str]] = None
+    ) -> AnalysisResults:
+        """
+        Perform complete analysis of the DataFrame.
+        
+        ``progress`` is called with each stage name ("columns", "stats",
+        "correlations", "trends", "insights") as the stage starts; raising from
+        it aborts the analysis. The correlation matrix covers the
+        ``max_corr_cols`` highest-variance columns, while the
+        ``top_correlations`` strongest pairs are searched across all of them.
+        With ``stages`` (a subset of ``SELECTABLE_STAGES``), the other stages are
+        not run and their sections are left empty.
+        """
+        report = progress or (lambda stage: None)
+        selected = frozenset(SELECTABLE_STAGES) if stages is None else stages
+        report("columns")
+        meta = self._get_metadata()
+        columns: List[ColumnInfo] = []
+        preview: List[Dict[str, Any]] = []
+        missing, numeric_stats, correlations, top_pairs, trends, insights = {}, {}, {}, [], [], []
+        time_series = None
+        if "columns" in selected:
+            with record_stage("semantic_inference"):
+                columns = self._analyze_columns()
+        if "preview" in selected:
+            preview = self._get_preview(max_preview_rows)
+        if "stats" in selected:
+            report("stats")
+            with record_stage("numeric_stats"):
+                missing = self.stats_analyzer.get_missing_values()
+                numeric_stats = self.stats_analyzer.get_numeric_statistics()
+        if "correlations" in selected:
+            report("correlations")
+            with record_stage("correlations"):
+                correlations = self.stats_analyzer.get_correlations(max_corr_cols)
+                top_pairs = self.stats_analyzer.get_top_correlations(top_correlations)
+        if "trends" in selected:
+            report("trends")
+            with record_stage("trends"):
+                trends = self.trend_analyzer.analyze_trends()
+                time_series = self.trend_analyzer.analyze_time_series()
+        if "insights" in selected:
+            report("insights")
+            with record_stage("insights"):
+                insights = self.insight_generator.generate_insights()
+        if stages is not None:
+            meta["stages"] = [stage for stage in SELECTABLE_STAGES if stage in stages]
         return {
-            "meta": self._get_metadata(),
-            "columns": self._analyze_columns(),
-            "preview": self._get_preview(max_preview_rows),
-            "missing": self.stats_analyzer.get_missing_values(),
-            "numeric_stats": self.stats_analyzer.get_numeric_statistics(),
-            "correlations": self.stats_analyzer.get_correlations(max_corr_cols),
-            "trends": self.trend_analyzer.analyze_trends(),
-            "insights": self.insight_generator.generate_insights()
+            "meta": meta,
+            "columns": columns,
+            "preview": preview,
+            "missing": missing,
+            "numeric_stats": numeric_stats,
+            "correlations": correlations,
+            "top_correlations": top_pairs,
+            "trends": trends,
+            "time_series": time_series,
+            "insights": insights
         }
 
     def _get_metadata(self) -> MetadataInfo:
         """Extract basic metadata about the DataFrame."""
-        return {
+        meta: MetadataInfo = {
             "filename": self.filename,
-            "rows": int(len(self.df)),
-            "cols": int(self.df.shape[1])
+            "rows": int(self.context.row_count),
+            "cols": len(self.context.column_names)
         }
+        sample = self.context.sample_info()
+        if sample is not None:
+            meta["sample"] = sample
+        if self.memory is not None:
+            meta["memory"] = self.memory
+        return meta
 
     def _analyze_columns(self) -> List[ColumnInfo]:
         """Analyze each column's data type and semantic meaning."""
-        return [
-            {
-                "name": col,
-                "dtype": str(self.df[col].dtype),
-                "inferred_semantic": self.semantic_inferencer.infer_semantic_dtype(self.df[col])
-            }
-            for col in self.df.columns
-        ]
+        return [self._describe_column(col) for col in self.context.column_names]
+
+    def _describe_column(self, col: str) -> ColumnInfo:
+        series = self.context.column_sample(col)
+        # A random sample of rows is judged on its own, like a smaller dataset
+        row_count = len(series) if self.context.sample_info() is not None else self.context.row_count
+        return {
+            "name": col,
+            "dtype": self.loaded_dtypes.get(col, str(series.dtype)),
+            "inferred_semantic": self.semantic_inferencer.infer_semantic_dtype(
+                series, row_count, self.context.column_chunks(col)
+            )
+        }
 
     def _get_preview(self, max_rows: int) -> List[Dict[str, Any]]:
         """Get a preview of the first few rows as a list of dictionaries."""
-        return self.df.head(max_rows).to_dict("records")
+        return self.context.preview_frame(max_rows).to_dict("records")
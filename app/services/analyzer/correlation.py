@@ -0,0 +1,169 @@
+"""Blockwise Pearson correlation engine with pairwise NaN handling and top-k pair search."""
+
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+from .accumulators import ColumnMoments
+from .constants import ANALYSIS_BLOCK_ROWS, CORRELATION_BLOCK_COLUMNS
+
+# Pairwise variances below this (in standardized units, per observation) count as constant
+_CONSTANT_TOLERANCE = 1e-12
+
+PairCandidates = Tuple[np.ndarray, np.ndarray, np.ndarray]
+# Per-column mean, scale and "is not constant" flags used to standardize values
+Standardization = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def nlargest_pairs(corr: np.ndarray, k: int, rows: np.ndarray, cols: np.ndarray, upper_only: bool) -> PairCandidates:
+    """The ``k`` entries of a correlation block with the largest ``|r|``, as (row index, column index, r)."""
+    strength = np.where(np.isnan(corr), -1.0, np.abs(corr))
+    if upper_only:
+        strength[np.tril_indices_from(strength)] = -1.0
+    flat = strength.ravel()
+    if k < flat.size:
+        flat_positions = np.argpartition(flat, flat.size - k)[flat.size - k:]
+    else:
+        flat_positions = np.arange(flat.size)
+    flat_positions = flat_positions[flat[flat_positions] >= 0.0]
+    i, j = np.unravel_index(flat_positions, corr.shape)
+    return rows[i], cols[j], corr[i, j]
+
+
+def rank_pairs(candidates: List[PairCandidates], k: int) -> List[Tuple[int, int, float]]:
+    """Merge candidate pairs from several blocks into the overall top ``k``, strongest first."""
+    if not candidates:
+        return []
+    rows = np.concatenate([c[0] for c in candidates])
+    cols = np.concatenate([c[1] for c in candidates])
+    values = np.concatenate([c[2] for c in candidates])
+    # Strongest first; ties broken by column position so results are deterministic
+    order = np.lexsort((cols, rows, -np.abs(values)))[:k]
+    return [(int(rows[o]), int(cols[o]), float(values[o])) for o in order]
+
+
+def strongest_pairs(corr: np.ndarray, k: int) -> List[Tuple[int, int, float]]:
+    """Top-``k`` off-diagonal pairs ``(i, j, r)`` with ``i < j`` of a full correlation matrix by ``|r|``."""
+    if k <= 0 or corr.shape[0] < 2:
+        return []
+    positions = np.arange(corr.shape[0])
+    return rank_pairs([nlargest_pairs(corr, k, positions, positions, upper_only=True)], k)
+
+
+class CorrelationEngine:
+    """
+    Pairwise-complete Pearson correlations over every column of a float64 matrix.
+
+    Columns are standardized once, with means and standard deviations from a
+    single blocked pass. Correlations are then accumulated from matrix products
+    over row blocks and column-block tiles:
+
+    - row blocks without missing values need a single ``Z.T @ Z`` product
+    - row blocks with NaNs also multiply by the 0/1 presence masks, so each
+      cell only uses rows where both columns are present, like ``DataFrame.corr``
+
+    Memory is bounded by the tile size rather than by ``rows × columns²``, so
+    the top-k search covers all columns while full matrices are only built
+    for requested subsets.
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        block_rows: int = ANALYSIS_BLOCK_ROWS,
+        block_columns: int = CORRELATION_BLOCK_COLUMNS,
+        standardization: Optional[Standardization] = None
+    ):
+        self.matrix = matrix
+        self.block_rows = block_rows
+        self.block_columns = block_columns
+        # Constant (or empty) columns standardize to exact zeros, so their correlations come out undefined
+        self.mean, self.scale, self.varying = (
+            standardization if standardization is not None else self.standardize(matrix, block_rows)
+        )
+
+    @staticmethod
+    def standardize(matrix: np.ndarray, block_rows: int = ANALYSIS_BLOCK_ROWS) -> Standardization:
+        """
+        Per-column ``(mean, scale, varying)`` from one blocked pass.
+
+        Columns are independent, so the result for a subset of columns (e.g. a
+        shard computed in another process) can be passed back in as
+        ``standardization`` for the same columns of a larger matrix.
+        """
+        moments = ColumnMoments(matrix.shape[1])
+        for start in range(0, matrix.shape[0], block_rows):
+            moments.update(matrix[start:start + block_rows])
+        std = np.sqrt(moments.variance(ddof=0))
+        varying = np.isfinite(std) & (std > 0)
+        return np.where(varying, moments.mean, 0.0), np.where(varying, std, 1.0), varying
+
+    @property
+    def n_columns(self) -> int:
+        return self.matrix.shape[1]
+
+    def _standardized(self, start: int, columns: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Standardized values (0 where missing) and the presence mask, or ``None`` when nothing is missing."""
+        block = self.matrix[start:start + self.block_rows, columns]
+        z = (block - self.mean[columns]) / self.scale[columns]
+        z[:, ~self.varying[columns]] = 0.0
+        missing = np.isnan(z)
+        if not missing.any():
+            return z, None
+        z[missing] = 0.0
+        return z, (~missing).astype("float64")
+
+    def tile(self, left: Sequence[int], right: Sequence[int]) -> np.ndarray:
+        """Correlations between columns ``left`` (rows of the result) and ``right`` (NaN where undefined)."""
+        left, right = np.asarray(left, dtype=np.intp), np.asarray(right, dtype=np.intp)
+        shape = (len(left), len(right))
+        n, sx, sy, sxx, syy, sxy = (np.zeros(shape) for _ in range(6))
+        for start in range(0, self.matrix.shape[0], self.block_rows):
+            zl, ml = self._standardized(start, left)
+            zr, mr = self._standardized(start, right) if right is not left else (zl, ml)
+            sxy += zl.T @ zr
+            if ml is None and mr is None:
+                n += zl.shape[0]
+                sx += zl.sum(axis=0)[:, None]
+                sy += zr.sum(axis=0)[None, :]
+                sxx += (zl * zl).sum(axis=0)[:, None]
+                syy += (zr * zr).sum(axis=0)[None, :]
+                continue
+            ml = np.ones_like(zl) if ml is None else ml
+            mr = np.ones_like(zr) if mr is None else mr
+            n += ml.T @ mr
+            sx += zl.T @ mr
+            sy += ml.T @ zr
+            sxx += (zl * zl).T @ mr
+            syy += ml.T @ (zr * zr)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = sxy - sx * sy / n
+            var_x = sxx - sx * sx / n
+            var_y = syy - sy * sy / n
+            defined = (n > 1) & (var_x > _CONSTANT_TOLERANCE * n) & (var_y > _CONSTANT_TOLERANCE * n)
+            corr = np.where(defined, cov / np.sqrt(np.where(defined, var_x * var_y, 1.0)), np.nan)
+        return np.clip(corr, -1.0, 1.0)
+
+    def correlation_matrix(self, columns: Sequence[int]) -> np.ndarray:
+        """Full correlation matrix for a subset of columns (diagonal 1.0 where defined)."""
+        columns = np.asarray(columns, dtype=np.intp)
+        corr = self.tile(columns, columns)
+        diagonal = np.diagonal(corr).copy()
+        np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return corr
+
+    def strongest_pairs(self, k: int) -> List[Tuple[int, int, float]]:
+        """The ``k`` column pairs ``(i, j, r)`` with ``i < j`` and the largest ``|r|``, over all columns."""
+        if k <= 0 or self.n_columns < 2:
+            return []
+        blocks = [
+            np.arange(start, min(start + self.block_columns, self.n_columns))
+            for start in range(0, self.n_columns, self.block_columns)
+        ]
+        candidates = []
+        for bi, left in enumerate(blocks):
+            for right in blocks[bi:]:
+                same = right is left
+                corr = self.tile(left, left if same else right)
+                candidates.append(nlargest_pairs(corr, k, left, right, upper_only=same))
+        return rank_pairs(candidates, k)
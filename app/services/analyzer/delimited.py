@@ -0,0 +1,162 @@
+"""Sniffing of CSV/TSV dialects (delimiter, text encoding, compression) and decompressed reads."""
+
+import codecs
+import csv
+import io
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+from .constants import COMPRESSION_MAGIC, CSV_DELIMITERS, CSV_SNIFF_BYTES, CSV_SNIFF_LINES
+from .types import CsvDialect
+from .utils import open_arrow_source
+
+DelimitedSource = Union[str, bytes, BinaryIO]
+
+
+def _peek(source: DelimitedSource, size: int) -> bytes:
+    """The first ``size`` bytes of a source, leaving file objects where they were."""
+    if isinstance(source, bytes):
+        return source[:size]
+    if isinstance(source, str):
+        with open(source, "rb") as fh:
+            return fh.read(size)
+    position = source.tell()
+    try:
+        return source.read(size)
+    finally:
+        source.seek(position)
+
+
+def detect_compression(source: DelimitedSource) -> Optional[str]:
+    """The codec a source is compressed with, recognized by its magic number, or ``None``."""
+    head = _peek(source, 4)
+    for magic, codec in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def open_delimited(source: DelimitedSource, compression: Optional[str]) -> Any:
+    """
+    An Arrow input stream over a source's text, decompressed as it is read.
+
+    Only the bytes actually read are decompressed, so neither the compressed
+    nor the decompressed file is ever held in memory whole.
+    """
+    import pyarrow as pa
+
+    stream = open_arrow_source(source)
+    if compression is None:
+        return stream
+    if not isinstance(stream, pa.NativeFile):
+        stream = pa.PythonFile(stream, mode="r")
+    return pa.CompressedInputStream(stream, compression)
+
+
+def read_prefix(source: DelimitedSource, size: int, compression: Optional[str]) -> Tuple[bytes, int, bool]:
+    """
+    Up to ``size`` bytes of a source's text, decompressed.
+
+    Returns the text, the source bytes consumed to produce it, and whether
+    it is the whole text. File objects are left where they were.
+    """
+    if compression is None:
+        prefix = _peek(source, size + 1)
+        return prefix[:size], min(len(prefix), size), len(prefix) <= size
+    import pyarrow as pa
+
+    position = None if isinstance(source, (str, bytes)) else source.tell()
+    raw = open_arrow_source(source)
+    if not isinstance(raw, pa.NativeFile):
+        raw = pa.PythonFile(raw, mode="r")
+    stream = pa.CompressedInputStream(raw, compression)  # closes ``raw`` when collected
+    prefix = stream.read(size + 1)
+    consumed = raw.tell()
+    if position is not None:
+        source.seek(position)
+    return prefix[:size], consumed, len(prefix) <= size
+
+
+def _sniff_encoding(prefix: bytes) -> str:
+    """UTF-8 or UTF-16 by byte-order mark, UTF-8 when the text decodes as such, Latin-1 otherwise."""
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        # A prefix may end inside a multi-byte character, which is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return "latin-1"
+    return "utf-8"
+
+
+def _sniff_delimiter(lines: List[str], default: str) -> str:
+    """
+    The candidate splitting every line into the same number of fields, most fields winning.
+
+    The extension's delimiter is tried first and kept on ties, and whenever
+    no candidate splits the lines consistently (a single-column file).
+    """
+    best, best_fields = default, 1
+    for delimiter in (default, *CSV_DELIMITERS):
+        counts = {len(row) for row in csv.reader(lines, delimiter=delimiter)}
+        if len(counts) == 1:
+            fields = counts.pop()
+            if fields > best_fields:
+                best, best_fields = delimiter, fields
+    return best
+
+
+def unique_column_names(names: List[str]) -> List[str]:
+    """Header names with repeats renamed as pandas renames them: ``a, a, b`` becomes ``a, a.1, b``."""
+    taken = set(names)
+    counts: Dict[str, int] = {}
+    unique = []
+    for name in names:
+        renamed = name
+        count = counts.get(name, 0)
+        while count > 0:
+            # Skip suffixes naming a later column of the header, as the C parser does
+            counts[name] = count + 1
+            renamed = f"{name}.{count}"
+            count = count + 1 if renamed in taken else counts.get(renamed, 0)
+        counts[renamed] = count + 1
+        unique.append(renamed)
+    return unique
+
+
+def _header(text: str, delimiter: str, complete: bool) -> Optional[List[str]]:
+    """The header row of a text prefix, or ``None`` when the prefix ends inside it."""
+    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
+    header = next(reader, [])
+    if not complete and next(reader, None) is None:
+        return None
+    return header
+
+
+def sniff_dialect(source: DelimitedSource, extension: str) -> CsvDialect:
+    """
+    Compression, text encoding, delimiter and header of a CSV/TSV source, from its first ``CSV_SNIFF_BYTES``.
+
+    Compressed sources are inspected through a decompressing stream that
+    stops after the prefix.
+    """
+    compression = detect_compression(source)
+    prefix, _, complete = read_prefix(source, CSV_SNIFF_BYTES, compression)
+    encoding = _sniff_encoding(prefix)
+    text = prefix.decode(encoding, errors="replace")
+    lines = [line for line in text.splitlines() if line]
+    if not complete:
+        lines = lines[:-1]  # the last line may be cut off
+    delimiter = _sniff_delimiter(lines[:CSV_SNIFF_LINES], "\t" if extension == ".tsv" else ",")
+    return {
+        "delimiter": delimiter,
+        "encoding": encoding,
+        "compression": compression,
+        "header": _header(text, delimiter, complete),
+    }
+
+
+def arrow_encoding(dialect: CsvDialect) -> str:
+    """The encoding to hand Arrow, which decodes UTF-8 natively and skips its byte-order mark itself."""
+    return "utf8" if dialect["encoding"] in ("utf-8", "utf-8-sig") else dialect["encoding"]
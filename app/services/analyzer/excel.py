@@ -0,0 +1,220 @@
+"""Streaming Excel (.xlsx) reading with openpyxl in read-only mode."""
+
+import datetime
+import itertools
+from typing import Any, BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .constants import EXCEL_BATCH_ROWS
+from .selection import project_columns
+
+ExcelSource = Union[str, BinaryIO]
+Row = Tuple[Any, ...]
+
+# read_excel's default na_values: these strings are read as missing
+_NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
+
+def _open_worksheet(source: ExcelSource, sheet: Optional[str]) -> Tuple[Any, Any]:
+    """Open a workbook read-only and pick a sheet by name or position (default: the first)."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    if sheet is None:
+        return workbook, workbook.worksheets[0]
+    if sheet in workbook.sheetnames:
+        return workbook, workbook[sheet]
+    if sheet.isdigit() and int(sheet) < len(workbook.worksheets):
+        return workbook, workbook.worksheets[int(sheet)]
+    workbook.close()
+    raise ValueError(f"Worksheet {sheet!r} not found; available sheets: {', '.join(workbook.sheetnames)}")
+
+
+def _is_blank(row: Row) -> bool:
+    return all(value is None or value == "" for value in row)
+
+
+def _sheet_rows(worksheet: Any) -> Iterator[Row]:
+    """Cell values row by row; blank rows are kept inside the data but dropped at its end, like ``read_excel``."""
+    pending_blank: List[Row] = []
+    for row in worksheet.iter_rows(values_only=True):
+        if _is_blank(row):
+            pending_blank.append(row)
+            continue
+        yield from pending_blank
+        pending_blank.clear()
+        yield row
+
+
+def _row_width(row: Row) -> int:
+    for index in range(len(row) - 1, -1, -1):
+        if row[index] is not None and row[index] != "":
+            return index + 1
+    return 0
+
+
+def _column_names(header: Row, width: int) -> List[Any]:
+    """Header labels, with ``Unnamed: i`` for blanks and ``.1``, ``.2`` suffixes on duplicates."""
+    names: List[Any] = []
+    seen = set()
+    for index in range(width):
+        value = header[index] if index < len(header) else None
+        name = f"Unnamed: {index}" if value is None or value == "" else value
+        candidate, counter = name, 0
+        while candidate in seen:
+            counter += 1
+            candidate = f"{name}.{counter}"
+        seen.add(candidate)
+        names.append(candidate)
+    return names
+
+
+def _typed_column(values: Sequence[Any]) -> np.ndarray:
+    """
+    One column's cell values as a typed array, following ``read_excel``'s dtype rules.
+
+    Integral numbers without gaps become int64, other numbers (and booleans
+    with gaps) float64, and timestamps datetime64[ns]. Text that parses as
+    numbers is numeric; anything else stays object with NaN for missing cells.
+    """
+    values = [None if isinstance(value, str) and value in _NA_STRINGS else value for value in values]
+    present = [value for value in values if value is not None]
+    if not present:
+        return np.full(len(values), np.nan)
+    kinds = set(map(type, present))
+    complete = len(present) == len(values)
+
+    if kinds <= {int, float}:
+        if complete and all(type(value) is int or value.is_integer() for value in present):
+            try:
+                return np.array(values, dtype="int64")
+            except OverflowError:
+                pass
+        return np.array([np.nan if value is None else value for value in values], dtype="float64")
+    if kinds == {bool}:
+        if complete:
+            return np.array(values, dtype=bool)
+        return np.array([np.nan if value is None else value for value in values], dtype="float64")
+    if kinds <= {datetime.datetime}:
+        return pd.to_datetime(values).to_numpy(dtype="datetime64[ns]")
+
+    objects = np.empty(len(values), dtype=object)
+    objects[:] = [np.nan if value is None else value for value in values]
+    if str in kinds and kinds <= {str, int, float}:
+        try:
+            return pd.to_numeric(objects)
+        except (ValueError, TypeError):
+            pass
+    return objects
+
+
+def _frame(names: List[Any], rows: Sequence[Row], selected: Optional[List[Any]] = None) -> pd.DataFrame:
+    """Transpose rows into one typed array per column (only the ``selected`` columns, in that order)."""
+    width = len(names)
+    columns = list(itertools.zip_longest(*rows))[:width] if rows else []
+    columns += [(None,) * len(rows)] * (width - len(columns))
+    values = dict(zip(names, columns))
+    selected = names if selected is None else selected
+    return pd.DataFrame({name: _typed_column(values[name]) for name in selected}, columns=selected)
+
+
+def _conform(batch: pd.DataFrame, schema: pd.Series, first_row: int) -> pd.DataFrame:
+    """Cast a batch to the dtypes fixed by the first batch, or fail if a column changed kind."""
+    for name, dtype in schema.items():
+        column = batch[name]
+        if column.dtype == dtype:
+            continue
+        if dtype == object or (pd.api.types.is_bool_dtype(dtype) and column.dtype == "float64"):
+            batch[name] = column.astype(object)
+        elif pd.api.types.is_numeric_dtype(dtype) and pd.api.types.is_numeric_dtype(column.dtype):
+            continue  # e.g. int64 first, float64 once a gap appears; both feed the same accumulators
+        elif column.isna().all():
+            batch[name] = pd.Series(pd.NaT if dtype.kind == "M" else np.nan, index=batch.index, dtype=dtype)
+        else:
+            raise ValueError(
+                f"Column {name!r} changes from {dtype} to {column.dtype} at data row {first_row + 1}; "
+                "analyze it without streaming."
+            )
+    return batch
+
+
+def read_excel_frame(
+    source: ExcelSource,
+    sheet: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    columns: Optional[Sequence[Any]] = None
+) -> pd.DataFrame:
+    """
+    Read one sheet of an .xlsx workbook into a DataFrame.
+
+    Equivalent to ``pd.read_excel(source, sheet_name=sheet or 0, nrows=max_rows, usecols=columns)``
+    for typical sheets, but builds each column as one typed array from raw
+    cell values instead of going through pandas' per-cell text parser.
+    """
+    workbook, worksheet = _open_worksheet(source, sheet)
+    try:
+        rows = _sheet_rows(worksheet)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        data = list(itertools.islice(rows, max_rows))
+        width = max([_row_width(header)] + [_row_width(row) for row in data])
+        names = _column_names(header, width)
+        return _frame(names, data, project_columns(names, columns))
+    finally:
+        workbook.close()
+
+
+def sheet_row_count(source: ExcelSource, sheet: Optional[str] = None) -> Optional[int]:
+    """Data rows of a sheet according to its recorded dimension (``None`` when the workbook omits it)."""
+    workbook, worksheet = _open_worksheet(source, sheet)
+    try:
+        return max(worksheet.max_row - 1, 0) if worksheet.max_row else None
+    finally:
+        workbook.close()
+
+
+def iter_excel_batches(
+    source: ExcelSource,
+    sheet: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    batch_rows: int = EXCEL_BATCH_ROWS,
+    columns: Optional[Sequence[Any]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream one sheet of an .xlsx workbook as typed DataFrame batches of ``batch_rows`` rows.
+
+    The workbook is parsed in read-only mode, so memory is bounded by the
+    batch size. The columns and their dtypes are fixed by the first batch;
+    cells beyond its width are ignored. Only ``columns`` (default: all) are
+    typed and kept.
+    """
+    workbook, worksheet = _open_worksheet(source, sheet)
+    try:
+        rows = _sheet_rows(worksheet)
+        header = next(rows, None)
+        if header is None:
+            return
+        names, selected, schema, emitted = None, None, None, 0
+        while max_rows is None or emitted < max_rows:
+            limit = batch_rows if max_rows is None else min(batch_rows, max_rows - emitted)
+            chunk = list(itertools.islice(rows, limit))
+            if not chunk:
+                break
+            if names is None:
+                names = _column_names(header, max([_row_width(header)] + [_row_width(row) for row in chunk]))
+                selected = project_columns(names, columns)
+            batch = _frame(names, chunk, selected)
+            if schema is None:
+                schema = batch.dtypes
+            else:
+                batch = _conform(batch, schema, emitted)
+            emitted += len(chunk)
+            yield batch
+    finally:
+        workbook.close()
@@ -0,0 +1,239 @@
+"""Incremental re-analysis of datasets that grow by appended rows."""
+
+import copy
+import hashlib
+import io
+import os
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+
+from .api import UploadParseError, fold_batches
+from .delimited import detect_compression
+from .constants import (
+    ANALYZER_VERSION, DEFAULT_QUANTILE_ERROR, DEFAULT_STREAM_BLOCK_BYTES, DEFAULT_TOP_CORRELATIONS,
+    DELIMITED_EXTENSIONS, FINGERPRINT_CHUNK_BYTES,
+)
+from .loader import DataFrameLoader
+from .streaming import StreamingAnalyzer
+from .types import AnalysisResults, ProgressCallback
+from .utils import get_file_extension
+
+class IncompatibleDatasetState(Exception):
+    """Raised when appended rows cannot be folded into a dataset's stored state."""
+
+
+class DatasetState:
+    """
+    Mergeable analysis state of one dataset and a fingerprint of the content it covers.
+
+    ``analyzer`` holds the dataset's accumulators (moments, co-moments,
+    regression sums, quantile and cardinality sketches), so new rows are
+    folded in without revisiting old ones. ``size`` and ``digest`` identify
+    the bytes of the last full upload; ``digest`` is ``None`` once rows were
+    appended separately, since the combined content was never seen as one file.
+    ``options`` are the settings the state was built with.
+    """
+
+    def __init__(
+        self,
+        analyzer: StreamingAnalyzer,
+        options: Dict[str, Any],
+        size: int = 0,
+        digest: Optional[str] = None,
+        header: bytes = b"",
+        complete_lines: bool = True
+    ):
+        self.analyzer = analyzer
+        self.options = options
+        self.size = size
+        self.digest = digest
+        self.header = header
+        self.complete_lines = complete_lines
+
+
+def _read_header(path: str) -> bytes:
+    """The first line of a delimited file, including its line break."""
+    with open(path, "rb") as fh:
+        return fh.readline()
+
+
+def _ends_with_newline(path: str, size: int) -> bool:
+    if size == 0:
+        return True
+    with open(path, "rb") as fh:
+        fh.seek(size - 1)
+        return fh.read(1) == b"\n"
+
+
+class _AppendedRows(io.RawIOBase):
+    """
+    A dataset's header row followed by the bytes of ``fh`` from ``offset`` on, as one seekable file.
+
+    Appended rows are parsed straight from the spooled upload this way,
+    rather than from a copy of them behind the header.
+    """
+
+    def __init__(self, header: bytes, fh: BinaryIO, offset: int):
+        self.header = header
+        self.fh = fh
+        self.offset = offset
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, position: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            position += self.position
+        elif whence == io.SEEK_END:
+            position += len(self.header) + os.fstat(self.fh.fileno()).st_size - self.offset
+        self.position = max(position, 0)
+        return self.position
+
+    def readinto(self, buffer: Any) -> int:
+        view = memoryview(buffer).cast("B")
+        read = 0
+        if self.position < len(self.header):
+            chunk = self.header[self.position:self.position + len(view)]
+            view[:len(chunk)] = chunk
+            read = len(chunk)
+        if read < len(view):
+            self.fh.seek(self.offset + self.position + read - len(self.header))
+            read += self.fh.readinto(view[read:]) or 0
+        self.position += read
+        return read
+
+
+def _hash_prefix(fh: BinaryIO, size: int, hasher: Optional["hashlib._Hash"] = None) -> "hashlib._Hash":
+    """SHA-256 of the next ``size`` bytes of ``fh`` (added to ``hasher``, if given), read in bounded chunks."""
+    hasher = hasher or hashlib.sha256()
+    remaining = size
+    while remaining > 0:
+        chunk = fh.read(min(FINGERPRINT_CHUNK_BYTES, remaining))
+        if not chunk:
+            break
+        hasher.update(chunk)
+        remaining -= len(chunk)
+    return hasher
+
+
+def _fold(
+    analyzer: StreamingAnalyzer,
+    batches: Iterator[pd.DataFrame],
+    progress: Optional[ProgressCallback]
+) -> None:
+    try:
+        fold_batches(analyzer, batches, progress)
+    except UploadParseError:
+        raise
+    except ValueError as e:  # rows whose columns or types do not fit the stored state
+        raise IncompatibleDatasetState(str(e)) from e
+
+
+def update_dataset(
+    state: Optional[DatasetState],
+    filename: str,
+    path: str,
+    *,
+    appended: bool = False,
+    max_preview_rows: int,
+    max_corr_cols: int,
+    use_pyarrow: bool = True,
+    block_size: int = DEFAULT_STREAM_BLOCK_BYTES,
+    sheet: Optional[str] = None,
+    quantile_error: float = DEFAULT_QUANTILE_ERROR,
+    progress: Optional[ProgressCallback] = None,
+    top_correlations: int = DEFAULT_TOP_CORRELATIONS
+) -> Tuple[AnalysisResults, DatasetState, str]:
+    """
+    Bring a dataset's analysis up to date with an upload spooled to ``path``.
+
+    With ``appended=True`` the upload holds only the new rows (with a header
+    row, in any supported format), which are folded into ``state``.
+    Otherwise it is the dataset's full content. When ``state`` was built from
+    a byte prefix of it, as with a CSV/TSV export that only grew, just the
+    remaining bytes are parsed and folded in; an identical file is not parsed
+    at all. Anything else is analyzed from scratch. Work is therefore
+    proportional to the new rows, plus one hash over the shared prefix.
+
+    ``state`` is never modified. Returns the results, the new state, and the
+    outcome: "created", "rebuilt", "appended" or "unchanged".
+
+    Raises:
+        UploadParseError: If the upload cannot be parsed
+        IncompatibleDatasetState: If appended rows do not match the stored
+            state, or the state was built with different settings
+    """
+    options = {
+        "analyzer_version": ANALYZER_VERSION,
+        "use_pyarrow": use_pyarrow,
+        "quantile_error": quantile_error,
+        "max_preview_rows": max_preview_rows,
+        "sheet": sheet,
+    }
+    compatible = state is not None and state.options == options
+    loader = DataFrameLoader()
+    if progress is not None:
+        progress("load")
+
+    if appended:
+        if not compatible:
+            raise IncompatibleDatasetState(
+                "The dataset's stored state is missing or was built with different settings; upload the full file."
+            )
+        analyzer = copy.deepcopy(state.analyzer)
+        analyzer.filename = filename
+        _fold(analyzer, loader.iter_upload_batches(filename, path, use_pyarrow, block_size, sheet), progress)
+        new_state = DatasetState(analyzer, options)
+        return analyzer.results(max_corr_cols, progress, top_correlations), new_state, "appended"
+
+    size = os.path.getsize(path)
+    extension = get_file_extension(filename)
+    # Only plain text grows by appended bytes that parse on their own
+    plain_text = extension in DELIMITED_EXTENSIONS and detect_compression(path) is None
+    if compatible and state.digest is not None and size >= state.size:
+        with open(path, "rb") as fh:
+            hasher = _hash_prefix(fh, state.size)
+            shared = hasher.hexdigest() == state.digest
+            first_new_byte = fh.read(1)
+        if shared and size == state.size:
+            analyzer = copy.deepcopy(state.analyzer)
+            analyzer.filename = filename
+            return analyzer.results(max_corr_cols, progress, top_correlations), state, "unchanged"
+        # The shared prefix must end on a line break, or its last row continues in the new bytes
+        if shared and plain_text and (state.complete_lines or first_new_byte in (b"\n", b"\r")):
+            analyzer = copy.deepcopy(state.analyzer)
+            analyzer.filename = filename
+            with open(path, "rb") as fh:
+                rows = io.BufferedReader(_AppendedRows(state.header, fh, state.size))
+                _fold(analyzer, loader.iter_upload_batches(filename, rows, use_pyarrow, block_size, sheet), progress)
+                fh.seek(state.size)
+                _hash_prefix(fh, size - state.size, hasher)
+            new_state = DatasetState(
+                analyzer, options, size, hasher.hexdigest(), state.header, _ends_with_newline(path, size)
+            )
+            return analyzer.results(max_corr_cols, progress, top_correlations), new_state, "appended"
+
+    analyzer = StreamingAnalyzer(
+        filename, max_preview_rows=max_preview_rows, quantile_error=quantile_error, track_cardinality=True
+    )
+    _fold(analyzer, loader.iter_upload_batches(filename, path, use_pyarrow, block_size, sheet), progress)
+    with open(path, "rb") as fh:
+        digest = _hash_prefix(fh, size).hexdigest()
+    new_state = DatasetState(
+        analyzer,
+        options,
+        size,
+        digest,
+        _read_header(path) if plain_text else b"",
+        _ends_with_newline(path, size),
+    )
+    outcome = "created" if state is None else "rebuilt"
+    return analyzer.results(max_corr_cols, progress, top_correlations), new_state, outcome
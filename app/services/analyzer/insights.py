@@ -1,42 +1,63 @@
 """Insight generation for DataFrame analysis."""
 
-from typing import List, Optional
-import pandas as pd
+from typing import Dict, List, Optional
 
+from .context import AnalysisContext
 from .statistics import StatisticalAnalyzer
 from .trends import TrendAnalyzer
-from .types import MetadataInfo
+from .types import CorrelationPair, MetadataInfo, NumericStatistics, TrendInfo
 
 
 class InsightGenerator:
     """Generates human-readable insights about datasets."""
 
-    def __init__(self, df: pd.DataFrame, filename: str = ""):
-        self.df = df
+    def __init__(self, context: AnalysisContext, filename: str = ""):
+        self.context = context
+        self.df = context.df
         self.filename = filename
-        self.stats_analyzer = StatisticalAnalyzer(df)
-        self.trend_analyzer = TrendAnalyzer(df)
+        self.stats_analyzer = StatisticalAnalyzer(context)
+        self.trend_analyzer = TrendAnalyzer(context)
 
     def generate_insights(self) -> List[str]:
         """Generate human-readable insights about the dataset."""
+        return self.build_insights(
+            self._get_metadata(),
+            self.stats_analyzer.get_numeric_statistics(),
+            self.trend_analyzer.analyze_trends(),
+            self.stats_analyzer.get_top_correlations(1),
+        )
+
+    @classmethod
+    def build_insights(
+        cls,
+        meta: MetadataInfo,
+        numeric_stats: Dict[str, NumericStatistics],
+        trends: List[TrendInfo],
+        top_correlations: List[CorrelationPair]
+    ) -> List[str]:
+        """Generate insights from already computed analysis results."""
         insights = []
-        meta = self._get_metadata()
 
         # Basic dataset info
         insights.append(f"Loaded {meta['rows']} rows × {meta['cols']} columns.")
+        if "sample" in meta:
+            insights.append(
+                f"Statistics are estimated from a random sample of {meta['sample']['rows']} rows "
+                f"({meta['sample']['fraction']:.1%})."
+            )
 
         # Variability insight
-        variability_insight = self._get_variability_insight()
+        variability_insight = cls._get_variability_insight(numeric_stats)
         if variability_insight:
             insights.append(variability_insight)
 
         # Trend insight
-        trend_insight = self._get_trend_insight()
+        trend_insight = cls._get_trend_insight(trends)
         if trend_insight:
             insights.append(trend_insight)
 
         # Correlation insight
-        correlation_insight = self._get_correlation_insight()
+        correlation_insight = cls._get_correlation_insight(top_correlations)
         if correlation_insight:
             insights.append(correlation_insight)
 
@@ -44,15 +65,19 @@ class InsightGenerator:
 
     def _get_metadata(self) -> MetadataInfo:
         """Extract basic metadata about the DataFrame."""
-        return {
+        meta: MetadataInfo = {
             "filename": self.filename,
-            "rows": int(len(self.df)),
-            "cols": int(self.df.shape[1])
+            "rows": int(self.context.row_count),
+            "cols": len(self.context.column_names)
         }
+        sample = self.context.sample_info()
+        if sample is not None:
+            meta["sample"] = sample
+        return meta
 
-    def _get_variability_insight(self) -> Optional[str]:
+    @staticmethod
+    def _get_variability_insight(numeric_stats: Dict[str, NumericStatistics]) -> Optional[str]:
         """Generate insight about the column with highest variability."""
-        numeric_stats = self.stats_analyzer.get_numeric_statistics()
         if not numeric_stats:
             return None
 
@@ -72,9 +97,9 @@ class InsightGenerator:
 
         return None
 
-    def _get_trend_insight(self) -> Optional[str]:
+    @staticmethod
+    def _get_trend_insight(trends: List[TrendInfo]) -> Optional[str]:
         """Generate insight about the strongest trend."""
-        trends = self.trend_analyzer.analyze_trends()
         if not trends:
             return None
 
@@ -82,15 +107,14 @@ class InsightGenerator:
         direction = "Increasing" if strongest_trend["direction"] == "up" else "Decreasing"
         return f"{direction} trend in '{strongest_trend['column']}' (R²={strongest_trend['r2']:.2f})."
 
-    def _get_correlation_insight(self) -> Optional[str]:
-        """Generate insight about the strongest correlation."""
-        correlations = self.stats_analyzer.get_correlations(max_columns=10)
-        if not correlations:
+    @staticmethod
+    def _get_correlation_insight(top_correlations: List[CorrelationPair]) -> Optional[str]:
+        """Generate insight about the strongest correlation (pairs are ordered strongest first)."""
+        if not top_correlations or top_correlations[0]["correlation"] == 0:
             return None
 
-        strongest_correlation = self.stats_analyzer.find_strongest_correlation(correlations)
-        if not strongest_correlation:
-            return None
-
-        col1, col2, correlation_value = strongest_correlation
-        return f"Strongest Pearson correlation: {col1} ↔ {col2} (ρ={correlation_value:.2f})."
+        strongest = top_correlations[0]
+        return (
+            f"Strongest Pearson correlation: {strongest['column_a']} ↔ {strongest['column_b']} "
+            f"(ρ={strongest['correlation']:.2f})."
+        )
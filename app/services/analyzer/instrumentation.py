@@ -0,0 +1,94 @@
+"""Per-stage wall time, CPU time and memory recording for analysis hot paths."""
+
+import contextvars
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+from .types import StageTiming
+
+T = TypeVar("T")
+
+_current: contextvars.ContextVar[Optional["StageRecorder"]] = contextvars.ContextVar("stage_recorder", default=None)
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, OSError, ValueError):
+    _PAGE_SIZE = 0
+
+
+def _rss_bytes() -> int:
+    """Current resident set size, or 0 where ``/proc`` is unavailable."""
+    if not _PAGE_SIZE:
+        return 0
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+class StageRecorder:
+    """
+    Accumulates timings for the stages of one analysis.
+
+    Memory is the peak traced allocation above the stage's starting point when
+    ``tracemalloc`` is tracing, otherwise the (non-negative) RSS growth. A stage
+    entered several times, e.g. parsing once per streamed batch, is summed.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageTiming] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            start_traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        else:
+            start_rss = _rss_bytes()
+        start_wall, start_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.thread_time() - start_cpu
+            if tracing:
+                allocated = tracemalloc.get_traced_memory()[1] - start_traced
+            else:
+                allocated = _rss_bytes() - start_rss
+            self.add(name, wall, cpu, max(0, allocated))
+
+    def add(self, name: str, wall_seconds: float, cpu_seconds: float, alloc_bytes: int) -> None:
+        timing = self.stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "alloc_bytes": 0})
+        timing["wall_seconds"] += wall_seconds
+        timing["cpu_seconds"] += cpu_seconds
+        timing["alloc_bytes"] = max(timing["alloc_bytes"], alloc_bytes)
+
+
+@contextmanager
+def record_stage(name: str) -> Iterator[None]:
+    """Time a stage into the active recorder; a no-op when nothing is recording."""
+    recorder = _current.get()
+    if recorder is None:
+        yield
+        return
+    with recorder.stage(name):
+        yield
+
+
+def run_recorded(fn: Callable[..., T], *args: Any, **kwargs: Any) -> Tuple[T, Dict[str, StageTiming]]:
+    """
+    Call ``fn`` with stage recording active and return its result with the stage timings.
+
+    Timings travel back with the result, so this works inside a process pool.
+    """
+    recorder = StageRecorder()
+    token = _current.set(recorder)
+    try:
+        return fn(*args, **kwargs), recorder.stages
+    finally:
+        _current.reset(token)
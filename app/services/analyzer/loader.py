@@ -1,46 +1,502 @@
 """DataFrame loading from various file formats."""
 
 import io
-from typing import Dict, Any
+import os
+import re
+from typing import Dict, Any, BinaryIO, Iterator, List, Optional, Sequence, Union
 import pandas as pd
 
-from .constants import EXCEL_EXTENSIONS, DELIMITED_EXTENSIONS, PARQUET_EXTENSIONS
-from .utils import get_file_extension
+from .arrow_engine import table_to_frame
+from .constants import (
+    EXCEL_EXTENSIONS, DELIMITED_EXTENSIONS, PARQUET_EXTENSIONS, DEFAULT_STREAM_BLOCK_BYTES, EXCEL_BATCH_ROWS,
+    CSV_ENGINES, CSV_NULL_VALUES, CSV_SNIFF_BYTES, DEFAULT_CSV_BLOCK_BYTES,
+)
+from .delimited import arrow_encoding, open_delimited, read_prefix, sniff_dialect, unique_column_names
+from .excel import iter_excel_batches, read_excel_frame
+from .selection import project_columns
+from .types import CsvDialect, CsvOptions
+from .utils import get_file_extension, open_arrow_source
+
+
+# Nullable types the C parser converts to quickly, by the kind of the dtype imposed on a column
+_PARSE_DTYPES = {"i": "Int64", "u": "Int64", "b": "boolean"}
+# pyarrow.csv reports values that do not fit a column's type as "In CSV column #<position>: ..."
+_CONVERSION_ERROR = re.compile(r"In CSV column #(\d+): .*CSV conversion error")
+
+
+def _widened_type(current: "pa.DataType") -> Optional["pa.DataType"]:
+    """The next wider type for a streamed column whose type no longer fits: null -> int -> float -> text."""
+    import pyarrow as pa
+
+    if pa.types.is_null(current):
+        return pa.int64()
+    if pa.types.is_integer(current):
+        return pa.float64()
+    if pa.types.is_string(current) or pa.types.is_large_string(current):
+        return None
+    return pa.string()
+
+
+def _widened_to_text(inferred: Dict[str, Any], column_types: Dict[str, Any]) -> Dict[str, Any]:
+    """Numeric, datetime and date columns of the first block since widened to text, with their first type."""
+    import pyarrow as pa
+
+    return {
+        name: original for name, original in inferred.items()
+        if pa.types.is_string(column_types[name]) and (
+            pa.types.is_integer(original) or pa.types.is_floating(original)
+            or pa.types.is_timestamp(original) or pa.types.is_date(original)
+        )
+    }
+
+
+def _coerce_text(values: pd.Series, original: "pa.DataType", use_pyarrow: bool) -> pd.Series:
+    """Text read into a numeric or datetime column, converted back to that kind (what does not fit is missing)."""
+    import pyarrow as pa
+
+    if pa.types.is_timestamp(original) or pa.types.is_date(original):
+        return pd.to_datetime(values.astype(object), errors="coerce")
+    converted = pd.to_numeric(values.astype(object), errors="coerce").astype("float64")
+    return converted.astype(pd.ArrowDtype(pa.float64())) if use_pyarrow else converted
+
+
+def _buffered_source(source: Union[str, bytes]) -> Union[str, BinaryIO]:
+    """A path as is, for the parser to open or map itself, or bytes behind a file interface."""
+    return source if isinstance(source, str) else io.BytesIO(source)
 
 
 class DataFrameLoader:
-    """Handles loading DataFrames from various file formats."""
+    """
+    Handles loading DataFrames from various file formats.
+
+    ``csv_options`` choose how whole CSV/TSV files are parsed (see
+    ``CsvOptions``); by default the pandas C parser infers types over the
+    whole file. Delimiter, encoding and compression are always sniffed.
+    """
 
-    def load_from_upload(self, filename: str, raw_bytes: bytes, use_pyarrow: bool = True) -> pd.DataFrame:
-        """Load DataFrame from uploaded file bytes."""
+    def __init__(self, csv_options: Optional[CsvOptions] = None):
+        self.csv_options: CsvOptions = csv_options or {}
+        if self.csv_options.get("engine", "pandas") not in CSV_ENGINES:
+            raise ValueError(f"Unsupported CSV engine: {self.csv_options['engine']}")
+
+    def load_from_upload(
+        self,
+        filename: str,
+        source: Union[str, bytes],
+        use_pyarrow: bool = True,
+        sheet: Optional[str] = None,
+        max_rows: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Load DataFrame from uploaded file bytes, or from the path an upload was spooled to.
+
+        Paths are never read into memory whole: CSV/TSV and Parquet files are
+        memory-mapped, Excel workbooks are opened in place.
+        ``sheet`` (a name or position) and ``max_rows`` only apply to Excel files.
+        With ``columns``, only those columns are parsed, in that order.
+        """
         file_extension = get_file_extension(filename)
-        buffer = io.BytesIO(raw_bytes)
+        buffer = _buffered_source(source)
 
         if file_extension in EXCEL_EXTENSIONS:
-            return self._load_excel_file(buffer)
+            return self._load_excel_file(buffer, file_extension, sheet, max_rows, columns)
 
         if file_extension in PARQUET_EXTENSIONS:
-            return self._load_parquet_file(buffer)
+            return self._load_parquet_file(buffer, columns)
 
         if file_extension in DELIMITED_EXTENSIONS:
-            return self._load_delimited_file(buffer, file_extension, use_pyarrow)
+            return self._load_delimited_file(source, file_extension, use_pyarrow, columns)
 
         raise ValueError(f"Unsupported file extension: {file_extension}")
 
-    def _load_excel_file(self, buffer: io.BytesIO) -> pd.DataFrame:
-        """Load Excel file (.xlsx, .xls)."""
-        return pd.read_excel(buffer)
+    def load_table_from_upload(
+        self,
+        filename: str,
+        source: Union[str, bytes],
+        sheet: Optional[str] = None,
+        max_rows: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> "pa.Table":
+        """
+        Load an Arrow table from uploaded file bytes or a spooled path (Arrow engine), optionally only some ``columns``.
+
+        Bytes are wrapped and paths memory-mapped, so neither is copied before parsing.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        file_extension = get_file_extension(filename)
+
+        if file_extension in EXCEL_EXTENSIONS:
+            excel_frame = self._load_excel_file(_buffered_source(source), file_extension, sheet, max_rows, columns)
+            return pa.Table.from_pandas(excel_frame, preserve_index=False)
+
+        if file_extension in PARQUET_EXTENSIONS:
+            return pq.read_table(open_arrow_source(source), columns=None if columns is None else list(columns))
+
+        if file_extension in DELIMITED_EXTENSIONS:
+            return self._read_arrow_table(source, sniff_dialect(source, file_extension), columns)
+
+        raise ValueError(f"Unsupported file extension: {file_extension}")
 
-    def _load_parquet_file(self, buffer: io.BytesIO) -> pd.DataFrame:
-        """Load Parquet file."""
-        return pd.read_parquet(buffer)
+    def _load_excel_file(
+        self,
+        buffer: Union[str, BinaryIO],
+        extension: str = ".xlsx",
+        sheet: Optional[str] = None,
+        max_rows: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """Load Excel file (.xlsx streamed in read-only mode, legacy .xls through ``read_excel``)."""
+        if extension == ".xlsx":
+            return read_excel_frame(buffer, sheet, max_rows, columns)
+        sheet_name = int(sheet) if sheet is not None and sheet.isdigit() else sheet
+        df = pd.read_excel(
+            buffer, sheet_name=0 if sheet_name is None else sheet_name, nrows=max_rows,
+            usecols=None if columns is None else list(columns),
+        )
+        return self._in_requested_order(df, columns)
 
-    def _load_delimited_file(self, buffer: io.BytesIO, extension: str, use_pyarrow: bool) -> pd.DataFrame:
-        """Load CSV or TSV file with appropriate separator."""
-        read_kwargs: Dict[str, Any] = {"low_memory": False}
+    def _load_parquet_file(
+        self,
+        buffer: Union[str, BinaryIO],
+        columns: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """Load Parquet file (memory-mapped when given a path)."""
+        read_kwargs: Dict[str, Any] = {"memory_map": True} if isinstance(buffer, str) else {}
+        return pd.read_parquet(buffer, columns=None if columns is None else list(columns), **read_kwargs)
 
+    def _load_delimited_file(
+        self,
+        source: Union[str, bytes],
+        extension: str,
+        use_pyarrow: bool,
+        columns: Optional[Sequence[str]] = None,
+        nrows: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Load a CSV or TSV file (or its first ``nrows`` rows) with the configured engine and its sniffed dialect."""
+        dialect = sniff_dialect(source, extension)
+        if self.csv_options.get("engine", "pandas") == "pandas":
+            return self._read_pandas_csv(source, dialect, use_pyarrow, columns, nrows)
+
+        import pyarrow as pa
+
+        if nrows is None:
+            table = self._read_arrow_table(source, dialect, columns)
+        else:
+            block_size = self.csv_options.get("block_size", DEFAULT_CSV_BLOCK_BYTES)
+            reader = self._open_arrow_reader(source, dialect, block_size, columns)
+            batches, rows = [], 0
+            for batch in reader:
+                batches.append(batch)
+                rows += batch.num_rows
+                if rows >= nrows:
+                    break
+            table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, nrows)
+        return table_to_frame(table) if use_pyarrow else table.to_pandas()
+
+    def _read_pandas_csv(
+        self,
+        source: Union[str, bytes],
+        dialect: CsvDialect,
+        use_pyarrow: bool,
+        columns: Optional[Sequence[str]],
+        nrows: Optional[int]
+    ) -> pd.DataFrame:
+        """
+        Parse with the pandas C parser: single-threaded, memory-mapping uncompressed paths.
+
+        Empty files cannot be mapped, so they are read normally and fail as
+        pandas reports them ("No columns to parse from file").
+
+        With ``infer_rows``, the leading rows are parsed first and the types of
+        their numeric and boolean columns imposed on the whole file, so a later
+        value that does not fit fails the parse (columns still empty in those
+        rows are left to inference). The C parser converts to numpy-backed
+        nullable types quickly, so columns are parsed as those and cast after.
+        """
+        read_kwargs: Dict[str, Any] = {
+            "sep": dialect["delimiter"],
+            "encoding": dialect["encoding"],
+            "low_memory": False,
+            "memory_map": isinstance(source, str) and dialect["compression"] is None and os.path.getsize(source) > 0,
+        }
         if use_pyarrow:
             read_kwargs["dtype_backend"] = "pyarrow"  # Requires pandas >= 2.0
+        if columns is not None:
+            read_kwargs["usecols"] = list(columns)
+
+        imposed: Dict[Any, Any] = {}
+        infer_rows = self.csv_options.get("infer_rows", 0)
+        if infer_rows and (nrows is None or nrows > infer_rows):
+            head = pd.read_csv(self._text_input(source, dialect), nrows=infer_rows, **read_kwargs)
+            imposed = {
+                name: dtype for name, dtype in head.dtypes.items()
+                if dtype.kind in "iufb" and head[name].notna().any()
+            }
+            read_kwargs["dtype"] = {name: _PARSE_DTYPES.get(dtype.kind, "float64") for name, dtype in imposed.items()}
+        df = pd.read_csv(self._text_input(source, dialect), nrows=nrows, **read_kwargs)
+        for name, dtype in imposed.items():
+            column = df[name]
+            if not isinstance(dtype, pd.ArrowDtype) and column.hasnans:
+                dtype = object if dtype.kind == "b" else "float64"  # what inference gives numpy columns with gaps
+            df[name] = column.astype(dtype)
+        return self._in_requested_order(df, columns)
+
+    @staticmethod
+    def _text_input(source: Union[str, bytes], dialect: CsvDialect) -> Any:
+        """What ``pd.read_csv`` reads: the path or bytes themselves, or a decompressing stream."""
+        if dialect["compression"] is not None:
+            return open_delimited(source, dialect["compression"])
+        return _buffered_source(source)
+
+    def _arrow_csv_options(
+        self,
+        dialect: CsvDialect,
+        block_size: int,
+        columns: Optional[Sequence[str]],
+        column_types: Optional[Dict[str, Any]] = None,
+        skip_rows: int = 0
+    ) -> Dict[str, Any]:
+        """
+        pyarrow.csv options; cells pandas reads as missing are null in every column, text included.
+
+        Repeated header names are renamed as pandas renames them (``a``,
+        ``a.1``), since pyarrow would keep them and columns must be unique.
+        """
+        from pyarrow import csv as pa_csv
+
+        header = dialect["header"]
+        renamed = header is not None and len(set(header)) < len(header)
+        return {
+            "read_options": pa_csv.ReadOptions(
+                block_size=block_size,
+                use_threads=self.csv_options.get("threads", 0) != 1,
+                encoding=arrow_encoding(dialect),
+                skip_rows=1 if renamed else 0,
+                column_names=unique_column_names(header) if renamed else None,
+                skip_rows_after_names=skip_rows,
+            ),
+            "parse_options": pa_csv.ParseOptions(delimiter=dialect["delimiter"]),
+            "convert_options": pa_csv.ConvertOptions(
+                include_columns=None if columns is None else list(columns),
+                column_types=column_types,
+                null_values=list(CSV_NULL_VALUES),
+                strings_can_be_null=True,
+            ),
+        }
+
+    def _open_arrow_reader(
+        self,
+        source: Union[str, bytes, BinaryIO],
+        dialect: CsvDialect,
+        block_size: int,
+        columns: Optional[Sequence[str]],
+        column_types: Optional[Dict[str, Any]] = None,
+        skip_rows: int = 0
+    ) -> "pa_csv.CSVStreamingReader":
+        """A streaming pyarrow.csv reader; column types not given come from its first block."""
+        from pyarrow import csv as pa_csv
+
+        return pa_csv.open_csv(
+            open_delimited(source, dialect["compression"]),
+            **self._arrow_csv_options(dialect, block_size, columns, column_types, skip_rows),
+        )
+
+    def _read_arrow_table(
+        self,
+        source: Union[str, bytes],
+        dialect: CsvDialect,
+        columns: Optional[Sequence[str]]
+    ) -> "pa.Table":
+        """
+        Parse a whole file with pyarrow.csv, blocks in parallel on pyarrow's CPU pool.
+
+        ``threads=1`` parses on the calling thread instead; the pool itself is
+        shared by the whole process and sized once, at startup.
+        With ``infer_rows``, column types come from one leading block sized to
+        hold about that many rows, instead of being inferred block by block;
+        a later value that does not fit fails the parse.
+        """
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+
+        column_types = None
+        infer_rows = self.csv_options.get("infer_rows", 0)
+        if infer_rows:
+            prefix, _, _ = read_prefix(source, CSV_SNIFF_BYTES, dialect["compression"])
+            line_bytes = len(prefix) / max(prefix.count(b"\n"), 1)
+            schema = self._open_arrow_reader(
+                source, dialect, max(int(line_bytes * (infer_rows + 1)), CSV_SNIFF_BYTES), columns
+            ).schema
+            column_types = {field.name: field.type for field in schema if not pa.types.is_null(field.type)}
+        block_size = self.csv_options.get("block_size", DEFAULT_CSV_BLOCK_BYTES)
+        return pa_csv.read_csv(
+            open_delimited(source, dialect["compression"]),
+            **self._arrow_csv_options(dialect, block_size, columns, column_types),
+        )
+
+    @staticmethod
+    def _in_requested_order(df: pd.DataFrame, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        """``usecols`` keeps file order; reorder to the requested one (a no-op when they agree)."""
+        if columns is None:
+            return df
+        ordered = project_columns(df.columns, columns)
+        return df if list(df.columns) == ordered else df[ordered]
+
+    def iter_delimited_batches(
+        self,
+        source: Union[str, BinaryIO],
+        extension: str,
+        use_pyarrow: bool = True,
+        block_size: int = DEFAULT_STREAM_BLOCK_BYTES,
+        columns: Optional[Sequence[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream a CSV or TSV file as DataFrame batches of roughly ``block_size`` bytes.
+
+        Column types are inferred from the first block, so peak memory is bounded
+        by the block size rather than the file size. A later value that does
+        not fit its column's type does not fail the stream: the file is read
+        on from that block with the column widened (integers to floats,
+        anything else to text, see ``_widened_type``). Columns that were
+        numeric or datetime keep their kind, so text found in them later is
+        read as missing. With ``columns``, the other columns are skipped by
+        the tokenizer and never converted. Compressed files are decompressed
+        block by block as well.
+        """
+        import pyarrow as pa
+
+        dialect = sniff_dialect(source, extension)
+        start = None if isinstance(source, str) else source.tell()
+        reader = self._open_arrow_reader(source, dialect, block_size, columns)
+        inferred = {field.name: field.type for field in reader.schema}
+        column_types = dict(inferred)
+        rows = 0
+        while True:
+            try:
+                if reader is None:
+                    # Read on from the first row not yet yielded, with the widened types
+                    if start is not None:
+                        source.seek(start)
+                    reader = self._open_arrow_reader(source, dialect, block_size, columns, column_types, rows)
+                batch = reader.read_next_batch()
+            except StopIteration:
+                return
+            except pa.ArrowInvalid as e:
+                if start is not None and not source.seekable():
+                    raise
+                name = self._conversion_error_column(e, source, dialect, block_size, columns, start, list(inferred))
+                widened = _widened_type(column_types[name]) if name in column_types else None
+                if widened is None:
+                    raise
+                column_types[name] = widened
+                reader = None
+                continue
+            rows += batch.num_rows
+            table = pa.Table.from_batches([batch])
+            frame = table_to_frame(table) if use_pyarrow else table.to_pandas()
+            for name, original in _widened_to_text(inferred, column_types).items():
+                frame[name] = _coerce_text(frame[name], original, use_pyarrow)
+            yield frame
+
+    def _conversion_error_column(
+        self,
+        error: Exception,
+        source: Union[str, BinaryIO],
+        dialect: CsvDialect,
+        block_size: int,
+        columns: Optional[Sequence[str]],
+        start: Optional[int],
+        names: List[str]
+    ) -> Optional[str]:
+        """The column a pyarrow.csv conversion error is about (``None`` for other errors); ``names`` are those read."""
+        match = _CONVERSION_ERROR.match(str(error))
+        if match is None:
+            return None
+        position = int(match.group(1))
+        if columns is not None:
+            # Positions count every column of the file, not only the projected ones
+            if start is not None:
+                source.seek(start)
+            names = self._open_arrow_reader(source, dialect, block_size, None).schema.names
+        if position >= len(names):
+            return None
+        return names[position]
+
+    def iter_excel_batches(
+        self,
+        source: Union[str, BinaryIO],
+        sheet: Optional[str] = None,
+        max_rows: Optional[int] = None,
+        batch_rows: int = EXCEL_BATCH_ROWS,
+        columns: Optional[Sequence[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream one sheet of an .xlsx workbook as typed DataFrame batches of ``batch_rows`` rows.
+
+        Column types are fixed by the first batch, so peak memory is bounded by
+        the batch size rather than the workbook size.
+        """
+        return iter_excel_batches(source, sheet, max_rows, batch_rows, columns)
+
+    def iter_upload_batches(
+        self,
+        filename: str,
+        source: Union[str, BinaryIO],
+        use_pyarrow: bool = True,
+        block_size: int = DEFAULT_STREAM_BLOCK_BYTES,
+        sheet: Optional[str] = None,
+        max_rows: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Parse an upload (a path or binary file object) as DataFrame batches.
+
+        CSV/TSV and .xlsx files are streamed; other formats are loaded whole
+        and yielded as a single batch.
+        """
+        extension = get_file_extension(filename)
+        if extension in DELIMITED_EXTENSIONS:
+            yield from self.iter_delimited_batches(source, extension, use_pyarrow, block_size, columns)
+        elif extension == ".xlsx":
+            yield from self.iter_excel_batches(source, sheet, max_rows, columns=columns)
+        elif isinstance(source, str):
+            yield self.load_from_upload(filename, source, use_pyarrow, sheet, max_rows, columns)
+        else:
+            yield self.load_from_upload(filename, source.read(), use_pyarrow, sheet, max_rows, columns)
+
+    def load_head(
+        self,
+        filename: str,
+        source: Union[str, bytes],
+        rows: int,
+        use_pyarrow: bool = True,
+        sheet: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Parse only the first ``rows`` data rows of an upload (a path or its bytes).
+
+        Column types come from those rows alone. CSV/TSV parsing stops after
+        them; Parquet reads the leading batch of its first row groups. Legacy
+        .xls sheets (at most 65536 rows) are read whole.
+        """
+        extension = get_file_extension(filename)
+        if extension in DELIMITED_EXTENSIONS:
+            return self._load_delimited_file(source, extension, use_pyarrow, columns, nrows=rows)
+        if extension in PARQUET_EXTENSIONS:
+            import pyarrow.parquet as pq
 
-        separator = "\t" if extension == ".tsv" else ","
-        return pd.read_csv(buffer, sep=separator, **read_kwargs)
+            parquet_file = pq.ParquetFile(open_arrow_source(source))
+            names = None if columns is None else project_columns(parquet_file.schema_arrow.names, columns)
+            batches = parquet_file.iter_batches(batch_size=rows, columns=names, use_pandas_metadata=True)
+            batch = next(batches, None)
+            if batch is None:
+                return self._load_parquet_file(_buffered_source(source), columns)
+            return batch.to_pandas()  # like read_parquet: pandas metadata restores the index and dtypes
+        if extension == ".xlsx":
+            return read_excel_frame(_buffered_source(source), sheet, rows, columns)
+        batches = self.iter_upload_batches(filename, _buffered_source(source), use_pyarrow, sheet=sheet, columns=columns)
+        return next(batches)
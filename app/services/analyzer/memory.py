@@ -0,0 +1,110 @@
+"""Lossless integer downcasting and categorical encoding of loaded frames."""
+
+import sys
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .constants import CATEGORY_MAX_UNIQUE_RATIO, SEMANTIC_SAMPLE_SIZE
+from .types import MemoryInfo
+from .utils import is_datetime_column_name, sample_series
+
+_SIGNED_WIDTHS = (
+    (np.int8, pa.int8()), (np.int16, pa.int16()), (np.int32, pa.int32()), (np.int64, pa.int64()),
+)
+
+
+def column_memory_bytes(series: pd.Series) -> int:
+    """
+    Bytes held by a column's values, including the Python objects it points to.
+
+    Object columns are sized from a bounded sample of their values instead
+    of visiting every object, which would cost more than optimizing them.
+    """
+    shallow = int(series.memory_usage(index=False, deep=False))
+    if series.dtype != object:
+        return int(series.memory_usage(index=False, deep=True))
+    sample = sample_series(series, SEMANTIC_SAMPLE_SIZE)
+    if len(sample) == 0:
+        return shallow
+    return shallow + int(sum(sys.getsizeof(value) for value in sample) / len(sample) * series.count())
+
+
+def _is_arrow(dtype: Any, kind: str) -> bool:
+    if not isinstance(dtype, pd.ArrowDtype):
+        return False
+    arrow_type = dtype.pyarrow_dtype
+    if kind == "integer":
+        return pa.types.is_integer(arrow_type)
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+
+
+def _downcast_integer(series: pd.Series) -> Optional[pd.Series]:
+    """The series in the narrowest signed integer type holding its range, or ``None``."""
+    if series.count() == 0:
+        return None
+    low, high = int(series.min()), int(series.max())
+    for numpy_type, arrow_type in _SIGNED_WIDTHS:
+        info = np.iinfo(numpy_type)
+        if info.min <= low and high <= info.max:
+            break
+    else:
+        return None
+    dtype = pd.ArrowDtype(arrow_type) if isinstance(series.dtype, pd.ArrowDtype) else np.dtype(numpy_type)
+    if dtype == series.dtype or dtype.itemsize >= series.dtype.itemsize:
+        return None
+    return series.astype(dtype)
+
+
+def _encode_categorical(series: pd.Series) -> Optional[pd.Series]:
+    """
+    The series dictionary-encoded as ``category`` when few values repeat often, or ``None``.
+
+    A bounded sample rules out high-cardinality columns before the full
+    column is factorized; the factorization is then reused as the codes.
+    """
+    sample = sample_series(series, SEMANTIC_SAMPLE_SIZE)
+    if len(sample) == 0 or sample.nunique() > CATEGORY_MAX_UNIQUE_RATIO * len(sample):
+        return None
+    codes, categories = pd.factorize(series)
+    if len(categories) > CATEGORY_MAX_UNIQUE_RATIO * len(series):
+        return None
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=series.index, name=series.name)
+
+
+def optimize_frame_memory(df: pd.DataFrame) -> MemoryInfo:
+    """
+    Shrink a frame in place without changing any value it holds.
+
+    Integer columns are narrowed to the smallest signed width holding their
+    range, and string columns whose values mostly repeat become ``category``
+    (codes plus one copy of each distinct value); Arrow-backed integers stay
+    Arrow-backed. Floats keep 64 bits: pandas reductions accumulate in the
+    column's own width, so float32 would change the reported statistics.
+    Columns are replaced, never written into, so frames sharing buffers with
+    ``df`` are unaffected. Columns named like dates are left to datetime
+    preprocessing. Returns the frame's memory before and after.
+    """
+    before = int(df.index.memory_usage()) + sum(
+        column_memory_bytes(df.iloc[:, position]) for position in range(len(df.columns))
+    )
+    after = before
+    for position, column in enumerate(df.columns):
+        if is_datetime_column_name(column):
+            continue
+        series = df.iloc[:, position]
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            continue
+        if _is_arrow(dtype, "integer") or (isinstance(dtype, np.dtype) and dtype.kind in "iu"):
+            optimized = _downcast_integer(series)
+        elif _is_arrow(dtype, "string") or pd.api.types.is_string_dtype(series):
+            optimized = _encode_categorical(series)
+        else:
+            optimized = None
+        if optimized is not None:
+            after += column_memory_bytes(optimized) - column_memory_bytes(series)
+            df.isetitem(position, optimized)
+    return {"before_bytes": before, "after_bytes": after}
@@ -0,0 +1,155 @@
+"""Parquet-aware fast path for the Arrow analysis engine."""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .arrow_engine import ArrowAnalysisContext, column_array, table_to_frame
+from .constants import PARQUET_SAMPLE_ROW_GROUPS, SEMANTIC_SAMPLE_SIZE
+from .selection import project_columns
+from .utils import is_datetime_column_name
+
+
+class ParquetFooter:
+    """Row count, per-column null counts and min/max aggregated from a Parquet footer."""
+
+    def __init__(self, metadata: pq.FileMetaData):
+        self.row_count = int(metadata.num_rows)
+        self.null_counts: Dict[str, int] = {}
+        self.min_max: Dict[str, Tuple[Any, Any]] = {}
+
+        for index in range(metadata.num_columns):
+            name = metadata.schema.column(index).path
+            nulls, minimum, maximum = 0, None, None
+            has_nulls, has_min_max = True, True
+            for group in range(metadata.num_row_groups):
+                row_group = metadata.row_group(group)
+                if row_group.num_rows == 0:
+                    continue
+                statistics = row_group.column(index).statistics
+                if statistics is None or not statistics.has_null_count:
+                    has_nulls = False
+                else:
+                    nulls += statistics.null_count
+                if statistics is None or not statistics.has_min_max:
+                    has_min_max = False
+                else:
+                    minimum = statistics.min if minimum is None else min(minimum, statistics.min)
+                    maximum = statistics.max if maximum is None else max(maximum, statistics.max)
+
+            if has_nulls:
+                self.null_counts[name] = nulls
+            if has_min_max and minimum is not None:
+                self.min_max[name] = (minimum, maximum)
+
+
+def _needs_full_read(field: pa.Field) -> bool:
+    """Numeric and temporal columns feed stats/trends; everything else is described from a sample."""
+    return (
+        pa.types.is_integer(field.type)
+        or pa.types.is_floating(field.type)
+        or pa.types.is_temporal(field.type)
+        or is_datetime_column_name(field.name)
+    )
+
+
+class ParquetAnalysisContext(ArrowAnalysisContext):
+    """
+    Arrow context over a Parquet file that avoids reading what the footer answers.
+
+    Only numeric and datetime columns are read in full (a column projection).
+    Row counts and null counts for the remaining columns come from footer
+    statistics, and numeric min/max do too where every row group has them.
+    Other columns are described from a sample of evenly spaced row groups,
+    streaming the remaining row groups one at a time only when needed.
+    With ``columns``, every other column is ignored.
+    """
+
+    def __init__(self, parquet_file: pq.ParquetFile, columns: Optional[Sequence[str]] = None, **options: Any):
+        self.parquet_file = parquet_file
+        self.footer = ParquetFooter(parquet_file.metadata)
+
+        schema = parquet_file.schema_arrow
+        index_columns = {
+            name for name in (schema.pandas_metadata or {}).get("index_columns", []) if isinstance(name, str)
+        }
+        self._columns = project_columns([name for name in schema.names if name not in index_columns], columns)
+        self._full_columns = [name for name in self._columns if _needs_full_read(schema.field(name))]
+        self._sampled_columns = [name for name in self._columns if name not in self._full_columns]
+        super().__init__(
+            table_to_frame(parquet_file.read(columns=self._full_columns, use_pandas_metadata=False)), **options
+        )
+
+    @classmethod
+    def open(cls, source: Any, columns: Optional[Sequence[str]] = None, **options: Any) -> "ParquetAnalysisContext":
+        """Open a Parquet path, buffer or file object; ``options`` go to ``AnalysisContext``."""
+        return cls(pq.ParquetFile(source), columns, **options)
+
+    @property
+    def row_count(self) -> int:
+        return self.footer.row_count
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._columns)
+
+    def column_sample(self, column: str) -> pd.Series:
+        if column in self._full_columns:
+            return self.df[column]
+        return self.memoize("parquet_sample", self._read_sample)[column]
+
+    def column_chunks(self, column: str) -> Optional[Iterator[pd.Series]]:
+        if column in self._full_columns:
+            return None
+        return (
+            table_to_frame(self.parquet_file.read_row_group(group, columns=[column]))[column]
+            for group in range(self.parquet_file.num_row_groups)
+        )
+
+    def _read_sample(self) -> pd.DataFrame:
+        """Evenly spaced rows from evenly spaced row groups, for the sampled columns only."""
+        group_count = self.parquet_file.num_row_groups
+        if not self._sampled_columns or group_count == 0:
+            return pd.DataFrame(columns=self._sampled_columns)
+
+        groups = np.unique(np.linspace(0, group_count - 1, num=min(group_count, PARQUET_SAMPLE_ROW_GROUPS)).astype(int))
+        rows_per_group = max(1, SEMANTIC_SAMPLE_SIZE // len(groups))
+        pieces = []
+        for group in groups:
+            table = self.parquet_file.read_row_group(int(group), columns=self._sampled_columns)
+            if table.num_rows > rows_per_group:
+                table = table.take(np.unique(np.linspace(0, table.num_rows - 1, num=rows_per_group).astype(int)))
+            pieces.append(table)
+        return table_to_frame(pa.concat_tables(pieces)).reset_index(drop=True)
+
+    def preview_frame(self, max_rows: int) -> pd.DataFrame:
+        preview = self.df.head(max_rows)
+        if self._sampled_columns and max_rows > 0:
+            batch = next(self.parquet_file.iter_batches(batch_size=max_rows, columns=self._sampled_columns), None)
+            if batch is not None:
+                sampled = table_to_frame(pa.Table.from_batches([batch]))
+                preview = pd.concat([preview.reset_index(drop=True), sampled], axis=1)
+        return preview.reindex(columns=self._columns)
+
+    def missing_counts(self) -> Dict[str, int]:
+        counts = {}
+        numeric = set(self.numeric_columns)
+        for column in self._columns:
+            if column in numeric:
+                counts[column] = int(self.arrow_column(column).null_count)
+            elif column in self._full_columns:
+                counts[column] = int(column_array(self.df[column]).null_count)
+            elif column in self.footer.null_counts:
+                counts[column] = int(self.footer.null_counts[column])
+            else:
+                counts[column] = sum(int(chunk.isna().sum()) for chunk in self.column_chunks(column))
+        return counts
+
+    def _min_max(self, column: str, array: pa.ChunkedArray) -> Tuple[Any, Any]:
+        if column in self.footer.min_max and (pa.types.is_integer(array.type) or pa.types.is_floating(array.type)):
+            # Writers may record a zero minimum as -0.0; ``+ 0`` normalizes it
+            minimum, maximum = self.footer.min_max[column]
+            return minimum + 0, maximum + 0
+        return super()._min_max(column, array)
@@ -0,0 +1,177 @@
+"""Dataset profiles: an analysis kept with the state its cheap stages are re-run from, without the data."""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from .accumulators import QuantileSketch
+from .constants import CORRELATION_BLOCK_COLUMNS
+from .core import DataFrameAnalyzer
+from .instrumentation import record_stage
+from .quantiles import column_sketches, quantile_label
+from .types import AnalysisResults, CorrelationMatrix, CorrelationPair, ProgressCallback
+
+# (row block, column block) -> tile of the correlation matrix, upper triangle only (row block <= column block)
+CorrelationBlocks = Dict[Tuple[int, int], np.ndarray]
+
+
+def correlation_blocks(matrix: np.ndarray, width: int = CORRELATION_BLOCK_COLUMNS) -> CorrelationBlocks:
+    """Split a symmetric matrix into ``width``-column tiles on and above the diagonal."""
+    count = matrix.shape[0]
+    return {
+        (row // width, column // width): np.ascontiguousarray(matrix[row:row + width, column:column + width])
+        for row in range(0, count, width)
+        for column in range(row, count, width)
+    }
+
+
+def downsample_rows(df: pd.DataFrame, max_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    A uniform sample of at most ``max_rows`` rows, in their original order.
+
+    The sample is indexed by the rows' positions in ``df``, so pages of it
+    can be traced back to the dataset.
+    """
+    positions = np.arange(len(df))
+    if len(df) > max_rows:
+        positions = np.sort(np.random.default_rng(seed).choice(len(df), size=max_rows, replace=False))
+    return df.iloc[positions].set_axis(pd.Index(positions))
+
+
+class DatasetProfile:
+    """
+    An analysis result with what re-running its cheap stages needs.
+
+    Alongside ``result``, a profile keeps the correlations of the
+    ``correlation_columns`` (the highest-variance numeric columns, in that
+    order) as ``correlation_blocks``, the strongest ``pairs`` among all
+    numeric columns, a quantile sketch of every numeric column and a
+    uniform ``sample`` of the rows. ``reanalyze`` answers other
+    ``max_corr_cols``, ``top_correlations`` and percentiles from these
+    alone; the sample is only needed to page through rows.
+    """
+
+    def __init__(
+        self,
+        result: AnalysisResults,
+        correlation_columns: List[str],
+        correlation_blocks: CorrelationBlocks,
+        pairs: List[CorrelationPair],
+        sketches: Dict[str, QuantileSketch],
+        sample: Optional[pd.DataFrame] = None
+    ):
+        self.result = result
+        self.correlation_columns = correlation_columns
+        self.correlation_blocks = correlation_blocks
+        self.pairs = pairs
+        self.sketches = sketches
+        self.sample = sample
+
+    @classmethod
+    def build(
+        cls,
+        analyzer: DataFrameAnalyzer,
+        *,
+        max_preview_rows: int,
+        max_corr_cols: int,
+        top_correlations: int,
+        sample_rows: int,
+        correlation_columns: int,
+        kept_pairs: int,
+        progress: Optional[ProgressCallback] = None
+    ) -> "DatasetProfile":
+        """
+        Analyze with ``analyzer`` and collect the profile state from the same context.
+
+        The wider correlation matrix and the longer list of pairs are computed
+        first, so the analysis itself only slices them.
+        """
+        context = analyzer.context
+        stats = analyzer.stats_analyzer
+        columns: List[str] = []
+        matrix = pd.DataFrame()
+        with record_stage("profile_correlations"):
+            if not context.numeric_frame.empty:
+                columns = list(stats.get_variances().index[:max(correlation_columns, max_corr_cols)])
+                matrix = context.correlation_matrix(columns)
+                context.store("correlations", matrix.fillna(0.0))
+            pairs = stats.get_top_correlations(max(kept_pairs, top_correlations))
+        result = analyzer.analyze(max_preview_rows, max_corr_cols, progress, top_correlations)
+        with record_stage("profile_sketches"):
+            sketches = dict(zip(
+                context.numeric_columns, column_sketches(context.numeric_matrix, context.quantile_error)
+            ))
+        with record_stage("profile_sample"):
+            sample = downsample_rows(analyzer.df, sample_rows)
+        return cls(
+            result, columns, correlation_blocks(matrix.to_numpy(dtype="float64")), pairs, sketches, sample
+        )
+
+    def correlation_matrix(self, count: int) -> np.ndarray:
+        """The correlations of the first ``count`` correlation columns, reassembled from the blocks."""
+        matrix = np.empty((count, count))
+        if count == 0:
+            return matrix
+        width = self.correlation_blocks[(0, 0)].shape[0]
+        for (row_block, column_block), block in self.correlation_blocks.items():
+            row, column = row_block * width, column_block * width
+            if row >= count or column >= count:
+                continue
+            tile = block[:count - row, :count - column]
+            matrix[row:row + tile.shape[0], column:column + tile.shape[1]] = tile
+            matrix[column:column + tile.shape[1], row:row + tile.shape[0]] = tile.T
+        return matrix
+
+    def correlations(self, max_columns: int) -> CorrelationMatrix:
+        """Correlations of the ``max_columns`` highest-variance numeric columns, as ``get_correlations`` reports them."""
+        kept = len(self.correlation_columns)
+        if max_columns > kept and kept < len(self.sketches):
+            raise ValueError(f"The profile keeps correlations of {kept} columns; max_corr_cols must be at most {kept}.")
+        columns = self.correlation_columns[:max_columns]
+        values = np.nan_to_num(self.correlation_matrix(len(columns)), nan=0.0).tolist()
+        return {row: dict(zip(columns, row_values)) for row, row_values in zip(columns, values)}
+
+    def top_correlations(self, k: int) -> List[CorrelationPair]:
+        """The ``k`` most strongly correlated pairs across all numeric columns, strongest first."""
+        columns = len(self.sketches)
+        if k > len(self.pairs) and len(self.pairs) < columns * (columns - 1) // 2:
+            raise ValueError(
+                f"The profile keeps the {len(self.pairs)} strongest pairs; top_correlations must be at most "
+                f"{len(self.pairs)}."
+            )
+        return self.pairs[:k]
+
+    def quantiles(self, probabilities: Sequence[float]) -> Dict[str, Dict[str, Optional[float]]]:
+        """Sketched quantiles of every numeric column, keyed by ``describe()``-style labels (``"90%"``)."""
+        if any(not 0.0 <= probability <= 1.0 for probability in probabilities):
+            raise ValueError("Quantile probabilities must be between 0 and 1.")
+        labels = [quantile_label(probability) for probability in probabilities]
+        return {
+            column: {
+                label: None if np.isnan(value) else float(value)
+                for label, value in zip(labels, sketch.quantiles(probabilities))
+            }
+            for column, sketch in self.sketches.items()
+        }
+
+    def reanalyze(
+        self,
+        max_corr_cols: Optional[int] = None,
+        top_correlations: Optional[int] = None,
+        probabilities: Optional[Sequence[float]] = None
+    ) -> AnalysisResults:
+        """
+        The profiled result with its cheap stages re-run under other parameters.
+
+        ``correlations`` and ``top_correlations`` are replaced when their
+        parameter is given, and ``probabilities`` adds a ``quantiles`` section.
+        Raises ``ValueError`` for parameters beyond what the profile kept.
+        """
+        result = dict(self.result)
+        if max_corr_cols is not None:
+            result["correlations"] = self.correlations(max_corr_cols)
+        if top_correlations is not None:
+            result["top_correlations"] = self.top_correlations(top_correlations)
+        if probabilities:
+            result["quantiles"] = self.quantiles(probabilities)
+        return result
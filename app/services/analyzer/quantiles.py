@@ -0,0 +1,90 @@
+"""Exact and sketched column quantiles shared by every consumer of an analysis."""
+
+import math
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .accumulators import QuantileSketch
+from .constants import ANALYSIS_BLOCK_ROWS, QUANTILE_BLOCK_VALUES, REPORTED_QUANTILES
+
+QUANTILE_MODES = ("exact", "sketch")
+
+# NumericStatistics field for each reported quantile
+QUANTILE_FIELDS: Dict[float, str] = {
+    0.01: "p1", 0.05: "p5", 0.25: "p25", 0.5: "median", 0.75: "p75", 0.95: "p95", 0.99: "p99",
+}
+assert set(QUANTILE_FIELDS) == set(REPORTED_QUANTILES)
+
+
+def quantile_label(probability: float) -> str:
+    """The ``describe()``-style label of a quantile, e.g. ``"25%"``."""
+    return f"{probability * 100:g}%"
+
+
+def sketch_k_for_error(error: float) -> int:
+    """
+    Sketch size whose rank error stays within ``error`` (as a fraction of the count).
+
+    Measured on 10^5 to 4*10^6 values fed in analysis-sized blocks, the
+    worst rank error over p1..p99 of ``QuantileSketch`` was about ``1.2 / k``;
+    ``2 / error`` leaves headroom for unlucky compactions.
+    """
+    if not 0 < error < 1:
+        raise ValueError(f"Quantile error must be between 0 and 1, got {error}")
+    return max(8, math.ceil(2.0 / error))
+
+
+def exact_quantiles(matrix: np.ndarray, probabilities: Sequence[float]) -> np.ndarray:
+    """
+    Linear-interpolated quantiles of every column of a 2D array, ignoring NaNs.
+
+    Equivalent to ``np.nanpercentile(matrix, 100 * p, axis=0)``, but every
+    requested probability is read from one sorted copy of each column, so
+    extra percentiles cost no extra pass. Columns are sorted in blocks of
+    about ``QUANTILE_BLOCK_VALUES`` values, in column-major order so each
+    column is contiguous. Returns an array of shape ``(len(probabilities), columns)``.
+    """
+    probabilities = np.asarray(probabilities, dtype="float64")
+    result = np.full((len(probabilities), matrix.shape[1]), np.nan)
+    if matrix.shape[0] == 0:
+        return result
+    block_columns = max(1, QUANTILE_BLOCK_VALUES // matrix.shape[0])
+    for start in range(0, matrix.shape[1], block_columns):
+        block = np.array(matrix[:, start:start + block_columns], dtype="float64", order="F")
+        block.sort(axis=0)  # NaNs sort to the end
+        counts = (~np.isnan(block)).sum(axis=0)
+        positions = probabilities[:, None] * np.maximum(counts - 1, 0)
+        lower = np.floor(positions).astype("int64")
+        upper = np.minimum(lower + 1, np.maximum(counts - 1, 0))
+        low_values = np.take_along_axis(block, lower, axis=0)
+        high_values = np.take_along_axis(block, upper, axis=0)
+        values = low_values + (high_values - low_values) * (positions - lower)
+        result[:, start:start + block.shape[1]] = np.where(counts > 0, values, np.nan)
+    return result
+
+
+def column_sketches(matrix: np.ndarray, error: float) -> List[QuantileSketch]:
+    """
+    A mergeable quantile sketch of every column of a 2D array.
+
+    Rows are fed in ``ANALYSIS_BLOCK_ROWS`` blocks, as streaming analysis
+    would feed chunks, so the estimates match what the streaming path reports
+    and the rank error stays within ``error``.
+    """
+    k = sketch_k_for_error(error)
+    sketches = []
+    for index in range(matrix.shape[1]):
+        sketch = QuantileSketch(k, seed=index)
+        for start in range(0, matrix.shape[0], ANALYSIS_BLOCK_ROWS):
+            sketch.update(matrix[start:start + ANALYSIS_BLOCK_ROWS, index])
+        sketches.append(sketch)
+    return sketches
+
+
+def sketch_quantiles(matrix: np.ndarray, probabilities: Sequence[float], error: float) -> np.ndarray:
+    """Approximate quantiles of every column of a 2D array from mergeable sketches (see ``column_sketches``)."""
+    result = np.empty((len(probabilities), matrix.shape[1]))
+    for index, sketch in enumerate(column_sketches(matrix, error)):
+        result[:, index] = sketch.quantiles(probabilities)
+    return result
@@ -0,0 +1,240 @@
+"""Uniform row sampling during parsing, and analysis of the sample with confidence intervals."""
+
+import io
+import math
+import os
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .constants import (
+    DELIMITED_EXTENSIONS, FINGERPRINT_CHUNK_BYTES, PARQUET_EXTENSIONS, SAMPLE_CONFIDENCE_LEVEL,
+    SCHEMA_EXACT_COUNT_BYTES,
+)
+from .context import AnalysisContext
+from .delimited import detect_compression, read_prefix
+from .excel import sheet_row_count
+from .instrumentation import record_stage
+from .quantiles import QUANTILE_FIELDS
+from .types import ConfidenceIntervals, SampleInfo
+from .utils import get_file_extension, preprocess_datetime_columns
+
+
+def z_score(confidence_level: float) -> float:
+    """Two-sided standard normal critical value, e.g. 1.96 for 0.95."""
+    return NormalDist().inv_cdf(0.5 + confidence_level / 2)
+
+
+def finite_population_correction(sample_rows: int, population_rows: int) -> float:
+    """Shrinks standard errors as the sample approaches the whole population (0 once it is all of it)."""
+    return math.sqrt(max(population_rows - sample_rows, 0) / max(population_rows - 1, 1))
+
+
+def estimate_row_count(filename: str, source: Union[str, bytes], sheet: Optional[str] = None) -> Optional[int]:
+    """
+    Cheap estimate of an upload's data rows, or ``None`` when it is not cheap to know.
+
+    Counts line breaks for CSV/TSV (extrapolated from a decompressed prefix
+    for compressed files), and reads the Parquet footer or the .xlsx sheet
+    dimension; nothing is parsed.
+    """
+    extension = get_file_extension(filename)
+    if extension in DELIMITED_EXTENSIONS:
+        if detect_compression(source) is not None:
+            return extrapolate_row_count(source, SCHEMA_EXACT_COUNT_BYTES)[0]
+        if isinstance(source, bytes):
+            lines = source.count(b"\n")
+        else:
+            lines = 0
+            with open(source, "rb") as fh:
+                while chunk := fh.read(FINGERPRINT_CHUNK_BYTES):
+                    lines += chunk.count(b"\n")
+        return max(lines - 1, 0)
+    if extension in PARQUET_EXTENSIONS:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        return int(pq.ParquetFile(pa.BufferReader(source) if isinstance(source, bytes) else source).metadata.num_rows)
+    if extension == ".xlsx":
+        return sheet_row_count(io.BytesIO(source) if isinstance(source, bytes) else source, sheet)
+    return None
+
+
+def extrapolate_row_count(source: Union[str, bytes], sample_bytes: int) -> Tuple[int, bool]:
+    """
+    Data rows of a CSV/TSV source from the line breaks in its first ``sample_bytes`` of text.
+
+    Returns the count and whether it is exact: sources whose text is no
+    longer than the sample are counted, longer ones are extrapolated by the
+    share of the file (compressed or not) the sample was read from.
+    """
+    prefix, consumed, complete = read_prefix(source, sample_bytes, detect_compression(source))
+    lines = prefix.count(b"\n")
+    if complete:
+        return max(lines - 1, 0), True
+    size = len(source) if isinstance(source, bytes) else os.path.getsize(source)
+    return max(round(lines * size / max(consumed, 1)) - 1, 0), False
+
+
+class RowSampler:
+    """
+    Uniform random sample of ``size`` rows from a stream of batches, plus exact counts from the same pass.
+
+    Each row draws a uniform random key and the ``size`` rows with the
+    smallest keys are kept (a bottom-k reservoir): a batch costs one
+    vectorized comparison against the current cut-off, and the result is a
+    uniform sample without replacement. Candidates are compacted only once
+    they reach twice the sample size. The pass also counts rows and missing
+    values and tracks numeric min/max exactly, and keeps the first rows as
+    the preview. Sampled rows keep their position in the dataset as index.
+    """
+
+    def __init__(self, size: int, max_preview_rows: int = 0, seed: int = 0):
+        self.size = max(1, size)
+        self.max_preview_rows = max_preview_rows
+        self.rows = 0
+        self.null_counts: Optional[pd.Series] = None
+        self.minimum: Dict[Any, float] = {}
+        self.maximum: Dict[Any, float] = {}
+        self.preview: Optional[pd.DataFrame] = None
+        self._rng = np.random.default_rng(seed)
+        self._candidates: List[pd.DataFrame] = []
+        self._keys: List[np.ndarray] = []
+        self._pending = 0
+        self._cutoff = 1.0
+
+    def update(self, batch: pd.DataFrame) -> None:
+        """Scan one batch and offer its rows to the sample."""
+        with record_stage("sample"):
+            self._update(batch)
+
+    def _update(self, batch: pd.DataFrame) -> None:
+        preprocess_datetime_columns(batch)
+        batch.index = pd.RangeIndex(self.rows, self.rows + len(batch))
+
+        nulls = batch.isna().sum()
+        self.null_counts = nulls if self.null_counts is None else self.null_counts + nulls
+        numeric = batch.select_dtypes(include=np.number)
+        for column, value in numeric.min().items():
+            if not pd.isna(value):
+                self.minimum[column] = min(self.minimum.get(column, math.inf), float(value))
+        for column, value in numeric.max().items():
+            if not pd.isna(value):
+                self.maximum[column] = max(self.maximum.get(column, -math.inf), float(value))
+        if self.preview is None or len(self.preview) < self.max_preview_rows:
+            head = batch.head(self.max_preview_rows - (0 if self.preview is None else len(self.preview)))
+            self.preview = head if self.preview is None else pd.concat([self.preview, head])
+
+        keys = self._rng.random(len(batch))
+        selected = np.flatnonzero(keys < self._cutoff)
+        if selected.size or not self._candidates:
+            self._candidates.append(batch.iloc[selected])
+            self._keys.append(keys[selected])
+            self._pending += selected.size
+            if self._pending >= 2 * self.size:
+                self._compact()
+        self.rows += len(batch)
+
+    def _compact(self) -> None:
+        """Keep only the ``size`` candidates with the smallest keys."""
+        keys = np.concatenate(self._keys)
+        frame = pd.concat(self._candidates) if len(self._candidates) > 1 else self._candidates[0]
+        if len(keys) > self.size:
+            chosen = np.argpartition(keys, self.size - 1)[:self.size]
+            frame, keys = frame.iloc[chosen], keys[chosen]
+            self._cutoff = float(keys.max())
+        self._candidates, self._keys, self._pending = [frame], [keys], len(keys)
+
+    def sample(self) -> pd.DataFrame:
+        """The sampled rows in dataset order, indexed by their position in the dataset."""
+        if not self._candidates:
+            return pd.DataFrame()
+        self._compact()
+        return self._candidates[0].sort_index()
+
+
+class SampledAnalysisContext(AnalysisContext):
+    """
+    Analysis context over a uniform row sample, answering exact counts from the full scan.
+
+    Row counts, missing values, non-missing counts, min/max and the preview
+    come from the ``RowSampler``'s pass over every row. Means, spreads,
+    quantiles, correlations and trends are estimated from the sample, with
+    normal-approximation confidence intervals for means and slopes and
+    distribution-free order-statistic intervals for quantiles, all narrowed
+    by the finite population correction.
+    """
+
+    def __init__(self, sampler: RowSampler, confidence_level: float = SAMPLE_CONFIDENCE_LEVEL, **options: Any):
+        super().__init__(sampler.sample(), **options)
+        self.population_rows = sampler.rows
+        self.null_counts = sampler.null_counts if sampler.null_counts is not None else pd.Series(dtype="int64")
+        self.minimum = sampler.minimum
+        self.maximum = sampler.maximum
+        self.preview = sampler.preview if sampler.preview is not None else self.df.head(0)
+        self.confidence_level = confidence_level
+
+    @property
+    def row_count(self) -> int:
+        return self.population_rows
+
+    def preview_frame(self, max_rows: int) -> pd.DataFrame:
+        return self.preview.head(max_rows)
+
+    def sample_info(self) -> Optional[SampleInfo]:
+        return {
+            "rows": len(self.df),
+            "fraction": len(self.df) / self.population_rows if self.population_rows else 1.0,
+            "method": "uniform",
+            "confidence_level": self.confidence_level,
+        }
+
+    def row_positions(self) -> np.ndarray:
+        return self.df.index.to_numpy(dtype="float64")
+
+    def missing_counts(self) -> Dict[str, int]:
+        return {column: int(self.null_counts.get(column, 0)) for column in self.df.columns}
+
+    def _population_count(self, column: Any) -> int:
+        return self.population_rows - int(self.null_counts.get(column, 0))
+
+    def numeric_summary(self) -> pd.DataFrame:
+        summary = super().numeric_summary()
+        columns = list(summary.index)
+        summary["count"] = [float(self._population_count(column)) for column in columns]
+        summary["min"] = [self.minimum.get(column, np.nan) for column in columns]
+        summary["max"] = [self.maximum.get(column, np.nan) for column in columns]
+        return summary
+
+    def statistic_intervals(self) -> Optional[Dict[str, ConfidenceIntervals]]:
+        return self.memoize("statistic_intervals", self._compute_statistic_intervals)
+
+    def _compute_statistic_intervals(self) -> Dict[str, ConfidenceIntervals]:
+        z = z_score(self.confidence_level)
+        matrix = self.numeric_matrix
+        intervals: Dict[str, ConfidenceIntervals] = {}
+        for index, column in enumerate(self.numeric_columns):
+            values = np.sort(matrix[:, index][~np.isnan(matrix[:, index])])
+            n = len(values)
+            if n == 0:
+                intervals[column] = {}
+                continue
+            correction = finite_population_correction(n, self._population_count(column))
+            mean = float(values.mean())
+            margin = z * float(values.std(ddof=1)) / math.sqrt(n) * correction if n > 1 else 0.0
+            column_intervals = {"mean": [mean - margin, mean + margin]}
+            for probability, field in QUANTILE_FIELDS.items():
+                # Ranks whose order statistics bracket the quantile with the requested confidence
+                spread = z * math.sqrt(n * probability * (1 - probability)) * correction
+                low = min(max(math.floor(probability * (n - 1) - spread), 0), n - 1)
+                high = min(max(math.ceil(probability * (n - 1) + spread), 0), n - 1)
+                column_intervals[field] = [float(values[low]), float(values[high])]
+            intervals[column] = column_intervals
+        return intervals
+
+    def slope_intervals(self, slopes: np.ndarray, standard_errors: np.ndarray) -> Optional[np.ndarray]:
+        correction = finite_population_correction(len(self.df), self.population_rows)
+        margin = z_score(self.confidence_level) * np.nan_to_num(standard_errors) * correction
+        return np.column_stack([slopes - margin, slopes + margin])
@@ -0,0 +1,75 @@
+"""Column and stage selection for partial analyses."""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .constants import SELECTABLE_STAGES
+from .types import AnalysisResults
+
+# Result sections produced by each stage; ``meta`` is always reported
+STAGE_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    "columns": ("columns",),
+    "preview": ("preview",),
+    "stats": ("missing", "numeric_stats"),
+    "correlations": ("correlations", "top_correlations"),
+    "trends": ("trends", "time_series"),
+    "insights": ("insights",),
+}
+assert tuple(STAGE_SECTIONS) == SELECTABLE_STAGES
+
+# Stages answered from the first rows of a file alone
+HEAD_STAGES: FrozenSet[str] = frozenset({"columns", "preview"})
+
+_EMPTY_SECTIONS: Dict[str, Any] = {
+    "columns": [], "preview": [], "missing": {}, "numeric_stats": {},
+    "correlations": {}, "top_correlations": [], "trends": [], "time_series": None, "insights": [],
+}
+
+
+def resolve_stages(
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None
+) -> Optional[FrozenSet[str]]:
+    """
+    The stages to run: ``include`` (default: all) minus ``exclude``.
+
+    Returns ``None`` when neither is given, meaning every stage.
+
+    Raises:
+        ValueError: If a name is not one of ``SELECTABLE_STAGES``
+    """
+    include = list(include or ())
+    exclude = list(exclude or ())
+    unknown = sorted(set(include + exclude) - set(SELECTABLE_STAGES))
+    if unknown:
+        raise ValueError(f"Unknown analysis stages: {', '.join(unknown)}; expected {', '.join(SELECTABLE_STAGES)}")
+    if not include and not exclude:
+        return None
+    return frozenset(include or SELECTABLE_STAGES) - frozenset(exclude)
+
+
+def project_columns(available: Sequence[Any], columns: Optional[Sequence[Any]]) -> List[Any]:
+    """
+    The requested columns in the requested order, or all of ``available``.
+
+    Raises:
+        ValueError: If a requested column does not exist
+    """
+    if columns is None:
+        return list(available)
+    known = set(available)
+    missing = [column for column in columns if column not in known]
+    if missing:
+        raise ValueError(f"Columns not found: {', '.join(map(str, missing))}")
+    return list(dict.fromkeys(columns))
+
+
+def restrict_results(results: AnalysisResults, stages: Optional[FrozenSet[str]]) -> AnalysisResults:
+    """Empty the sections of stages that were not requested, and list the requested stages in ``meta``."""
+    if stages is None:
+        return results
+    for stage, sections in STAGE_SECTIONS.items():
+        if stage not in stages:
+            for section in sections:
+                results[section] = type(_EMPTY_SECTIONS[section])()
+    results["meta"]["stages"] = [stage for stage in SELECTABLE_STAGES if stage in stages]
+    return results
@@ -1,17 +1,40 @@
 """Semantic type inference for DataFrame columns."""
 
-from typing import Optional
+from typing import Iterable, Optional
 import pandas as pd
 
-from .constants import DATETIME_KEYWORDS, CATEGORICAL_THRESHOLD_RATIO, CATEGORICAL_MIN_UNIQUE
-from .utils import try_datetime_conversion, infer_numeric_semantic_type
+from .accumulators import HyperLogLog
+from .constants import (
+    DATETIME_KEYWORDS, CATEGORICAL_THRESHOLD_RATIO, CATEGORICAL_MIN_UNIQUE,
+    CARDINALITY_CHUNK_ROWS, SEMANTIC_SAMPLE_SIZE,
+)
+from .utils import sample_series, try_datetime_conversion, infer_numeric_semantic_type
 
 
 class SemanticTypeInferencer:
-    """Handles semantic type inference for DataFrame columns."""
+    """
+    Handles semantic type inference for DataFrame columns.
+    
+    Inference works on a bounded sample of each column, so its cost does not
+    grow with the number of rows.
+    """
 
-    def infer_semantic_dtype(self, series: pd.Series) -> Optional[str]:
-        """Infer the semantic data type of a pandas Series."""
+    def __init__(self, sample_size: int = SEMANTIC_SAMPLE_SIZE):
+        self.sample_size = sample_size
+
+    def infer_semantic_dtype(
+        self,
+        series: pd.Series,
+        row_count: Optional[int] = None,
+        chunks: Optional[Iterable[pd.Series]] = None
+    ) -> Optional[str]:
+        """
+        Infer the semantic data type of a pandas Series.
+        
+        ``series`` may be a sample of a larger column, in which case
+        ``row_count`` is the column's full length and ``chunks`` lazily yields
+        the full column for the rare cases a sample is inconclusive.
+        """
         column_name = (series.name or "").lower()
         
         # Check pandas-detected datetime
@@ -31,16 +54,64 @@ class SemanticTypeInferencer:
             return infer_numeric_semantic_type(column_name)
         
         # Check for categorical vs text based on uniqueness
-        return self._infer_categorical_or_text(series)
+        return self._infer_categorical_or_text(series, row_count, chunks)
 
     def _is_potential_datetime_column(self, column_name: str, series: pd.Series) -> bool:
         """Check if column could be datetime based on name and convertibility."""
         if any(keyword in column_name for keyword in DATETIME_KEYWORDS):
-            return try_datetime_conversion(series)
+            return try_datetime_conversion(series, self.sample_size)
         return False
 
-    def _infer_categorical_or_text(self, series: pd.Series) -> str:
+    def _infer_categorical_or_text(
+        self,
+        series: pd.Series,
+        row_count: Optional[int] = None,
+        chunks: Optional[Iterable[pd.Series]] = None
+    ) -> str:
         """Determine if a non-numeric series should be treated as categorical or text."""
-        unique_count = series.nunique(dropna=True)
-        threshold = max(CATEGORICAL_MIN_UNIQUE, len(series) * CATEGORICAL_THRESHOLD_RATIO)
+        row_count = len(series) if row_count is None else row_count
+        threshold = max(CATEGORICAL_MIN_UNIQUE, row_count * CATEGORICAL_THRESHOLD_RATIO)
+        unique_count = self._estimate_unique_count(series, threshold, row_count, chunks)
         return "categorical" if unique_count < threshold else "text"
+
+    def _estimate_unique_count(
+        self,
+        series: pd.Series,
+        threshold: float,
+        row_count: int,
+        chunks: Optional[Iterable[pd.Series]] = None
+    ) -> float:
+        """
+        Estimate the number of distinct values, stopping as soon as the answer is clear.
+        
+        Small columns are counted exactly. Otherwise a bounded sample is tried
+        first: its distinct count is a lower bound on the column's, and the
+        Chao1 estimate of unseen values tells when the sample has very likely
+        seen (nearly) every value. Only if the sample is inconclusive is the
+        column hashed into a HyperLogLog sketch chunk by chunk, exiting once the
+        estimate passes the threshold.
+        """
+        if row_count <= self.sample_size:
+            return series.nunique(dropna=True)
+
+        sample_counts = sample_series(series, self.sample_size).value_counts()
+        if len(sample_counts) >= threshold:
+            return len(sample_counts)
+        singletons = int((sample_counts == 1).sum())
+        doubletons = int((sample_counts == 2).sum())
+        chao1 = len(sample_counts) + singletons * (singletons - 1) / (2.0 * (doubletons + 1))
+        if 2 * chao1 < threshold:
+            return chao1
+
+        if chunks is None:
+            chunks = (
+                series.iloc[start:start + CARDINALITY_CHUNK_ROWS]
+                for start in range(0, len(series), CARDINALITY_CHUNK_ROWS)
+            )
+        sketch = HyperLogLog()
+        for chunk in chunks:
+            sketch.update(chunk)
+            estimate = sketch.estimate()
+            if estimate >= threshold:
+                return estimate
+        return sketch.estimate()
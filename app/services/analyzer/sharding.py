@@ -0,0 +1,420 @@
+"""Multi-process analysis of wide tables by sharding columns across a process pool."""
+
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .constants import (
+    CORRELATION_BLOCK_COLUMNS, DEFAULT_QUANTILE_ERROR, DEFAULT_TOP_CORRELATIONS, SELECTABLE_STAGES,
+)
+from .core import ENGINES, DataFrameAnalyzer
+from .correlation import CorrelationEngine, PairCandidates, Standardization, nlargest_pairs, rank_pairs
+from .insights import InsightGenerator
+from .selection import restrict_results
+from .instrumentation import record_stage
+from .timeseries import rank_change_points, rank_seasonality
+from .trends import TrendAnalyzer, datetime_axis
+from .types import (
+    AnalysisResults, CorrelationMatrix, CorrelationPair, ProgressCallback, ShardResult, TimeSeriesInfo,
+)
+from .utils import is_datetime_column_name
+
+# Shards per worker process: more, smaller shards even out columns of unequal cost
+SHARDS_PER_WORKER = 2
+# Preferred location of the shared files: tmpfs, so "writing" them is a memory copy
+_SHARED_MEMORY_DIR = "/dev/shm"
+
+_executors: Dict[int, ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def shard_executor(workers: int) -> Executor:
+    """Process pool with ``workers`` processes, created on first use and reused afterwards."""
+    with _executors_lock:
+        if workers not in _executors:
+            # Spawned rather than forked: the server process runs threads
+            _executors[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executors[workers]
+
+
+def shutdown_shard_executors() -> None:
+    """Shut down every process pool started by ``shard_executor``."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def can_shard(df: pd.DataFrame, min_columns: int) -> bool:
+    """Whether a frame is wide enough to shard and has labels that survive the Arrow round trip."""
+    return (
+        len(df.columns) >= min_columns
+        and len(df) > 0
+        and df.columns.is_unique
+        and all(isinstance(column, str) for column in df.columns)
+    )
+
+
+class _SharedFiles:
+    """Temporary files shared with worker processes, in ``/dev/shm`` where available."""
+
+    def __init__(self) -> None:
+        self.paths: List[str] = []
+
+    def create(self, suffix: str) -> str:
+        directory = _SHARED_MEMORY_DIR if os.access(_SHARED_MEMORY_DIR, os.W_OK) else None
+        fd, path = tempfile.mkstemp(prefix="analytica-shard-", suffix=suffix, dir=directory)
+        os.close(fd)
+        self.paths.append(path)
+        return path
+
+    def close(self) -> None:
+        # Workers still mapping a file keep their pages until they unmap it
+        for path in self.paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self.paths.clear()
+
+
+def _partition(weights: Sequence[int], parts: int) -> List[slice]:
+    """Split positions into at most ``parts`` contiguous, non-empty ranges of similar total weight."""
+    cumulative = np.cumsum(np.maximum(np.asarray(weights, dtype="float64"), 1.0))
+    bounds = np.searchsorted(cumulative, cumulative[-1] * np.arange(1, parts) / parts, side="right")
+    edges = np.unique(np.concatenate([[0], bounds, [len(weights)]]).astype("int64"))
+    return [slice(int(start), int(stop)) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+
+def _x_axis(df: pd.DataFrame) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    The trend x-axis ``TrendAnalyzer`` would pick once datetime-named columns are converted.
+
+    Returns its values and its datetime column, ``None`` for row positions.
+    """
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return datetime_axis(series), column
+        if is_datetime_column_name(column):
+            try:
+                return datetime_axis(pd.to_datetime(series, errors="coerce")), column
+            except Exception:
+                continue  # left unconverted by preprocessing as well
+    return np.arange(len(df), dtype="float64"), None
+
+
+def _merge_time_series(shards: Sequence[Optional[TimeSeriesInfo]]) -> Optional[TimeSeriesInfo]:
+    """Combine the shards' time series: same axis, their change points and cycles ranked together."""
+    analyzed = [info for info in shards if info is not None]
+    if not analyzed:
+        return None
+    return {
+        **analyzed[0],
+        "change_points": rank_change_points([point for info in analyzed for point in info["change_points"]]),
+        "seasonality": rank_seasonality([cycle for info in analyzed for cycle in info["seasonality"]]),
+    }
+
+
+def _shard_frame(table: pa.Table, dtypes: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Rebuild a shard's DataFrame with its original dtypes.
+
+    Arrow-backed columns wrap the memory-mapped buffers without copying;
+    ``to_pandas`` would turn ``string[pyarrow]`` into Python-backed strings.
+    """
+    def arrow_backed(dtype: Any) -> bool:
+        return isinstance(dtype, pd.ArrowDtype) or (isinstance(dtype, pd.StringDtype) and dtype.storage == "pyarrow")
+
+    plain = [name for name in table.column_names if not arrow_backed(dtypes[name])]
+    converted = table.select(plain).to_pandas() if plain else None
+    data = {}
+    for name in table.column_names:
+        dtype = dtypes[name]
+        if isinstance(dtype, pd.ArrowDtype):
+            data[name] = pd.Series(pd.arrays.ArrowExtensionArray(table[name]), name=name, copy=False)
+        elif arrow_backed(dtype):
+            data[name] = pd.Series(pd.arrays.ArrowStringArray(table[name]), name=name, copy=False)
+        else:
+            data[name] = converted[name]
+    return pd.DataFrame(data, copy=False)
+
+
+def _analyze_shard(
+    table_path: str,
+    columns: List[str],
+    dtypes: Dict[str, Any],
+    engine: str,
+    quantile_mode: str,
+    quantile_error: float,
+    max_preview_rows: int,
+    x_path: str,
+    x_column: Optional[str],
+    matrix_path: Optional[str],
+    slot_offset: int,
+    slot_count: int
+) -> ShardResult:
+    """Run the per-column stages on one shard and write its numeric columns into the shared matrix."""
+    table = pa.ipc.open_file(pa.memory_map(table_path)).read_all().select(columns)
+    analyzer = DataFrameAnalyzer(
+        _shard_frame(table, dtypes), copy=False, engine=engine,
+        quantile_mode=quantile_mode, quantile_error=quantile_error,
+    )
+    context = analyzer.context
+    context.store("x_axis", np.load(x_path, mmap_mode="r"))
+    context.store("x_column", x_column)
+
+    numeric_columns = context.numeric_columns
+    if len(numeric_columns) > slot_count:
+        raise RuntimeError("Shard produced more numeric columns than were reserved for it.")
+    if numeric_columns:
+        matrix = np.load(matrix_path, mmap_mode="r+")
+        matrix[:, slot_offset:slot_offset + len(numeric_columns)] = context.numeric_matrix
+        matrix.flush()
+        del matrix
+
+    return {
+        "columns": analyzer._analyze_columns(),
+        "preview": analyzer._get_preview(max_preview_rows),
+        "missing": analyzer.stats_analyzer.get_missing_values(),
+        "numeric_stats": analyzer.stats_analyzer.get_numeric_statistics(),
+        "numeric_columns": numeric_columns,
+        "variances": context.column_variances().to_numpy(dtype="float64").tolist(),
+        "standardization": CorrelationEngine.standardize(context.numeric_matrix),
+        "trends": analyzer.trend_analyzer.analyze_trends(),
+        "time_series": analyzer.trend_analyzer.analyze_time_series(),
+    }
+
+
+def _correlation_tile(
+    matrix_path: str,
+    standardization: Standardization,
+    left: np.ndarray,
+    right: np.ndarray,
+    k: int,
+    same: bool
+) -> PairCandidates:
+    """Top-``k`` candidate pairs of one column-block tile of the shared matrix."""
+    engine = CorrelationEngine(np.load(matrix_path, mmap_mode="r"), standardization=standardization)
+    corr = engine.tile(left, left if same else right)
+    return nlargest_pairs(corr, k, left, right, upper_only=same)
+
+
+class ShardedAnalyzer:
+    """
+    Analyzes a wide DataFrame by sharding its columns across worker processes.
+
+    The frame is written once as an Arrow IPC file in shared memory, and each
+    worker memory-maps it and reads only its own contiguous range of columns,
+    so no DataFrame is pickled. Workers run the per-column stages (semantic
+    inference, missing values, numeric statistics, trend fits) and write their
+    numeric columns into a shared float64 matrix. Correlations are then a
+    blocked cross-shard step: column-block tiles of that matrix are spread
+    over the same pool and their candidate pairs merged. Results have the same
+    shape as ``DataFrameAnalyzer.analyze``.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        filename: Optional[str] = None,
+        *,
+        workers: int,
+        engine: str = "pandas",
+        executor: Optional[Executor] = None,
+        quantile_mode: str = "exact",
+        quantile_error: float = DEFAULT_QUANTILE_ERROR
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unsupported analysis engine: {engine}")
+        # Workers preprocess their own copies of the columns, so the frame is never modified
+        self.df = df
+        self.filename = filename or ""
+        self.workers = max(1, workers)
+        self.engine = engine
+        self.quantile_mode = quantile_mode
+        self.quantile_error = quantile_error
+        self.executor = executor if executor is not None else shard_executor(self.workers)
+
+    def analyze(
+        self,
+        max_preview_rows: int,
+        max_corr_cols: int,
+        progress: Optional[ProgressCallback] = None,
+        top_correlations: int = DEFAULT_TOP_CORRELATIONS,
+        stages: Optional[FrozenSet[str]] = None
+    ) -> AnalysisResults:
+        """
+        Perform complete analysis of the DataFrame (see ``DataFrameAnalyzer.analyze``).
+
+        Shards always run their per-column stages; ``stages`` skips the
+        cross-shard correlation step when neither correlations nor insights
+        are requested, and empties the sections that were not.
+        """
+        report = progress or (lambda stage: None)
+        selected = frozenset(SELECTABLE_STAGES) if stages is None else stages
+        files = _SharedFiles()
+        futures: List[Future] = []
+        try:
+            report("columns")
+            with record_stage("shard_setup"):
+                table_path, x_path, x_column, matrix_path, shards = self._share(files)
+            with record_stage("shards"):
+                futures = [
+                    self.executor.submit(
+                        _analyze_shard, table_path, columns, {c: self.df[c].dtype for c in columns}, self.engine,
+                        self.quantile_mode, self.quantile_error, max_preview_rows, x_path, x_column, matrix_path,
+                        slot_offset, slot_count,
+                    )
+                    for columns, slot_offset, slot_count in shards
+                ]
+                results: List[ShardResult] = []
+                for future in futures:
+                    results.append(future.result())
+                    report("columns")  # lets a cancelled job stop between shards
+
+            report("stats")
+            meta = {"filename": self.filename, "rows": int(len(self.df)), "cols": len(self.df.columns)}
+            columns_info = [info for result in results for info in result["columns"]]
+            preview = [
+                {key: value for shard_row in rows for key, value in shard_row.items()}
+                for rows in zip(*(result["preview"] for result in results))
+            ]
+            missing = {column: count for result in results for column, count in result["missing"].items()}
+            numeric_stats = {column: stats for result in results for column, stats in result["numeric_stats"].items()}
+
+            correlations: CorrelationMatrix = {}
+            top_pairs: List[CorrelationPair] = []
+            if selected & {"correlations", "insights"}:
+                report("correlations")
+                with record_stage("correlations"):
+                    correlations, top_pairs = self._correlations(
+                        matrix_path, shards, results, max_corr_cols, max(top_correlations, 1)
+                    )
+            report("trends")
+            with record_stage("trends"):
+                # Each shard kept its strongest trends, so the overall strongest are among them
+                trends = TrendAnalyzer.rank_trends([trend for result in results for trend in result["trends"]])
+                time_series = _merge_time_series([result["time_series"] for result in results])
+            report("insights")
+            with record_stage("insights"):
+                insights = InsightGenerator.build_insights(meta, numeric_stats, trends, top_pairs[:1])
+        finally:
+            for future in futures:
+                future.cancel()
+            files.close()
+
+        return restrict_results({
+            "meta": meta,
+            "columns": columns_info,
+            "preview": preview,
+            "missing": missing,
+            "numeric_stats": numeric_stats,
+            "correlations": correlations,
+            "top_correlations": top_pairs[:top_correlations],
+            "trends": trends,
+            "time_series": time_series,
+            "insights": insights
+        }, stages)
+
+    def _share(
+        self, files: _SharedFiles
+    ) -> Tuple[str, str, Optional[str], Optional[str], List[Tuple[List[str], int, int]]]:
+        """
+        Write the frame, the trend x-axis and an empty numeric matrix to shared files.
+
+        Returns their paths (with the x-axis's datetime column) and, per shard, its columns with the offset and
+        number of matrix columns reserved for it. Reservations count numeric
+        columns before datetime preprocessing, which can only remove some.
+        """
+        table = pa.Table.from_pandas(self.df, preserve_index=False, nthreads=self.workers)
+        table_path = files.create(".arrow")
+        with pa.OSFile(table_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        x_path = files.create(".npy")
+        x_values, x_column = _x_axis(self.df)
+        np.save(x_path, x_values)
+
+        column_names = list(self.df.columns)
+        numeric = set(self.df.select_dtypes(include=np.number).columns)
+        shards, offset = [], 0
+        weights = [table.column(index).nbytes for index in range(table.num_columns)]
+        for positions in _partition(weights, self.workers * SHARDS_PER_WORKER):
+            columns = column_names[positions]
+            slot_count = sum(column in numeric for column in columns)
+            shards.append((columns, offset, slot_count))
+            offset += slot_count
+
+        matrix_path = None
+        if offset:
+            matrix_path = files.create(".npy")
+            np.lib.format.open_memmap(
+                matrix_path, mode="w+", dtype="float64", shape=(len(self.df), offset), fortran_order=True
+            ).flush()
+        return table_path, x_path, x_column, matrix_path, shards
+
+    def _correlations(
+        self,
+        matrix_path: Optional[str],
+        shards: List[Tuple[List[str], int, int]],
+        results: List[ShardResult],
+        max_corr_cols: int,
+        k: int
+    ) -> Tuple[CorrelationMatrix, List[CorrelationPair]]:
+        """Correlation matrix of the highest-variance columns and the ``k`` strongest pairs overall."""
+        names: List[str] = []
+        positions: List[int] = []
+        variances: List[float] = []
+        slots = sum(slot_count for _, _, slot_count in shards)
+        mean, scale, varying = np.zeros(slots), np.ones(slots), np.zeros(slots, dtype=bool)
+        for (_, slot_offset, _), result in zip(shards, results):
+            count = len(result["numeric_columns"])
+            used = slice(slot_offset, slot_offset + count)
+            names.extend(result["numeric_columns"])
+            positions.extend(range(used.start, used.stop))
+            variances.extend(result["variances"])
+            mean[used], scale[used], varying[used] = result["standardization"]
+        if not names:
+            return {}, []
+        standardization = (mean, scale, varying)
+
+        # Same selection as StatisticalAnalyzer.get_correlations, over the merged variances
+        ranked = pd.Series(variances, index=names, dtype="float64").sort_values(ascending=False)
+        selected = list(ranked.index[:max_corr_cols])
+        slot_of = dict(zip(names, positions))
+        engine = CorrelationEngine(np.load(matrix_path, mmap_mode="r"), standardization=standardization)
+        corr = engine.correlation_matrix([slot_of[column] for column in selected])
+        values = np.where(np.isnan(corr), 0.0, corr).tolist()
+        correlations = {row: dict(zip(selected, row_values)) for row, row_values in zip(selected, values)}
+
+        if len(positions) < 2:
+            return correlations, []
+        width = max(1, min(CORRELATION_BLOCK_COLUMNS, math.ceil(len(positions) / self.workers)))
+        blocks = [np.asarray(positions[start:start + width], dtype=np.intp) for start in range(0, len(positions), width)]
+        futures = [
+            self.executor.submit(_correlation_tile, matrix_path, standardization, left, right, k, bi == bj)
+            for bi, left in enumerate(blocks)
+            for bj, right in enumerate(blocks)
+            if bj >= bi
+        ]
+        try:
+            pairs = rank_pairs([future.result() for future in futures], k)
+        finally:
+            for future in futures:
+                future.cancel()
+        name_of = dict(zip(positions, names))
+        return correlations, [
+            {"column_a": name_of[i], "column_b": name_of[j], "correlation": r} for i, j, r in pairs
+        ]
@@ -1,30 +1,34 @@
 """Statistical analysis for DataFrames."""
 
-from typing import Dict
+from typing import Dict, List
 import pandas as pd
-import numpy as np
 
-from .types import NumericStatistics, CorrelationMatrix
+from .context import AnalysisContext
+from .quantiles import QUANTILE_FIELDS, quantile_label
+from .types import NumericStatistics, CorrelationMatrix, CorrelationPair
 
 
 class StatisticalAnalyzer:
     """Handles statistical analysis of DataFrame data."""
 
-    def __init__(self, df: pd.DataFrame):
-        self.df = df
+    def __init__(self, context: AnalysisContext):
+        self.context = context
+        self.df = context.df
 
     def get_missing_values(self) -> Dict[str, int]:
         """Calculate missing values count for each column."""
-        return self.df.isna().sum().astype(int).to_dict()
+        return self.context.memoize("missing", self.context.missing_counts)
 
     def get_numeric_statistics(self) -> Dict[str, NumericStatistics]:
         """Calculate comprehensive statistics for numeric columns."""
-        numeric_df = self.df.select_dtypes(include=np.number)
-        if numeric_df.empty:
+        return self.context.memoize("numeric_stats", self._compute_numeric_statistics)
+
+    def _compute_numeric_statistics(self) -> Dict[str, NumericStatistics]:
+        if self.context.numeric_frame.empty:
             return {}
 
-        quantiles = numeric_df.quantile([0.25, 0.5, 0.75])
-        descriptions = numeric_df.describe().T
+        # The summary already includes the shared quantiles, so no separate quantile pass is needed
+        descriptions = self.context.numeric_summary()
 
         stats = {}
         for column, row in descriptions.iterrows():
@@ -34,46 +38,56 @@ class StatisticalAnalyzer:
                 "mean": float(row["mean"]) if count > 0 else None,
                 "std": float(row["std"]) if count > 1 else 0.0,
                 "min": float(row["min"]) if count > 0 else None,
-                "p25": float(quantiles.loc[0.25, column]) if count > 0 else None,
-                "median": float(quantiles.loc[0.5, column]) if count > 0 else None,
-                "p75": float(quantiles.loc[0.75, column]) if count > 0 else None,
+                **{
+                    field: float(row[quantile_label(probability)]) if count > 0 else None
+                    for probability, field in QUANTILE_FIELDS.items()
+                },
                 "max": float(row["max"]) if count > 0 else None,
             }
 
+        # Statistics estimated from a sample carry their confidence intervals
+        intervals = self.context.statistic_intervals()
+        if intervals is not None:
+            for column, column_intervals in intervals.items():
+                stats[column]["confidence"] = column_intervals
+
         return stats
 
+    def get_variances(self) -> pd.Series:
+        """Column variances of numeric columns, sorted from highest to lowest."""
+        return self.context.memoize(
+            "variances",
+            lambda: self.context.column_variances().sort_values(ascending=False),
+        )
+
     def get_correlations(self, max_columns: int) -> CorrelationMatrix:
         """Calculate Pearson correlations for numeric columns with highest variance."""
-        numeric_df = self.df.select_dtypes(include=np.number)
-        if numeric_df.empty:
+        if self.context.numeric_frame.empty:
             return {}
 
         # Select columns with highest variance
-        variance_sorted = numeric_df.var().sort_values(ascending=False)
-        selected_columns = variance_sorted.index[:max_columns]
+        variances = self.get_variances()
+        selected_columns = list(variances.index[:max_columns])
 
-        # Calculate correlation matrix
-        correlation_matrix = numeric_df[selected_columns].corr(method="pearson").fillna(0.0)
+        # Pearson correlation is pairwise, so any subset of a cached matrix is still exact
+        correlation_matrix = self.context.get("correlations")
+        if correlation_matrix is None or not set(selected_columns).issubset(correlation_matrix.columns):
+            correlation_matrix = self.context.correlation_matrix(selected_columns).fillna(0.0)
+            self.context.store("correlations", correlation_matrix)
+        values = correlation_matrix.loc[selected_columns, selected_columns].to_numpy(dtype="float64").tolist()
 
         # Convert to nested dictionary format
-        return {
-            row: {col: float(correlation_matrix.loc[row, col]) for col in correlation_matrix.columns}
-            for row in correlation_matrix.index
-        }
-
-    def find_strongest_correlation(self, correlations: CorrelationMatrix) -> tuple | None:
-        """Find the strongest correlation pair (excluding self-correlations)."""
-        strongest = None
-        max_abs_correlation = 0.0
-
-        for row_col, row_data in correlations.items():
-            for col_col, correlation_value in row_data.items():
-                if row_col == col_col:  # Skip self-correlation
-                    continue
-
-                abs_correlation = abs(correlation_value)
-                if abs_correlation > max_abs_correlation:
-                    max_abs_correlation = abs_correlation
-                    strongest = (row_col, col_col, correlation_value)
-
-        return strongest
+        return {row: dict(zip(selected_columns, row_values)) for row, row_values in zip(selected_columns, values)}
+
+    def get_top_correlations(self, k: int) -> List[CorrelationPair]:
+        """The ``k`` most strongly correlated pairs across all numeric columns, strongest first."""
+        # Cached as (k, pairs): the top pairs for a smaller k are a prefix of those for a larger one
+        cached = self.context.get("top_correlations")
+        if cached is None or cached[0] < k:
+            pairs = self.context.strongest_correlations(k) if not self.context.numeric_frame.empty else []
+            cached = (k, [
+                {"column_a": column_a, "column_b": column_b, "correlation": correlation}
+                for column_a, column_b, correlation in pairs
+            ])
+            self.context.store("top_correlations", cached)
+        return cached[1][:k]
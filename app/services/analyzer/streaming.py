@@ -0,0 +1,318 @@
+"""Streaming, bounded-memory analysis built on mergeable accumulators."""
+
+from typing import Dict, FrozenSet, List, Optional
+import pandas as pd
+import numpy as np
+
+from .accumulators import ColumnMoments, HyperLogLog, PairwiseCoMoments, QuantileSketch, RegressionSums
+from .constants import (
+    CATEGORICAL_MIN_UNIQUE, CATEGORICAL_THRESHOLD_RATIO, DEFAULT_QUANTILE_ERROR, DEFAULT_TOP_CORRELATIONS,
+    REPORTED_QUANTILES, SELECTABLE_STAGES,
+)
+from .correlation import strongest_pairs
+from .insights import InsightGenerator
+from .instrumentation import record_stage
+from .quantiles import QUANTILE_FIELDS, sketch_k_for_error
+from .semantic_inference import SemanticTypeInferencer
+from .timeseries import PeriodSums, TimeSeriesAnalyzer, infer_time_unit, time_unit_nanoseconds
+from .trends import TrendAnalyzer
+from .types import (
+    AnalysisResults, ColumnInfo, CorrelationMatrix, CorrelationPair, MetadataInfo, NumericStatistics, ProgressCallback, TrendInfo,
+)
+from .utils import preprocess_datetime_columns
+
+
+class StreamingAnalyzer:
+    """
+    Analyzes a dataset batch by batch while keeping memory bounded.
+
+    Only mergeable accumulators survive between batches: per-column moments,
+    null counts, quantile sketches, pairwise co-moments, regression sums and,
+    over a datetime column, per-period sums for the time-series analysis.
+    The schema, column semantics and preview come from the first batch(es).
+    Quantiles are approximate, with a rank error within ``quantile_error``;
+    everything else matches the in-memory path, except that text turning up
+    in a column typed numeric by the first batch counts as missing.
+
+    With ``track_cardinality``, categorical and text columns also keep a
+    HyperLogLog sketch, so their semantics are decided over every row seen
+    rather than the first batch. Analyzers whose state outlives one upload
+    (incremental re-analysis) use it.
+
+    With ``stages`` (a subset of ``SELECTABLE_STAGES``), only the
+    accumulators those stages report from are updated, and ``results`` can
+    only report those stages.
+    """
+
+    def __init__(
+        self,
+        filename: Optional[str] = None,
+        max_preview_rows: int = 0,
+        quantile_error: float = DEFAULT_QUANTILE_ERROR,
+        track_cardinality: bool = False,
+        stages: Optional[FrozenSet[str]] = None
+    ):
+        self.filename = filename or ""
+        self.max_preview_rows = max_preview_rows
+        self.sketch_k = sketch_k_for_error(quantile_error)
+        self.track_cardinality = track_cardinality
+        self.stages = frozenset(SELECTABLE_STAGES) if stages is None else stages
+        self.rows = 0
+        self.columns: List[str] = []
+        self.column_info: List[ColumnInfo] = []
+        self.numeric_columns: List[str] = []
+        self.x_column: Optional[str] = None
+        self.periods: Optional[PeriodSums] = None
+        self.null_counts = np.zeros(0, dtype="int64")
+        self.preview: List[Dict] = []
+        self.moments = ColumnMoments(0)
+        self.co_moments = PairwiseCoMoments(0)
+        self.regression = RegressionSums(0)
+        self.sketches: List[QuantileSketch] = []
+        self.cardinality: Dict[str, HyperLogLog] = {}
+
+    def update(self, batch: pd.DataFrame) -> None:
+        """Fold one batch of rows into the accumulators."""
+        with record_stage("datetime_preprocess"):
+            preprocess_datetime_columns(batch)
+        if not self.columns:
+            with record_stage("semantic_inference"):
+                self._initialize(batch)
+        elif list(batch.columns) != self.columns:
+            raise ValueError(
+                f"Rows have columns {list(batch.columns)} but the analyzed data has {self.columns}."
+            )
+
+        with record_stage("accumulate"):
+            self._accumulate(batch)
+
+    def tracks(self, *stages: str) -> bool:
+        """Whether any of ``stages`` is analyzed, or needed by an analyzed stage (insights need the others)."""
+        return any(stage in self.stages for stage in (*stages, "insights"))
+
+    def _accumulate(self, batch: pd.DataFrame) -> None:
+        if len(self.preview) < self.max_preview_rows and "preview" in self.stages:
+            self.preview.extend(batch.head(self.max_preview_rows - len(self.preview)).to_dict("records"))
+        if self.tracks("stats"):
+            self.null_counts += batch.isna().sum().to_numpy(dtype="int64")
+        if self.tracks("stats", "correlations", "trends"):
+            matrix = batch[self.numeric_columns].to_numpy(dtype="float64", na_value=np.nan)
+            if self.tracks("stats", "correlations"):
+                self.moments.update(matrix)
+            if self.tracks("correlations"):
+                self.co_moments.update(matrix)
+            if self.tracks("trends"):
+                x_values = self._get_x_axis_values(batch)
+                self.regression.update(x_values, matrix)
+                if self.periods is not None:
+                    self.periods.update(x_values, matrix)
+            for index, sketch in enumerate(self.sketches):
+                sketch.update(matrix[:, index])
+        for column, cardinality in self.cardinality.items():
+            cardinality.update(batch[column])
+
+        self.rows += len(batch)
+
+    def merge(self, other: "StreamingAnalyzer") -> None:
+        """Merge an analyzer that saw the rows following this one's."""
+        if not other.columns:
+            return
+        if not self.columns:
+            self.__dict__.update(other.__dict__)
+            return
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge analyses with different columns.")
+        if other.stages != self.stages:
+            raise ValueError("Cannot merge analyses of different stages.")
+
+        self.null_counts += other.null_counts
+        self.preview.extend(other.preview[: max(0, self.max_preview_rows - len(self.preview))])
+        self.moments.merge(other.moments)
+        self.co_moments.merge(other.co_moments)
+        self.regression.merge(other.regression)
+        if self.periods is not None and other.periods is not None:
+            self.periods.merge(other.periods)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        for column, cardinality in self.cardinality.items():
+            if column in other.cardinality:
+                cardinality.merge(other.cardinality[column])
+        self.rows += other.rows
+
+    def _initialize(self, batch: pd.DataFrame) -> None:
+        """Fix the schema and column semantics from the first batch."""
+        inferencer = SemanticTypeInferencer()
+        self.columns = list(batch.columns)
+        if "columns" in self.stages:
+            self.column_info = [
+                {
+                    "name": col,
+                    "dtype": str(batch[col].dtype),
+                    "inferred_semantic": inferencer.infer_semantic_dtype(batch[col]),
+                }
+                for col in self.columns
+            ]
+        self.numeric_columns = list(batch.select_dtypes(include=np.number).columns)
+        self.x_column = next(
+            (col for col in self.columns if pd.api.types.is_datetime64_any_dtype(batch[col])), None
+        )
+        # Accumulators of stages that are not analyzed stay empty
+        n_numeric = len(self.numeric_columns)
+        if self.x_column is not None and self.tracks("trends"):
+            # Rows are not kept, so the slope unit is inferred from the first batch (and coarsened as needed)
+            unit = infer_time_unit(self._get_x_axis_values(batch))
+            self.periods = PeriodSums(self.x_column, unit, n_numeric)
+        self.null_counts = np.zeros(len(self.columns), dtype="int64")
+        self.moments = ColumnMoments(n_numeric)
+        self.co_moments = PairwiseCoMoments(n_numeric if self.tracks("correlations") else 0)
+        self.regression = RegressionSums(n_numeric if self.tracks("trends") else 0)
+        if self.tracks("stats", "trends"):
+            self.sketches = [QuantileSketch(self.sketch_k, seed=index) for index in range(n_numeric)]
+        if self.track_cardinality and "columns" in self.stages:
+            self.cardinality = {
+                info["name"]: HyperLogLog()
+                for info in self.column_info
+                if info["inferred_semantic"] in ("categorical", "text")
+            }
+
+    def _get_x_axis_values(self, batch: pd.DataFrame) -> np.ndarray:
+        """X-axis values for this batch: the datetime column or the global row index."""
+        if self.x_column is not None:
+            timestamps = pd.to_datetime(batch[self.x_column], errors="coerce")
+            values = timestamps.astype("int64").astype("float64").to_numpy()
+            return np.where(timestamps.isna().to_numpy(), np.nan, values)
+        return np.arange(self.rows, self.rows + len(batch), dtype="float64")
+
+    def results(
+        self,
+        max_corr_cols: int,
+        progress: Optional[ProgressCallback] = None,
+        top_correlations: int = DEFAULT_TOP_CORRELATIONS,
+        stages: Optional[FrozenSet[str]] = None
+    ) -> AnalysisResults:
+        """
+        Finalize the accumulators into the standard analysis result shape.
+
+        With ``stages`` (default: the analyzer's), the other stages are not
+        run and their sections are left empty, as ``DataFrameAnalyzer.analyze``
+        leaves them.
+
+        Raises:
+            ValueError: If ``stages`` includes one the analyzer did not accumulate
+        """
+        selected = self.stages if stages is None else stages
+        if not selected <= self.stages:
+            raise ValueError(f"Stages not analyzed: {', '.join(sorted(selected - self.stages))}")
+        report = progress or (lambda stage: None)
+        report("columns")
+        meta: MetadataInfo = {
+            "filename": self.filename,
+            "rows": int(self.rows),
+            "cols": len(self.columns),
+        }
+        missing, numeric_stats, correlations, trends, insights = {}, {}, {}, [], []
+        time_series = None
+        top_pairs: List[CorrelationPair] = []
+        if selected & {"stats", "insights"}:
+            report("stats")
+            with record_stage("numeric_stats"):
+                missing = {col: int(count) for col, count in zip(self.columns, self.null_counts)}
+                numeric_stats = self._get_numeric_statistics()
+        if selected & {"correlations", "insights"}:
+            report("correlations")
+            with record_stage("correlations"):
+                if "correlations" in selected:
+                    correlations = self._get_correlations(max_corr_cols)
+                # The insight needs the strongest pair even when none are requested
+                top_pairs = self._get_top_correlations(max(top_correlations, 1))
+        if selected & {"trends", "insights"}:
+            report("trends")
+            with record_stage("trends"):
+                time_series = self._get_time_series()
+                trends = self._get_trends()
+                if time_series is not None:
+                    TrendAnalyzer.add_time_series(trends, time_series)
+        if "insights" in selected:
+            report("insights")
+            with record_stage("insights"):
+                insights = InsightGenerator.build_insights(meta, numeric_stats, trends, top_pairs)
+        if stages is not None or self.stages != frozenset(SELECTABLE_STAGES):
+            meta["stages"] = [stage for stage in SELECTABLE_STAGES if stage in selected]
+        return {
+            "meta": meta,
+            "columns": self._get_column_info() if "columns" in selected else [],
+            "preview": self.preview if "preview" in selected else [],
+            "missing": missing if "stats" in selected else {},
+            "numeric_stats": numeric_stats if "stats" in selected else {},
+            "correlations": correlations,
+            "top_correlations": top_pairs[:top_correlations] if "correlations" in selected else [],
+            "trends": trends if "trends" in selected else [],
+            "time_series": time_series.info() if time_series is not None and "trends" in selected else None,
+            "insights": insights,
+        }
+
+    def _get_column_info(self) -> List[ColumnInfo]:
+        """Column descriptions, with categorical vs text decided over all rows where cardinality is tracked."""
+        threshold = max(CATEGORICAL_MIN_UNIQUE, self.rows * CATEGORICAL_THRESHOLD_RATIO)
+        return [
+            {
+                **info,
+                "inferred_semantic": "categorical" if self.cardinality[info["name"]].estimate() < threshold else "text",
+            }
+            if info["name"] in self.cardinality else info
+            for info in self.column_info
+        ]
+
+    def _get_numeric_statistics(self) -> Dict[str, NumericStatistics]:
+        stats = {}
+        variances = self.moments.variance()
+        for index, column in enumerate(self.numeric_columns):
+            count = int(self.moments.count[index])
+            quantiles = self.sketches[index].quantiles(REPORTED_QUANTILES)
+            stats[column] = {
+                "count": count,
+                "mean": float(self.moments.mean[index]) if count > 0 else None,
+                "std": float(np.sqrt(variances[index])) if count > 1 else 0.0,
+                "min": float(self.moments.min[index]) if count > 0 else None,
+                **{
+                    QUANTILE_FIELDS[probability]: float(value) if count > 0 else None
+                    for probability, value in zip(REPORTED_QUANTILES, quantiles)
+                },
+                "max": float(self.moments.max[index]) if count > 0 else None,
+            }
+        return stats
+
+    def _get_correlations(self, max_columns: int) -> CorrelationMatrix:
+        if not self.numeric_columns:
+            return {}
+
+        variances = pd.Series(self.moments.variance(), index=range(len(self.numeric_columns)))
+        selected = list(variances.sort_values(ascending=False).index[:max_columns])
+        matrix = np.nan_to_num(self.co_moments.correlation(selected), nan=0.0)
+        names = [self.numeric_columns[i] for i in selected]
+        return {row: dict(zip(names, row_values)) for row, row_values in zip(names, matrix.tolist())}
+
+    def _get_top_correlations(self, k: int) -> List[CorrelationPair]:
+        # The co-moments already cover every pair of numeric columns
+        names = self.numeric_columns
+        return [
+            {"column_a": names[i], "column_b": names[j], "correlation": r}
+            for i, j, r in strongest_pairs(self.co_moments.correlation(), k)
+        ]
+
+    def _get_time_series(self) -> Optional[TimeSeriesAnalyzer]:
+        if self.periods is None:
+            return None
+        return TimeSeriesAnalyzer(self.periods.axis()).analyze_series(self.periods.means(), self.numeric_columns)
+
+    def _get_trends(self) -> List[TrendInfo]:
+        slopes, _, r_squared, counts = self.regression.fit()
+        unit = self.periods.unit if self.periods is not None else None
+        if unit is not None:
+            # Fitted per nanosecond; reported per unit
+            slopes = slopes * time_unit_nanoseconds(unit)
+        spreads = np.array([
+            np.subtract(*sketch.quantiles([0.75, 0.25])) if sketch.count else 0.0
+            for sketch in self.sketches
+        ])
+        return TrendAnalyzer.select_trends(self.numeric_columns, slopes, r_squared, counts, spreads, unit=unit)
@@ -0,0 +1,567 @@
+"""Time-aware trends: calendar resampling, segmented and rolling fits, change points and seasonality."""
+
+import warnings
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .accumulators import HyperLogLog
+from .constants import (
+    CHANGE_POINT_PENALTY, MAX_CHANGE_POINTS, MAX_CHANGE_POINTS_TO_RETURN,
+    MAX_TIME_SERIES_POINTS, MAX_TRENDS_TO_RETURN, MIN_SEASONAL_STRENGTH, MIN_SEGMENT_POINTS, ROLLING_TREND_POINTS,
+    SEASONAL_PERIODS, TIME_SERIES_BLOCK_COLUMNS, TIME_UNITS,
+)
+from .types import ChangePoint, Seasonality, TimeSeriesInfo, TrendSegment
+
+_UNIT_NS: Dict[str, float] = dict(TIME_UNITS)
+_UNIT_NAMES = [name for name, _ in TIME_UNITS]
+_DAY_NS = 86400 * 10 ** 9
+_WEEK_NS = 7 * _DAY_NS
+# 1970-01-01 was a Thursday: shifting by three days makes weeks start on Mondays
+_WEEK_SHIFT_NS = 3 * _DAY_NS
+# Calendar units counted in months since the epoch
+_MONTHS_PER_PERIOD = {"month": 1, "quarter": 3, "year": 12}
+
+# Per-segment prefix sums: valid count, x, y, x², xy, y² (stacked on the first axis)
+PrefixSums = np.ndarray
+
+
+def time_unit(spacing_ns: float) -> str:
+    """The largest unit of ``TIME_UNITS`` not longer than a spacing, within 10% so months of 28 days count."""
+    unit = _UNIT_NAMES[0]
+    for name, length in TIME_UNITS:
+        if length * 0.9 <= spacing_ns:
+            unit = name
+    return unit
+
+
+def time_unit_nanoseconds(unit: str) -> float:
+    """Length of a ``TIME_UNITS`` unit in nanoseconds (on average, for months and longer)."""
+    return _UNIT_NS[unit]
+
+
+def _distinct_count(ns: np.ndarray) -> int:
+    """Number of distinct int64 timestamps; sorted ones, the usual case, are counted without hashing."""
+    if len(ns) < 2:
+        return len(ns)
+    steps = np.diff(ns)
+    if (steps >= 0).all():
+        return 1 + int(np.count_nonzero(steps))
+    return len(pd.unique(ns))
+
+
+def _axis_unit(ns: np.ndarray, distinct: int) -> Tuple[str, int, int]:
+    """The unit of int64 timestamps with ``distinct`` distinct values, and the first and last period they fall in."""
+    extremes = np.array([ns.min(), ns.max()])
+    finest = time_unit((extremes[1] - extremes[0]) / (distinct - 1)) if distinct > 1 else "day"
+    for name in _UNIT_NAMES[_UNIT_NAMES.index(finest):]:
+        first, last = _period_codes(extremes, name)
+        if last - first < MAX_TIME_SERIES_POINTS:
+            break
+    return name, int(first), int(last)
+
+
+def infer_time_unit(timestamps: np.ndarray) -> str:
+    """The unit ``TimeAxis`` would pick for timestamps (float64 epoch nanoseconds, NaN for missing)."""
+    ns = timestamps[np.isfinite(timestamps)].astype("int64")
+    return _axis_unit(ns, _distinct_count(ns))[0] if len(ns) else "day"
+
+
+def _period_codes(ns: np.ndarray, unit: str) -> np.ndarray:
+    """The calendar period of each timestamp (int64 epoch nanoseconds), counted from the epoch's."""
+    if unit in _MONTHS_PER_PERIOD:
+        months = ns.astype("datetime64[ns]").astype("datetime64[M]").astype("int64")
+        return months // _MONTHS_PER_PERIOD[unit]
+    if unit == "week":
+        return (ns + _WEEK_SHIFT_NS) // _WEEK_NS
+    return ns // int(_UNIT_NS[unit])
+
+
+def _period_starts(codes: np.ndarray, unit: str) -> np.ndarray:
+    """The start of each calendar period, as int64 epoch nanoseconds."""
+    if unit in _MONTHS_PER_PERIOD:
+        months = (codes * _MONTHS_PER_PERIOD[unit]).astype("datetime64[M]")
+        return months.astype("datetime64[ns]").astype("int64")
+    if unit == "week":
+        return codes * _WEEK_NS - _WEEK_SHIFT_NS
+    return codes * int(_UNIT_NS[unit])
+
+
+class TimeAxis:
+    """
+    A datetime trend axis, and the calendar periods its rows are resampled into.
+
+    The ``unit`` of slopes and periods is the average spacing of the distinct
+    timestamps (the regular spacing of a regular series, gaps included), or
+    the first coarser unit whose span fits in ``MAX_TIME_SERIES_POINTS``
+    periods. Rows are assigned to periods by integer arithmetic on their
+    timestamps (by month number for months, quarters and years), so
+    resampling to per-period means is a ``bincount`` pass over rows in any
+    order: unsorted rows need no sort, and rows sharing a timestamp are
+    averaged into the same period.
+    """
+
+    def __init__(self, column: str, timestamps: np.ndarray):
+        self.column = column
+        valid = np.isfinite(timestamps)
+        ns = timestamps[valid].astype("int64")
+        distinct = _distinct_count(ns)
+        self.rows = len(ns)
+        self.duplicates = self.rows - distinct
+        self.unit = "day"
+        self.codes = np.full(len(timestamps), -1, dtype="int64")
+        self.first_period, self.points = 0, 0
+        if not self.rows:
+            return
+        self.unit, self.first_period, last = _axis_unit(ns, distinct)
+        self.points = last - self.first_period + 1
+        self.codes[valid] = _period_codes(ns, self.unit) - self.first_period
+
+    @classmethod
+    def from_periods(
+        cls, column: str, unit: str, first_period: int, points: int, rows: int, duplicates: int
+    ) -> "TimeAxis":
+        """An axis over periods resampled elsewhere, as streamed rows are; it has no per-row codes to ``resample``."""
+        axis = cls(column, np.empty(0))
+        axis.unit, axis.first_period, axis.points = unit, first_period, points
+        axis.rows, axis.duplicates = rows, duplicates
+        return axis
+
+    @property
+    def origin(self) -> int:
+        """Start of the first period, in epoch nanoseconds."""
+        return int(_period_starts(np.array([self.first_period]), self.unit)[0])
+
+    def scale(self, timestamps: np.ndarray) -> np.ndarray:
+        """Epoch nanoseconds as units since the first period's start."""
+        return (timestamps - self.origin) / _UNIT_NS[self.unit]
+
+    def period_start(self, index: int) -> str:
+        """ISO 8601 start of the period at ``index``."""
+        return pd.Timestamp(int(_period_starts(np.array([self.first_period + index]), self.unit)[0])).isoformat()
+
+    def resample(self, matrix: np.ndarray) -> np.ndarray:
+        """Per-period means (``points x columns``) of a ``rows x columns`` matrix, NaN for periods without values."""
+        dated = self.codes >= 0
+        codes = self.codes if dated.all() else self.codes[dated]
+        dated_counts = None
+        means = np.empty((self.points, matrix.shape[1]))
+        for index in range(matrix.shape[1]):
+            values = matrix[:, index] if len(codes) == len(dated) else matrix[dated, index]
+            present = np.isfinite(values)
+            if present.all():
+                # Columns without missing values share their counts
+                if dated_counts is None:
+                    dated_counts = np.bincount(codes, minlength=self.points)
+                sums, counts = np.bincount(codes, weights=values, minlength=self.points), dated_counts
+            else:
+                sums = np.bincount(codes[present], weights=values[present], minlength=self.points)
+                counts = np.bincount(codes[present], minlength=self.points)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means[:, index] = sums / counts
+        return means
+
+
+class PeriodSums:
+    """
+    Per-period sums and counts of numeric columns over a datetime axis, accumulated batch by batch.
+
+    Streamed rows are not kept, so they are resampled as they arrive: into
+    calendar periods of ``unit`` (inferred from the first batch), from the
+    first period seen to the last. When that span outgrows
+    ``MAX_TIME_SERIES_POINTS``, periods are folded by their start into the
+    first coarser unit it fits in, as ``TimeAxis`` would have picked over
+    all rows. Rows sharing a timestamp are counted exactly while timestamps
+    arrive in order, and estimated from a HyperLogLog of them otherwise.
+    """
+
+    def __init__(self, column: str, unit: str, n_columns: int):
+        self.column = column
+        self.unit = unit
+        self.first_period = 0
+        self.sums = np.zeros((0, n_columns))
+        self.counts = np.zeros((0, n_columns))
+        self.rows = 0
+        self.first: Optional[int] = None
+        self.last: Optional[int] = None
+        self.ordered = True
+        self.repeats = 0  # rows equal to the row before them, while in order
+        self.distinct = HyperLogLog()
+
+    def update(self, timestamps: np.ndarray, matrix: np.ndarray) -> None:
+        """Fold in rows' timestamps (float64 epoch nanoseconds, NaN for missing) and their ``rows x columns`` values."""
+        valid = np.isfinite(timestamps)
+        ns = timestamps[valid].astype("int64")
+        if not len(ns):
+            return
+        steps = np.diff(ns)
+        self._follow(int(ns[0]), int(ns[-1]), bool((steps >= 0).all()), len(steps) - int(np.count_nonzero(steps)))
+        self.distinct.update(pd.Series(ns))
+        self.rows += len(ns)
+
+        codes = _period_codes(ns, self.unit)
+        unit = self.unit
+        self._extend(int(codes.min()), int(codes.max()))
+        if self.unit != unit:
+            codes = _period_codes(ns, self.unit)
+        codes -= self.first_period
+        values = matrix[valid]
+        for index in range(values.shape[1]):
+            column = values[:, index]
+            present = np.isfinite(column)
+            self.sums[:, index] += np.bincount(codes[present], weights=column[present], minlength=len(self.sums))
+            self.counts[:, index] += np.bincount(codes[present], minlength=len(self.counts))
+
+    def merge(self, other: "PeriodSums") -> None:
+        """Merge sums over the rows following this one's."""
+        if other.first is None:
+            return
+        self._follow(other.first, other.last, other.ordered, other.repeats)
+        self.distinct.merge(other.distinct)
+        self.rows += other.rows
+        if not len(other.sums):
+            return
+        self._set_unit(max(self.unit, other.unit, key=_UNIT_NAMES.index))
+        first, sums, _ = other._in_unit(self.unit)
+        self._extend(first, first + len(sums) - 1)
+        first, sums, counts = other._in_unit(self.unit)  # the unit may have coarsened
+        offset = first - self.first_period
+        self.sums[offset:offset + len(sums)] += sums
+        self.counts[offset:offset + len(counts)] += counts
+
+    def axis(self) -> TimeAxis:
+        """The ``TimeAxis`` of the accumulated periods."""
+        if self.ordered:
+            duplicates = self.repeats
+        else:
+            duplicates = max(self.rows - int(round(self.distinct.estimate())), 0)
+        return TimeAxis.from_periods(self.column, self.unit, self.first_period, len(self.sums), self.rows, duplicates)
+
+    def means(self) -> np.ndarray:
+        """Per-period means (``points x columns``), NaN for periods without values."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.sums / self.counts
+
+    def _follow(self, first: int, last: int, ordered: bool, repeats: int) -> None:
+        """Record rows whose timestamps run from ``first`` to ``last``, coming after those seen."""
+        if self.last is None:
+            self.first = first
+        else:
+            ordered = ordered and self.last <= first
+            repeats += int(self.last == first)
+        self.ordered = self.ordered and ordered
+        self.repeats += repeats
+        self.last = last
+
+    def _in_unit(self, unit: str) -> Tuple[int, np.ndarray, np.ndarray]:
+        """The first period, sums and counts with periods folded into those of the coarser ``unit``."""
+        if unit == self.unit or not len(self.sums):
+            return self.first_period, self.sums, self.counts
+        starts = _period_starts(self.first_period + np.arange(len(self.sums)), self.unit)
+        codes = _period_codes(starts, unit)
+        first = int(codes[0])
+        sums = np.zeros((int(codes[-1]) - first + 1, self.sums.shape[1]))
+        counts = np.zeros_like(sums)
+        np.add.at(sums, codes - first, self.sums)
+        np.add.at(counts, codes - first, self.counts)
+        return first, sums, counts
+
+    def _set_unit(self, unit: str) -> None:
+        self.first_period, self.sums, self.counts = self._in_unit(unit)
+        self.unit = unit
+
+    def _extend(self, low: int, high: int) -> None:
+        """Cover periods ``low`` to ``high`` (of the current unit), coarsening the unit until they fit."""
+        if len(self.sums):
+            low, high = min(low, self.first_period), max(high, self.first_period + len(self.sums) - 1)
+        unit = self.unit
+        while high - low >= MAX_TIME_SERIES_POINTS and unit != _UNIT_NAMES[-1]:
+            coarser = _UNIT_NAMES[_UNIT_NAMES.index(unit) + 1]
+            low, high = (int(code) for code in _period_codes(_period_starts(np.array([low, high]), unit), coarser))
+            unit = coarser
+        self._set_unit(unit)
+        before = self.first_period - low if len(self.sums) else 0
+        padding = ((before, high - low + 1 - before - len(self.sums)), (0, 0))
+        self.sums = np.pad(self.sums, padding)
+        self.counts = np.pad(self.counts, padding)
+        self.first_period = low
+
+
+def prefix_sums(series: np.ndarray) -> PrefixSums:
+    """
+    Cumulative sums over the periods of ``points x columns`` resampled series, with a leading zero row.
+
+    Any segment's least-squares line then costs O(1): differences of these
+    sums. Columns should be centered on their means, so that sums of squares
+    keep their precision.
+    """
+    valid = np.isfinite(series)
+    x = np.where(valid, np.arange(len(series), dtype="float64")[:, None], 0.0)
+    y = np.where(valid, series, 0.0)
+    stacked = np.stack([valid.astype("float64"), x, y, x * x, x * y, y * y])
+    sums = np.zeros((6, len(series) + 1, series.shape[1]))
+    np.cumsum(stacked, axis=1, out=sums[:, 1:])
+    return sums
+
+
+def fit_segments(
+    sums: PrefixSums, columns: np.ndarray, starts: np.ndarray, stops: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Least-squares lines of periods ``[start, stop)`` of each column: ``(n, slope, mean x, mean y, squared error)``."""
+    n, sum_x, sum_y, sum_xx, sum_xy, sum_yy = sums[:, stops, columns] - sums[:, starts, columns]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x, mean_y = sum_x / n, sum_y / n
+        m2_x = sum_xx - sum_x * mean_x
+        c_xy = sum_xy - sum_x * mean_y
+        m2_y = sum_yy - sum_y * mean_y
+        slope = np.where(m2_x > 0, c_xy / m2_x, 0.0)
+    return n, slope, mean_x, mean_y, np.clip(m2_y - slope * c_xy, 0.0, None)
+
+
+def _best_splits(
+    sums: PrefixSums, columns: np.ndarray, starts: np.ndarray, stops: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The split of each segment removing the most squared error, and the error removed.
+
+    Every candidate split of every segment is scored in one vectorized pass.
+    Both sides must keep ``MIN_SEGMENT_POINTS`` values; segments without such
+    a split get a gain of ``-inf``.
+    """
+    lengths = np.maximum(stops - starts - 1, 0)
+    best_split = np.full(len(starts), -1, dtype="int64")
+    best_gain = np.full(len(starts), -np.inf)
+    if not lengths.any():
+        return best_split, best_gain
+    owner = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    splits = starts[owner] + 1 + np.arange(len(owner)) - offsets[owner]
+    n_left, *_, error_left = fit_segments(sums, columns[owner], starts[owner], splits)
+    n_right, *_, error_right = fit_segments(sums, columns[owner], splits, stops[owner])
+    error = fit_segments(sums, columns, starts, stops)[4]
+    gains = np.where(
+        (n_left >= MIN_SEGMENT_POINTS) & (n_right >= MIN_SEGMENT_POINTS),
+        error[owner] - error_left - error_right,
+        -np.inf,
+    )
+
+    nonempty = np.flatnonzero(lengths)
+    maxima = np.maximum.reduceat(gains, offsets[nonempty])
+    best_gain[nonempty] = maxima
+    hits = np.flatnonzero(gains == np.repeat(maxima, lengths[nonempty]))
+    segments, first = np.unique(owner[hits], return_index=True)
+    best_split[segments] = splits[hits[first]]
+    return best_split, best_gain
+
+
+def noise_variance(series: np.ndarray) -> np.ndarray:
+    """
+    Per-column noise variance of resampled series, robust to trends, steps and outliers.
+
+    Estimated from the median absolute deviation of period-to-period
+    differences (whose noise variance is twice the series'), and at least
+    a ten-thousandth of the series' variance: changes smaller than a
+    percent of its spread are not reported, however smooth the series.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # columns without two consecutive values
+        diffs = np.diff(series, axis=0)
+        deviation = np.nanmedian(np.abs(diffs - np.nanmedian(diffs, axis=0)), axis=0)
+        spread = np.nanvar(series, axis=0)
+    return np.nan_to_num(np.maximum((1.4826 * deviation) ** 2 / 2, 1e-4 * spread), nan=0.0) + 1e-300
+
+
+def change_points(sums: PrefixSums, noise: np.ndarray) -> List[List[int]]:
+    """
+    Binary segmentation of each column into piecewise-linear segments; returns each column's split periods.
+
+    Each round splits, in every column, the segment whose best split removes
+    the most squared error, while that exceeds ``CHANGE_POINT_PENALTY`` noise
+    variances per log(points), for at most ``MAX_CHANGE_POINTS`` rounds.
+    Segments keep their best split between rounds, so a round only scores
+    the two halves of each split, across all columns at once: about
+    O(n log n) per column.
+    """
+    n_columns = sums.shape[2]
+    penalty = CHANGE_POINT_PENALTY * noise * np.log(np.maximum(sums[0, -1], 2.0))
+    columns = np.arange(n_columns)
+    starts = np.zeros(n_columns, dtype="int64")
+    stops = np.full(n_columns, sums.shape[1] - 1, dtype="int64")
+    splits, gains = _best_splits(sums, columns, starts, stops)
+    cuts: List[List[int]] = [[] for _ in range(n_columns)]
+    for _ in range(MAX_CHANGE_POINTS):
+        excess = gains - penalty[columns]
+        best = np.full(n_columns, -np.inf)
+        np.maximum.at(best, columns, excess)
+        candidates = np.flatnonzero((excess > 0) & (excess == best[columns]))
+        _, first = np.unique(columns[candidates], return_index=True)
+        chosen = candidates[first]
+        if not chosen.size:
+            break
+        for index in chosen:
+            cuts[columns[index]].append(int(splits[index]))
+        kept = np.setdiff1d(np.arange(len(columns)), chosen)
+        new_columns = np.concatenate([columns[chosen], columns[chosen]])
+        new_starts = np.concatenate([starts[chosen], splits[chosen]])
+        new_stops = np.concatenate([splits[chosen], stops[chosen]])
+        new_splits, new_gains = _best_splits(sums, new_columns, new_starts, new_stops)
+        columns = np.concatenate([columns[kept], new_columns])
+        starts = np.concatenate([starts[kept], new_starts])
+        stops = np.concatenate([stops[kept], new_stops])
+        splits = np.concatenate([splits[kept], new_splits])
+        gains = np.concatenate([gains[kept], new_gains])
+    return [sorted(column_cuts) for column_cuts in cuts]
+
+
+def segment_fit(sums: PrefixSums, cuts: Sequence[Sequence[int]]) -> np.ndarray:
+    """The piecewise-linear fit (``points x columns``) of each column, split at its ``cuts``."""
+    points = sums.shape[1] - 1
+    fitted = np.empty((points, sums.shape[2]))
+    positions = np.arange(points, dtype="float64")
+    for index, column_cuts in enumerate(cuts):
+        bounds = np.array([0, *column_cuts, points])
+        _, slopes, mean_x, mean_y, _ = fit_segments(sums, np.full(len(bounds) - 1, index), bounds[:-1], bounds[1:])
+        for start, stop, slope, x0, y0 in zip(bounds[:-1], bounds[1:], slopes, mean_x, mean_y):
+            fitted[start:stop, index] = y0 + slope * (positions[start:stop] - x0)
+    return np.nan_to_num(fitted)
+
+
+def seasonal_profile(residuals: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The repeating cycle in each column of residuals around a trend, and its strength.
+
+    The cycle is the mean residual by phase (position within ``period``);
+    its strength is the share of residual variance it explains, less what
+    noise alone would explain with that many periods. A step or a bend
+    spreads over every phase, so it is not mistaken for a cycle. Returns
+    the cycle over every period (``points x columns``) and the per-column
+    strength.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # phases or columns without values
+        profile = np.stack([np.nanmean(residuals[phase::period], axis=0) for phase in range(period)])
+        profile = np.nan_to_num(profile - np.nanmean(profile, axis=0))
+        variance = np.nanvar(residuals, axis=0)
+        observed = np.maximum(np.isfinite(residuals).sum(axis=0), 1)
+        explained = np.var(profile, axis=0) - variance * period / observed
+        strength = np.nan_to_num(np.clip(explained / variance, 0.0, 1.0))
+    return profile[np.arange(len(residuals)) % period], strength
+
+
+class TimeSeriesAnalyzer:
+    """
+    Segmented and rolling trends, change points and seasonality of numeric columns over a ``TimeAxis``.
+
+    Columns are resampled to per-period means and analyzed in blocks of
+    ``TIME_SERIES_BLOCK_COLUMNS``, bounding the per-block arrays whatever the
+    table's width. Slopes are reported per ``axis.unit``.
+    """
+
+    def __init__(self, axis: TimeAxis):
+        self.axis = axis
+        self.change_points: List[ChangePoint] = []
+        self.seasonality: List[Seasonality] = []
+        self.segments: Dict[str, List[TrendSegment]] = {}
+        self.recent_slopes: Dict[str, float] = {}
+
+    def analyze(self, matrix: np.ndarray, columns: Sequence[str]) -> "TimeSeriesAnalyzer":
+        """Analyze the ``rows x columns`` matrix of ``columns``; results are left on the analyzer."""
+        return self._analyze(columns, lambda block: self.axis.resample(matrix[:, block]))
+
+    def analyze_series(self, series: np.ndarray, columns: Sequence[str]) -> "TimeSeriesAnalyzer":
+        """Analyze ``columns`` from their per-period means (``points x columns``), resampled elsewhere."""
+        return self._analyze(columns, lambda block: series[:, block])
+
+    def _analyze(self, columns: Sequence[str], resampled: Callable[[slice], np.ndarray]) -> "TimeSeriesAnalyzer":
+        if self.axis.points >= 2 * MIN_SEGMENT_POINTS:
+            for start in range(0, len(columns), TIME_SERIES_BLOCK_COLUMNS):
+                block = slice(start, start + TIME_SERIES_BLOCK_COLUMNS)
+                self._analyze_block(resampled(block), columns[block])
+        self.change_points = rank_change_points(self.change_points)
+        self.seasonality = rank_seasonality(self.seasonality)
+        return self
+
+    def info(self) -> TimeSeriesInfo:
+        axis = self.axis
+        return {
+            "column": axis.column,
+            "unit": axis.unit,
+            "points": axis.points,
+            "rows": axis.rows,
+            "duplicates": axis.duplicates,
+            "change_points": self.change_points,
+            "seasonality": self.seasonality,
+        }
+
+    def _analyze_block(self, series: np.ndarray, columns: Sequence[str]) -> None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # columns without values
+            centers = np.nan_to_num(np.nanmean(series, axis=0))
+        series = series - centers
+        sums = prefix_sums(series)
+        cuts: List[List[int]] = [[] for _ in columns]
+        noise = noise_variance(series)
+        period = SEASONAL_PERIODS.get(self.axis.unit)
+        if period is None or len(series) < 3 * period:
+            cuts = change_points(sums, noise)
+        else:
+            # The cycle is estimated around the trend, then segments are fitted without it. The
+            # second pass estimates it around those segments, so steps do not leak into it.
+            for _ in range(2):
+                cycles, strengths = seasonal_profile(series - segment_fit(sums, cuts), period)
+                seasonal = strengths >= MIN_SEASONAL_STRENGTH
+                adjusted = series - np.where(seasonal, cycles, 0.0)
+                sums = prefix_sums(adjusted)
+                noise = noise_variance(adjusted)
+                cuts = change_points(sums, noise)
+            for index in np.flatnonzero(seasonal):
+                self.seasonality.append({"column": columns[index], "period": period, "strength": float(strengths[index])})
+
+        for index, column in enumerate(columns):
+            self._record_recent_slope(sums, index, column)
+            if cuts[index]:
+                self._record_change_points(sums, index, column, cuts[index], centers[index], noise[index])
+
+    def _record_change_points(
+        self, sums: PrefixSums, index: int, column: str, cuts: List[int], center: float, noise: float
+    ) -> None:
+        axis = self.axis
+        bounds = np.array([0, *cuts, sums.shape[1] - 1])
+        _, slopes, mean_x, mean_y, errors = fit_segments(sums, np.full(len(bounds) - 1, index), bounds[:-1], bounds[1:])
+        self.segments[column] = [
+            {"start": axis.period_start(int(start)), "end": axis.period_start(int(stop) - 1), "slope": float(slope)}
+            for start, stop, slope in zip(bounds[:-1], bounds[1:], slopes)
+        ]
+        # Squared error each split removes: that of its two segments fitted as one, less theirs
+        merged = fit_segments(sums, np.full(len(cuts), index), bounds[:-2], bounds[2:])[4]
+        for left, split in enumerate(cuts):
+            right = left + 1
+            self.change_points.append({
+                "column": column,
+                "at": axis.period_start(split),
+                "level_before": float(center + mean_y[left] + slopes[left] * (split - 1 - mean_x[left])),
+                "level_after": float(center + mean_y[right] + slopes[right] * (split - mean_x[right])),
+                "slope_before": float(slopes[left]),
+                "slope_after": float(slopes[right]),
+                "score": float((merged[left] - errors[left] - errors[right]) / noise),
+            })
+
+    def _record_recent_slope(self, sums: PrefixSums, index: int, column: str) -> None:
+        counts = sums[0, :, index]
+        if counts[-1] < MIN_SEGMENT_POINTS:
+            return
+        # Last period boundary leaving at least ROLLING_TREND_POINTS values after it
+        start = max(int(np.searchsorted(counts, counts[-1] - ROLLING_TREND_POINTS, side="right")) - 1, 0)
+        slope = fit_segments(sums, np.array([index]), np.array([start]), np.array([len(counts) - 1]))[1][0]
+        self.recent_slopes[column] = float(slope)
+
+
+def rank_change_points(points: List[ChangePoint]) -> List[ChangePoint]:
+    """The most significant change points, highest score first."""
+    return sorted(points, key=lambda point: point["score"], reverse=True)[:MAX_CHANGE_POINTS_TO_RETURN]
+
+
+def rank_seasonality(cycles: List[Seasonality]) -> List[Seasonality]:
+    """The strongest seasonal cycles first."""
+    return sorted(cycles, key=lambda cycle: cycle["strength"], reverse=True)[:MAX_TRENDS_TO_RETURN]
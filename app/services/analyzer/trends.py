@@ -1,96 +1,169 @@
 """Trend analysis for DataFrames."""
 
-from typing import List, Optional
+from typing import Any, List, Optional, Sequence
 import pandas as pd
 import numpy as np
 
-from .constants import MIN_TREND_OBSERVATIONS, MIN_TREND_R2, MAX_TRENDS_TO_RETURN
-from .types import TrendInfo
-from .utils import calculate_r_squared, get_trend_direction
+from .accumulators import RegressionSums
+from .constants import ANALYSIS_BLOCK_ROWS, MIN_TREND_OBSERVATIONS, MIN_TREND_R2, MAX_TRENDS_TO_RETURN
+from .context import AnalysisContext
+from .quantiles import exact_quantiles
+from .timeseries import TimeAxis, TimeSeriesAnalyzer
+from .types import TimeSeriesInfo, TrendInfo
+from .utils import get_trend_direction
 
 
 class TrendAnalyzer:
     """Handles trend analysis for DataFrame data."""
 
-    def __init__(self, df: pd.DataFrame):
-        self.df = df
+    def __init__(self, context: AnalysisContext):
+        self.context = context
+        self.df = context.df
 
     def analyze_trends(self) -> List[TrendInfo]:
         """Analyze trends in numeric columns over time or row index."""
-        x_values = self._get_x_axis_values()
-        finite_x_mask = np.isfinite(x_values)
-        filtered_x = x_values[finite_x_mask]
-
-        if len(filtered_x) < MIN_TREND_OBSERVATIONS:
-            return []
-
-        trends = []
-        numeric_df = self.df.select_dtypes(include=np.number)
+        return self.context.memoize("trends", self._compute_trends)
 
-        for column, series in numeric_df.items():
-            trend = self._calculate_column_trend(column, series, filtered_x, finite_x_mask)
-            if trend:
-                trends.append(trend)
+    def analyze_time_series(self) -> Optional[TimeSeriesInfo]:
+        """Change points and seasonality over the datetime axis, or ``None`` without one."""
+        time_series = self._time_series()
+        return time_series.info() if time_series is not None else None
 
-        # Sort by trend strength (absolute slope * R²) and return top trends
-        trends.sort(key=lambda t: abs(t["slope"]) * t["r2"], reverse=True)
-        return trends[:MAX_TRENDS_TO_RETURN]
-
-    def _get_x_axis_values(self) -> np.ndarray:
-        """Get X-axis values for trend analysis (datetime or row index)."""
-        datetime_columns = [
-            col for col in self.df.columns 
-            if pd.api.types.is_datetime64_any_dtype(self.df[col])
-        ]
+    def time_axis(self) -> Optional[TimeAxis]:
+        """The datetime trend axis with its resampling periods, or ``None`` when trends run over row positions."""
+        return self.context.memoize("time_axis", self._build_time_axis)
 
-        if datetime_columns:
-            # Use first datetime column converted to epoch nanoseconds
-            datetime_series = pd.to_datetime(self.df[datetime_columns[0]], errors="coerce")
-            return datetime_series.astype("int64").astype("float64").to_numpy()
-        else:
-            # Use row index
-            return pd.Series(range(len(self.df)), dtype="int64", index=self.df.index).astype("float64").to_numpy()
-
-    def _calculate_column_trend(
-        self, 
-        column: str, 
-        series: pd.Series, 
-        x_values: np.ndarray, 
-        x_mask: np.ndarray
-    ) -> Optional[TrendInfo]:
-        """Calculate trend statistics for a single numeric column."""
-        y_values = series.astype("float64").to_numpy()
-        valid_mask = x_mask & np.isfinite(y_values)
-
-        if valid_mask.sum() < MIN_TREND_OBSERVATIONS:
+    def _build_time_axis(self) -> Optional[TimeAxis]:
+        column = self.context.memoize("x_column", self._get_time_column)
+        if column is None:
             return None
+        return TimeAxis(column, self.context.memoize("x_axis", self._get_x_axis_values))
+
+    def _time_series(self) -> Optional[TimeSeriesAnalyzer]:
+        def analyze() -> Optional[TimeSeriesAnalyzer]:
+            axis = self.time_axis()
+            if axis is None:
+                return None
+            return TimeSeriesAnalyzer(axis).analyze(self.context.numeric_matrix, self.context.numeric_columns)
+        return self.context.memoize("time_series", analyze)
+
+    def _compute_trends(self) -> List[TrendInfo]:
+        x_values = self.context.memoize("x_axis", self._get_x_axis_values)
+        finite_x_mask = np.isfinite(x_values)
+        axis = self.time_axis()
+        if axis is not None:
+            # Slopes per day (or month...) rather than per nanosecond
+            x_values = axis.scale(x_values)
 
-        # Get valid data points
-        valid_x = x_values[:valid_mask.sum()]
-        valid_y = y_values[valid_mask]
-
-        # Calculate linear regression
-        slope, intercept = np.polyfit(valid_x, valid_y, 1)
-        predicted_y = slope * valid_x + intercept
-
-        # Calculate R-squared
-        r_squared = calculate_r_squared(valid_y, predicted_y)
+        if finite_x_mask.sum() < MIN_TREND_OBSERVATIONS or not self.context.numeric_columns:
+            return []
 
-        # Check if trend is meaningful
-        if self._is_meaningful_trend(slope, r_squared, valid_y):
-            return {
-                "column": column,
-                "slope": float(slope),
-                "r2": float(r_squared),
-                "direction": get_trend_direction(slope)
+        # One masked, closed-form least-squares pass over every numeric column.
+        # Rows are only used where both x and y are finite, so pairs stay aligned.
+        numeric_matrix = self.context.numeric_matrix
+        regression = RegressionSums(numeric_matrix.shape[1])
+        for start in range(0, len(x_values), ANALYSIS_BLOCK_ROWS):
+            block = slice(start, start + ANALYSIS_BLOCK_ROWS)
+            regression.update(x_values[block], numeric_matrix[block])
+        slopes, _, r_squared, counts = regression.fit()
+        intervals = self.context.slope_intervals(slopes, regression.slope_standard_error())
+
+        # Interquartile range over the same valid rows, only for candidate columns
+        candidates = np.flatnonzero(
+            (counts >= MIN_TREND_OBSERVATIONS) & (np.abs(slopes) > 1e-12) & (r_squared >= MIN_TREND_R2)
+        )
+        spreads = np.zeros(len(counts))
+        if candidates.size and finite_x_mask.all():
+            # Every row has an x value, so the shared quantiles cover the same rows
+            quantiles = self.context.quantiles()
+            spreads[candidates] = (quantiles.loc[0.75] - quantiles.loc[0.25]).to_numpy()[candidates]
+        elif candidates.size:
+            valid_y = np.where(
+                finite_x_mask[:, None] & np.isfinite(numeric_matrix[:, candidates]),
+                numeric_matrix[:, candidates],
+                np.nan,
+            )
+            p25, p75 = exact_quantiles(valid_y, [0.25, 0.75])
+            spreads[candidates] = p75 - p25
+
+        trends = self.select_trends(
+            self.context.numeric_columns, slopes, r_squared, counts, spreads, intervals,
+            unit=axis.unit if axis is not None else None,
+        )
+        time_series = self._time_series()
+        if time_series is not None:
+            self.add_time_series(trends, time_series)
+        return trends
+
+    @staticmethod
+    def add_time_series(trends: List[TrendInfo], time_series: TimeSeriesAnalyzer) -> None:
+        """Give trends the recent slope and segments of their column's resampled series."""
+        for trend in trends:
+            column = trend["column"]
+            if column in time_series.recent_slopes:
+                trend["recent_slope"] = time_series.recent_slopes[column]
+            if column in time_series.segments:
+                trend["segments"] = time_series.segments[column]
+
+    @staticmethod
+    def rank_trends(trends: List[TrendInfo]) -> List[TrendInfo]:
+        """Order trends by strength (absolute slope * R²) and keep the strongest ones."""
+        return sorted(trends, key=lambda t: abs(t["slope"]) * t["r2"], reverse=True)[:MAX_TRENDS_TO_RETURN]
+
+    @staticmethod
+    def select_trends(
+        columns: Sequence[str],
+        slopes: np.ndarray,
+        r_squared: np.ndarray,
+        counts: np.ndarray,
+        spreads: np.ndarray,
+        intervals: Optional[np.ndarray] = None,
+        unit: Optional[str] = None
+    ) -> List[TrendInfo]:
+        """
+        Keep meaningful per-column fits and return the strongest ones.
+
+        ``intervals`` holds a ``[low, high]`` slope confidence interval per
+        column when the fits were estimated from a sample; ``unit`` is the
+        time unit slopes are per, when fitted over a datetime axis.
+        """
+        meaningful = (
+            (counts >= MIN_TREND_OBSERVATIONS)
+            & (np.abs(slopes) > 1e-12)
+            & (r_squared >= MIN_TREND_R2)
+            & (spreads > 0)
+        )
+        trends: List[TrendInfo] = [
+            {
+                "column": columns[index],
+                "slope": float(slopes[index]),
+                "r2": float(r_squared[index]),
+                "direction": get_trend_direction(slopes[index]),
+                **({"slope_ci": intervals[index].tolist()} if intervals is not None else {}),
+                **({"unit": unit} if unit is not None else {}),
             }
+            for index in np.flatnonzero(meaningful)
+        ]
 
-        return None
+        return TrendAnalyzer.rank_trends(trends)
 
-    def _is_meaningful_trend(self, slope: float, r_squared: float, y_values: np.ndarray) -> bool:
-        """Determine if a trend is statistically meaningful."""
-        has_significant_slope = abs(slope) > 1e-12
-        has_good_fit = r_squared >= MIN_TREND_R2
-        has_variance = np.nanpercentile(y_values, 75) - np.nanpercentile(y_values, 25) > 0
+    def _get_time_column(self) -> Optional[Any]:
+        """The first datetime column, the trend x-axis when there is one."""
+        return next(
+            (col for col in self.df.columns if pd.api.types.is_datetime64_any_dtype(self.df[col])), None
+        )
 
-        return has_significant_slope and has_good_fit and has_variance
+    def _get_x_axis_values(self) -> np.ndarray:
+        """Get X-axis values for trend analysis (datetime or row index)."""
+        column = self.context.memoize("x_column", self._get_time_column)
+        if column is not None:
+            return datetime_axis(self.df[column])
+        # Use row index
+        return self.context.row_positions()
+
+
+def datetime_axis(series: pd.Series) -> np.ndarray:
+    """A datetime column as float64 epoch nanoseconds, with NaN for NaT."""
+    datetime_series = pd.to_datetime(series, errors="coerce")
+    epoch_values = datetime_series.astype("int64").astype("float64").to_numpy()
+    return np.where(datetime_series.isna().to_numpy(), np.nan, epoch_values)
@@ -1,12 +1,16 @@
 """Type definitions for DataFrame analysis."""
 
-from typing import Dict, List, Any, Optional, Union
-from typing_extensions import TypedDict
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
+from typing_extensions import NotRequired, TypedDict
 
 # Type aliases
 AnalysisResult = Dict[str, Any]
 ColumnStats = Dict[str, Union[int, float, None]]
 CorrelationMatrix = Dict[str, Dict[str, float]]
+# Called with the name of each analysis stage as it starts
+ProgressCallback = Callable[[str], None]
+# Statistic name -> [low, high] confidence interval
+ConfidenceIntervals = Dict[str, List[float]]
 
 
 class ColumnInfo(TypedDict):
@@ -16,12 +20,91 @@ class ColumnInfo(TypedDict):
     inferred_semantic: Optional[str]
 
 
+class TrendSegment(TypedDict):
+    """A stretch of a time series between change points, and its slope."""
+    start: str  # ISO 8601, start of the first resampled period
+    end: str  # ISO 8601, start of the last resampled period
+    slope: float
+
+
 class TrendInfo(TypedDict):
     """Information about a trend in data."""
     column: str
     slope: float
     r2: float
     direction: Optional[str]
+    slope_ci: NotRequired[List[float]]  # only when estimated from a sample
+    # Only over a datetime x-axis: the slopes' time unit ("day", "month"...), the slope over the
+    # most recent resampled periods and the segments between change points (with at least one)
+    unit: NotRequired[str]
+    recent_slope: NotRequired[float]
+    segments: NotRequired[List[TrendSegment]]
+
+
+class ChangePoint(TypedDict):
+    """Where a column's resampled series changes level or slope."""
+    column: str
+    at: str  # ISO 8601, start of the first period after the change
+    level_before: float
+    level_after: float
+    slope_before: float
+    slope_after: float
+    score: float  # squared error removed by the split, in noise variances
+
+
+class Seasonality(TypedDict):
+    """A seasonal cycle in a column's resampled series, around its segmented trend."""
+    column: str
+    period: int  # in resampled periods, e.g. 7 for a weekly cycle in daily data
+    strength: float  # share of the variance around the trend the cycle explains
+
+
+class TimeSeriesInfo(TypedDict):
+    """Time-aware analysis of the numeric columns over a datetime column."""
+    column: str
+    unit: str  # time unit of the trend slopes and of the resampled periods
+    points: int  # resampled periods from the first to the last timestamp
+    rows: int  # rows with a timestamp
+    duplicates: int  # rows sharing their timestamp with an earlier row (estimated for unordered streamed rows)
+    change_points: List[ChangePoint]
+    seasonality: List[Seasonality]
+
+
+class CorrelationPair(TypedDict):
+    """A strongly correlated pair of numeric columns."""
+    column_a: str
+    column_b: str
+    correlation: float
+
+
+class SampleInfo(TypedDict):
+    """How a sampled analysis was estimated."""
+    rows: int
+    fraction: float
+    method: str
+    confidence_level: float
+
+
+class MemoryInfo(TypedDict):
+    """In-memory size of the analyzed frame before and after dtype optimization."""
+    before_bytes: int
+    after_bytes: int
+
+
+class CsvOptions(TypedDict):
+    """How whole CSV/TSV uploads are parsed; every key is optional."""
+    engine: NotRequired[str]  # one of CSV_ENGINES
+    block_size: NotRequired[int]  # bytes per pyarrow parse block
+    threads: NotRequired[int]  # 1 parses on the calling thread, anything else on pyarrow's CPU pool
+    infer_rows: NotRequired[int]  # fix column types from the leading rows (0: infer over the whole file)
+
+
+class CsvDialect(TypedDict):
+    """What sniffing found out about a CSV/TSV upload."""
+    delimiter: str
+    encoding: str  # Python codec name
+    compression: Optional[str]  # "gzip", "bz2", "zstd" or ``None``
+    header: Optional[List[str]]  # the header row's names, ``None`` if it is longer than the sniffed prefix
 
 
 class MetadataInfo(TypedDict):
@@ -29,6 +112,11 @@ class MetadataInfo(TypedDict):
     filename: str
     rows: int
     cols: int
+    sample: NotRequired[SampleInfo]  # only when statistics are estimated from a sample
+    memory: NotRequired[MemoryInfo]  # only when the frame's dtypes were optimized
+    stages: NotRequired[List[str]]  # only when a subset of the stages was requested
+    schema_rows: NotRequired[int]  # only for schema analyses: leading rows the columns were inferred from
+    rows_estimated: NotRequired[bool]  # only when ``rows`` was extrapolated rather than counted
 
 
 class NumericStatistics(TypedDict):
@@ -37,10 +125,35 @@ class NumericStatistics(TypedDict):
     mean: Optional[float]
     std: float
     min: Optional[float]
+    p1: Optional[float]
+    p5: Optional[float]
     p25: Optional[float]
     median: Optional[float]
     p75: Optional[float]
+    p95: Optional[float]
+    p99: Optional[float]
     max: Optional[float]
+    confidence: NotRequired[ConfidenceIntervals]  # only when estimated from a sample
+
+
+class StageTiming(TypedDict):
+    """Resources used by one analysis stage."""
+    wall_seconds: float
+    cpu_seconds: float
+    alloc_bytes: int
+
+
+class ShardResult(TypedDict):
+    """Per-column results computed by one worker for a contiguous shard of columns."""
+    columns: List[ColumnInfo]
+    preview: List[Dict[str, Any]]
+    missing: Dict[str, int]
+    numeric_stats: Dict[str, NumericStatistics]
+    numeric_columns: List[str]
+    variances: List[float]
+    standardization: Tuple[Any, Any, Any]
+    trends: List[TrendInfo]
+    time_series: Optional[TimeSeriesInfo]
 
 
 class AnalysisResults(TypedDict):
@@ -51,5 +164,36 @@ class AnalysisResults(TypedDict):
     missing: Dict[str, int]
     numeric_stats: Dict[str, NumericStatistics]
     correlations: CorrelationMatrix
+    top_correlations: List[CorrelationPair]
     trends: List[TrendInfo]
+    time_series: Optional[TimeSeriesInfo]  # only over a datetime x-axis
     insights: List[str]
+    quantiles: NotRequired[Dict[str, Dict[str, Optional[float]]]]  # profile re-analysis only, by "90%"-style label
+
+
+class SchemaComparison(TypedDict):
+    """Columns shared by every compared file, and the columns that differ between them."""
+    common_columns: List[str]
+    # Column -> its dtype in each file, in file order (``None`` where absent), for columns
+    # missing from some file or whose kind of dtype (integer, float, text...) differs
+    differences: Dict[str, List[Optional[str]]]
+
+
+class NumericComparison(TypedDict):
+    """One numeric column's statistics in each compared file, in file order (``None`` where absent)."""
+    count: List[Optional[int]]
+    missing: List[Optional[int]]
+    mean: List[Optional[float]]
+    std: List[Optional[float]]
+    min: List[Optional[float]]
+    max: List[Optional[float]]
+    # Difference from the first file's mean, in units of its standard deviation
+    mean_shift: List[Optional[float]]
+
+
+class ResultComparison(TypedDict):
+    """Cross-file comparison of the analyses of a batch."""
+    files: List[str]
+    rows: List[int]
+    schema: SchemaComparison
+    numeric: Dict[str, NumericComparison]
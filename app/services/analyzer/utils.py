@@ -1,16 +1,39 @@
 """Utility functions for DataFrame analysis."""
 
 import os
-from typing import Optional
+from typing import Any, BinaryIO, Optional, Union
 import pandas as pd
 import numpy as np
 
-from .constants import DATETIME_KEYWORDS, ID_KEYWORDS, CURRENCY_KEYWORDS
+from .constants import (
+    DATETIME_KEYWORDS, ID_KEYWORDS, CURRENCY_KEYWORDS, SEMANTIC_SAMPLE_SIZE, DATETIME_PROBE_SIZE,
+    COMPRESSION_SUFFIXES,
+)
 
 
 def get_file_extension(filename: str) -> str:
-    """Extract and normalize file extension from filename."""
-    return os.path.splitext(filename or "")[1].lower()
+    """Extract and normalize file extension from filename, looking through a compression suffix (``.csv.gz``)."""
+    stem, extension = os.path.splitext((filename or "").lower())
+    if extension in COMPRESSION_SUFFIXES:
+        return os.path.splitext(stem)[1]
+    return extension
+
+
+def open_arrow_source(source: Union[str, bytes, BinaryIO]) -> Any:
+    """
+    An Arrow input over an upload: a memory map of a path, a zero-copy reader over bytes.
+
+    Arrow parsers slice a memory map without copying it, so a spooled file
+    is parsed straight from the page cache rather than from the Python heap.
+    File objects are returned as they are.
+    """
+    import pyarrow as pa
+
+    if isinstance(source, str):
+        return pa.memory_map(source)
+    if isinstance(source, bytes):
+        return pa.BufferReader(source)
+    return source
 
 
 def is_datetime_column_name(column_name: str) -> bool:
@@ -21,10 +44,31 @@ def is_datetime_column_name(column_name: str) -> bool:
     return name_lower.endswith(DATETIME_KEYWORDS)
 
 
-def try_datetime_conversion(series: pd.Series) -> bool:
-    """Attempt to convert series to datetime and return success status."""
+def sample_series(series: pd.Series, size: int) -> pd.Series:
+    """
+    Return up to ``size`` non-null values spread evenly over the whole Series.
+    
+    The systematic (stratified by position) sample covers the head, middle and
+    tail of the data, and costs O(size) rather than a pass over the column.
+    """
+    if len(series) > size:
+        positions = np.linspace(0, len(series) - 1, num=size).astype("int64")
+        series = series.iloc[np.unique(positions)]
+    return series.dropna()
+
+
+def try_datetime_conversion(series: pd.Series, sample_size: int = SEMANTIC_SAMPLE_SIZE) -> bool:
+    """
+    Check whether a series parses as datetime, using a bounded sample.
+    
+    A small probe is parsed first so clearly non-datetime columns exit early;
+    only if it parses is the rest of the sample checked.
+    """
+    sample = sample_series(series, sample_size)
     try:
-        pd.to_datetime(series, errors="raise")
+        pd.to_datetime(sample.iloc[:DATETIME_PROBE_SIZE], errors="raise")
+        if len(sample) > DATETIME_PROBE_SIZE:
+            pd.to_datetime(sample.iloc[DATETIME_PROBE_SIZE:], errors="raise")
         return True
     except Exception:
         return False
@@ -62,7 +106,7 @@ def get_trend_direction(slope: float) -> Optional[str]:
 def preprocess_datetime_columns(df: pd.DataFrame) -> None:
     """Convert columns with datetime-like names to datetime dtype in-place."""
     for col in df.columns:
-        if is_datetime_column_name(col):
+        if is_datetime_column_name(col) and not pd.api.types.is_datetime64_any_dtype(df[col]):
             try:
                 df[col] = pd.to_datetime(df[col], errors="coerce")
             except Exception:
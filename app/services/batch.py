@@ -0,0 +1,168 @@
+"""Batch analysis: unpacking uploaded archives and scheduling many files largest first."""
+
+import asyncio
+import hashlib
+import os
+import posixpath
+import tarfile
+import tempfile
+import zipfile
+from typing import IO, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+class ArchiveError(Exception):
+    """Raised when an uploaded archive cannot be read."""
+
+
+class BatchTooLarge(Exception):
+    """Raised when a batch holds more files or more bytes than allowed."""
+
+
+class BatchItem:
+    """One file of a batch, spooled to ``path``; ``error`` is set for members that cannot be analyzed."""
+
+    def __init__(self, index: int, filename: str, path: Optional[str], size: int, digest: str = ""):
+        self.index = index
+        self.filename = filename
+        self.path = path
+        self.size = size
+        self.digest = digest
+        self.error: Optional[Tuple[int, str]] = None
+
+
+def is_archive(filename: str) -> bool:
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _skipped_member(name: str) -> bool:
+    """Directories and the metadata files archivers add (``__MACOSX/``, ``._name``, ``.DS_Store``)."""
+    parts = name.split("/")
+    return name.endswith("/") or "__MACOSX" in parts or parts[-1].startswith(".")
+
+
+def _archive_members(path: str) -> Iterator[Tuple[str, int, Callable[[], IO[bytes]]]]:
+    """The regular files of a zip or tar archive as ``(name, declared size, opener)``, in archive order."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    yield info.filename, info.file_size, lambda info=info: archive.open(info)
+        return
+    try:
+        archive = tarfile.open(path, "r:*")
+    except tarfile.TarError:
+        raise ArchiveError("Not a zip or tar archive.")
+    with archive:
+        # Members are read in order, so compressed tars are decompressed in one pass
+        for member in archive:
+            if member.isfile():
+                yield member.name, member.size, lambda member=member: archive.extractfile(member)
+
+
+def extract_archive(
+    path: str,
+    directory: str,
+    first_index: int,
+    max_files: int,
+    max_total_bytes: int,
+    file_limit: Callable[[str], Optional[int]],
+    chunk_bytes: int = 1024 * 1024,
+) -> List[BatchItem]:
+    """
+    Copy an archive's files into ``directory``, hashing them as they go.
+
+    ``file_limit`` gives the size limit of a member by name, ``None`` for
+    unsupported types: those (and nested archives) are returned with a 415
+    ``error`` instead of being extracted, and members over their limit with
+    a 413 ``error``; directories and archiver metadata are skipped. Raises
+    ``BatchTooLarge`` once the archive holds more than ``max_files`` files or
+    more than ``max_total_bytes`` of content, whatever sizes its entries
+    declare.
+    """
+    items: List[BatchItem] = []
+    total = 0
+    try:
+        for name, declared, opener in _archive_members(path):
+            if _skipped_member(name):
+                continue
+            if len(items) >= max_files:
+                raise BatchTooLarge(f"Too many files. Max {max_files} per batch.")
+            item = BatchItem(first_index + len(items), name, None, declared)
+            items.append(item)
+            max_bytes = None if is_archive(name) else file_limit(name)
+            if max_bytes is None:
+                item.error = (415, "Unsupported file type.")
+                continue
+            if declared <= max_bytes:
+                item.path, item.size, item.digest = _copy_member(opener, name, directory, max_bytes, chunk_bytes)
+            if item.path is None:
+                item.error = (413, f"File too large. Max {max_bytes} bytes.")
+                continue
+            total += item.size
+            if total > max_total_bytes:
+                raise BatchTooLarge(f"Batch too large. Max {max_total_bytes} bytes.")
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+        raise ArchiveError(f"Could not read archive: {e}")
+    return items
+
+
+def _copy_member(
+    opener: Callable[[], IO[bytes]], name: str, directory: str, max_bytes: int, chunk_bytes: int
+) -> Tuple[Optional[str], int, str]:
+    """Copy one member to a temp file; returns its path (``None`` past ``max_bytes``), size and SHA-256."""
+    hasher = hashlib.sha256()
+    fd, target = tempfile.mkstemp(suffix=posixpath.splitext(name)[1], dir=directory)
+    written = 0
+    with os.fdopen(fd, "wb") as out, opener() as source:
+        while chunk := source.read(chunk_bytes):
+            written += len(chunk)
+            if written > max_bytes:
+                break
+            hasher.update(chunk)
+            out.write(chunk)
+    if written > max_bytes:
+        os.unlink(target)
+        return None, written, ""
+    return target, written, hasher.hexdigest()
+
+
+def largest_first(items: Sequence[BatchItem]) -> List[BatchItem]:
+    """Files to analyze, largest first (errors first of all, as they cost nothing)."""
+    return sorted(items, key=lambda item: (item.error is None, -item.size, item.index))
+
+
+async def schedule(
+    items: Sequence[BatchItem],
+    run: Callable[[BatchItem], Awaitable[T]],
+    concurrency: int,
+) -> AsyncIterator[T]:
+    """
+    Run ``run`` over the items largest first, at most ``concurrency`` at a time, yielding results as they complete.
+
+    Each slot takes the largest remaining file as soon as it frees up (the
+    longest-processing-time-first rule), so a large file does not start last
+    and leave the other workers idle while it finishes. Closing the iterator
+    cancels whatever is still running and waits for it to unwind.
+    """
+    queue = iter(largest_first(items))
+    pending = set()
+    for item in queue:
+        pending.add(asyncio.ensure_future(run(item)))
+        if len(pending) >= max(1, concurrency):
+            break
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                following = next(queue, None)
+                if following is not None:
+                    pending.add(asyncio.ensure_future(run(following)))
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,123 @@
+"""Persisted incremental-analysis state, one entry per dataset id."""
+
+import asyncio
+import os
+import pickle
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..config import Settings, settings
+from .analyzer.incremental import DatasetState
+
+
+class DatasetStore:
+    """
+    Keeps the mergeable ``DatasetState`` of each dataset id.
+
+    States live in an in-process LRU of at most ``max_entries`` datasets and,
+    when ``directory`` is set, are also pickled to one file per dataset so
+    they survive restarts and LRU eviction. The files are only ever written
+    and read by this service. ``lock`` serializes updates to one dataset so
+    concurrent uploads cannot fold rows into the same state twice.
+    """
+
+    def __init__(self, max_entries: int, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: "OrderedDict[str, DatasetState]" = OrderedDict()
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "DatasetStore":
+        """Create a store configured from application settings."""
+        return cls(max_entries=config.dataset_state_max_entries, directory=config.dataset_state_dir or None)
+
+    def lock(self, dataset_id: str) -> asyncio.Lock:
+        """The lock guarding updates to one dataset (kept while anyone holds a reference)."""
+        with self._lock:
+            lock = self._locks.get(dataset_id)
+            if lock is None:
+                lock = asyncio.Lock()
+                self._locks[dataset_id] = lock
+            return lock
+
+    def get(self, dataset_id: str) -> Optional[DatasetState]:
+        """Return the stored state of a dataset, or ``None``."""
+        with self._lock:
+            state = self._entries.get(dataset_id)
+            if state is not None:
+                self._entries.move_to_end(dataset_id)
+                return state
+        state = self._read_disk(dataset_id)
+        if state is not None:
+            with self._lock:
+                self._insert(dataset_id, state)
+        return state
+
+    def put(self, dataset_id: str, state: DatasetState) -> None:
+        """Store (or replace) the state of a dataset in every enabled tier."""
+        self._write_disk(dataset_id, state)
+        with self._lock:
+            self._insert(dataset_id, state)
+
+    def delete(self, dataset_id: str) -> bool:
+        """Forget a dataset; returns whether it was known."""
+        with self._lock:
+            found = self._entries.pop(dataset_id, None) is not None
+        if self.directory:
+            try:
+                os.unlink(self._path(dataset_id))
+                found = True
+            except OSError:
+                pass
+        return found
+
+    def _insert(self, dataset_id: str, state: DatasetState) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[dataset_id] = state
+        self._entries.move_to_end(dataset_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, dataset_id: str) -> str:
+        return os.path.join(self.directory or "", f"{dataset_id}.state")
+
+    def _read_disk(self, dataset_id: str) -> Optional[DatasetState]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(dataset_id), "rb") as fh:
+                return pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+    def _write_disk(self, dataset_id: str, state: DatasetState) -> None:
+        if not self.directory:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(dataset_id))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of store occupancy."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_enabled": bool(self.directory),
+            }
+
+
+dataset_store = DatasetStore.from_settings(settings)
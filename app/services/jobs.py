@@ -0,0 +1,204 @@
+"""Background analysis jobs with per-stage progress, cancellation and a TTL-bounded store."""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import Settings, settings
+from .analyzer.constants import ANALYSIS_STAGES
+from .serialization import encode_entry, encode_result
+from .worker_pool import WorkerPoolSaturated
+
+JOB_STATES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATES = {"succeeded", "failed", "cancelled"}
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job when cancellation was requested."""
+
+
+class AnalysisJob:
+    """State of one submitted analysis, updated by the worker running it."""
+
+    def __init__(self, filename: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.path = path
+        self.status = "queued"
+        self.stage: Optional[str] = None
+        self.completed_stages: List[str] = []
+        self.error: Optional[str] = None
+        self.result: Optional[bytes] = None  # the finished analysis, encoded as JSON
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = threading.Event()
+        self.future: Optional[Future] = None
+
+    def report(self, stage: str) -> None:
+        """Progress callback handed to the analysis; also the cancellation checkpoint."""
+        if self.cancel_requested.is_set():
+            raise JobCancelled()
+        if stage != self.stage:
+            if self.stage is not None:
+                self.completed_stages.append(self.stage)
+            self.stage = stage
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view of the job's status and progress, without its result (see ``encode``)."""
+        done = set(self.completed_stages)
+        if self.status == "succeeded":
+            done = set(ANALYSIS_STAGES)
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": {
+                # The stage a failed or cancelled job stopped in reports that status
+                stage: "done" if stage in done else self.status if stage == self.stage else "pending"
+                for stage in ANALYSIS_STAGES
+            },
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+    def encode(self) -> bytes:
+        """The snapshot as JSON, with the encoded result (``null`` until the job succeeds) spliced in."""
+        return encode_entry(self.snapshot(), self.result if self.result is not None else b"null")
+
+
+class AnalysisJobStore:
+    """
+    Runs analysis jobs in a bounded thread pool and keeps their state for ``ttl_seconds``.
+
+    At most ``max_concurrent`` jobs run at once and at most ``max_pending``
+    are admitted (running plus queued); further submissions fail fast with
+    ``WorkerPoolSaturated``. Jobs run in threads so progress and cancellation
+    are shared with the request handlers; cancellation takes effect at the
+    next stage boundary (or batch, when streaming). Finished jobs are dropped
+    once their TTL expires, swept lazily on access.
+    """
+
+    def __init__(self, max_concurrent: int = 2, max_pending: int = 16, ttl_seconds: int = 3600, retry_after: int = 1):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_pending = max(1, max_pending)
+        self.ttl_seconds = ttl_seconds
+        self.retry_after = retry_after
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "AnalysisJobStore":
+        """Create a job store configured from application settings."""
+        return cls(
+            max_concurrent=config.job_max_concurrent,
+            max_pending=config.job_max_pending,
+            ttl_seconds=config.job_ttl_seconds,
+            retry_after=config.worker_retry_after_seconds,
+        )
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Underlying executor, created lazily on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="analysis-job")
+            return self._executor
+
+    def submit(self, filename: str, path: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> AnalysisJob:
+        """
+        Queue ``fn(*args, progress=job.report, **kwargs)`` to analyze the upload spooled at ``path``.
+
+        The job takes ownership of ``path`` and deletes it when it finishes.
+        """
+        with self._lock:
+            self._sweep()
+            pending = sum(1 for job in self._jobs.values() if job.status not in FINISHED_STATES)
+            if pending >= self.max_pending:
+                raise WorkerPoolSaturated(self.retry_after)
+            job = AnalysisJob(filename, path)
+            self._jobs[job.id] = job
+
+        job.future = self.executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: AnalysisJob, fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        try:
+            if job.cancel_requested.is_set():
+                raise JobCancelled()
+            job.status = "running"
+            job.result = encode_result(fn(*args, progress=job.report, **kwargs))
+            job.status = "succeeded"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            self._finish(job)
+
+    @staticmethod
+    def _finish(job: AnalysisJob) -> None:
+        job.finished_at = time.time()
+        try:
+            os.unlink(job.path)
+        except OSError:
+            pass
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Return the job with ``job_id``, or ``None`` if unknown or expired."""
+        with self._lock:
+            self._sweep()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[AnalysisJob]:
+        """Request cancellation of a job; finished jobs are left as they are."""
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        job.cancel_requested.set()
+        if job.future is not None and job.future.cancel():
+            # Still queued: it will never start, so finish it here
+            job.status = "cancelled"
+            self._finish(job)
+        return job
+
+    def _sweep(self) -> None:
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts of retained jobs by status."""
+        with self._lock:
+            self._sweep()
+            counts = {state: 0 for state in JOB_STATES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {**counts, "max_concurrent": self.max_concurrent, "max_pending": self.max_pending}
+
+    def shutdown(self) -> None:
+        """Cancel outstanding jobs and shut down the executor, if one was started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel_requested.set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for job in jobs:
+            if job.future is not None and job.future.cancelled():
+                job.status = "cancelled"
+                self._finish(job)
+
+
+job_store = AnalysisJobStore.from_settings(settings)
@@ -0,0 +1,111 @@
+"""Prometheus-style histograms for per-stage analysis timings, rendered in the text exposition format."""
+
+import bisect
+import math
+import threading
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from .analyzer.types import StageTiming
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = tuple(float(2 ** power) for power in range(16, 34, 2))  # 64 KiB .. 4 GiB
+SIZE_BUCKETS: Tuple[Tuple[int, str], ...] = (
+    (1024 * 1024, "lt_1mb"),
+    (10 * 1024 * 1024, "lt_10mb"),
+    (100 * 1024 * 1024, "lt_100mb"),
+    (1024 * 1024 * 1024, "lt_1gb"),
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def size_bucket(size_bytes: int) -> str:
+    """Coarse label for an upload's size, keeping metric cardinality bounded."""
+    for limit, label in SIZE_BUCKETS:
+        if size_bytes < limit:
+            return label
+    return "ge_1gb"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(tuple(label_values), ([0] * len(self.buckets), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(counts), total[0]) for labels, (counts, total) in self._series.items())
+        for label_values, counts, total in series:
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{_format_value(bound)}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {_format_value(total)}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class AnalysisMetrics:
+    """Per-stage wall time, CPU time and allocated bytes, labelled by stage, file type and size bucket."""
+
+    LABELS = ("stage", "file_type", "size_bucket")
+
+    def __init__(self) -> None:
+        self.wall = Histogram(
+            "analytica_stage_wall_seconds", "Wall-clock time spent in an analysis stage.", self.LABELS, SECONDS_BUCKETS
+        )
+        self.cpu = Histogram(
+            "analytica_stage_cpu_seconds", "CPU time spent in an analysis stage.", self.LABELS, SECONDS_BUCKETS
+        )
+        self.alloc = Histogram(
+            "analytica_stage_alloc_bytes", "Memory allocated by an analysis stage.", self.LABELS, BYTES_BUCKETS
+        )
+
+    def observe(self, stages: Mapping[str, StageTiming], file_type: str, size_bytes: int) -> None:
+        """Record one analysis' stage timings."""
+        bucket = size_bucket(size_bytes)
+        for stage, timing in stages.items():
+            self.wall.observe(timing["wall_seconds"], stage, file_type, bucket)
+            self.cpu.observe(timing["cpu_seconds"], stage, file_type, bucket)
+            self.alloc.observe(timing["alloc_bytes"], stage, file_type, bucket)
+
+    def render(self) -> str:
+        """All histograms in the Prometheus text exposition format."""
+        lines = self.wall.render() + self.cpu.render() + self.alloc.render()
+        return "\n".join(lines) + "\n"
+
+
+def timing_header(stages: Mapping[str, StageTiming]) -> str:
+    """Per-request breakdown for the ``X-Analytica-Timing`` header, in ``Server-Timing``-like syntax."""
+    return ", ".join(
+        f"{stage};wall={timing['wall_seconds']:.6f};cpu={timing['cpu_seconds']:.6f};alloc={timing['alloc_bytes']}"
+        for stage, timing in stages.items()
+    )
+
+
+analysis_metrics = AnalysisMetrics()
@@ -0,0 +1,294 @@
+"""Persisted dataset profiles: their state in a SQLite database, their downsampled rows in Parquet files."""
+
+import io
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..config import Settings, settings
+from .analyzer.accumulators import QuantileSketch
+from .analyzer.profile import DatasetProfile
+from .serialization import encode_result
+
+# Rows per Parquet row group: a page of rows reads only the groups it overlaps
+ROW_GROUP_ROWS = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    rows INTEGER NOT NULL,
+    sample_rows INTEGER NOT NULL,
+    result BLOB NOT NULL,  -- the analysis, encoded as JSON
+    pairs BLOB NOT NULL    -- strongest pairs kept for re-ranking, as JSON
+);
+CREATE TABLE IF NOT EXISTS profile_columns (
+    profile_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    dtype TEXT NOT NULL,
+    semantic TEXT,
+    missing INTEGER,
+    correlation_rank INTEGER,  -- position among the columns whose correlations are kept
+    sketch BLOB,               -- quantile sketch of numeric columns
+    PRIMARY KEY (profile_id, position)
+);
+CREATE TABLE IF NOT EXISTS correlation_blocks (
+    profile_id TEXT NOT NULL,
+    block_row INTEGER NOT NULL,
+    block_col INTEGER NOT NULL,
+    block BLOB NOT NULL,
+    PRIMARY KEY (profile_id, block_row, block_col)
+);
+"""
+_TABLES = ("profiles", "profile_columns", "correlation_blocks")
+
+
+def _array_bytes(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _array(blob: bytes) -> np.ndarray:
+    return np.load(io.BytesIO(blob), allow_pickle=False)
+
+
+def _sketch_bytes(sketch: QuantileSketch) -> bytes:
+    buffer = io.BytesIO()
+    levels = {f"level_{height}": level for height, level in enumerate(sketch.levels)}
+    np.savez(buffer, k=np.int64(sketch.k), count=np.int64(sketch.count), **levels)
+    return buffer.getvalue()
+
+
+def _sketch(blob: bytes) -> QuantileSketch:
+    with np.load(io.BytesIO(blob), allow_pickle=False) as data:
+        sketch = QuantileSketch(int(data["k"]))
+        sketch.count = int(data["count"])
+        sketch.levels = [data[f"level_{height}"] for height in range(len(data.files) - 2)]
+    return sketch
+
+
+def _sample_table(sample: pd.DataFrame) -> pa.Table:
+    """The sample as an Arrow table keeping its index (the rows' positions in the dataset)."""
+    try:
+        return pa.Table.from_pandas(sample, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Object columns mixing types (numbers and text in one column) are kept as text
+        mixed = {column: "string" for column in sample.columns if sample[column].dtype == object}
+        return pa.Table.from_pandas(sample.astype(mixed), preserve_index=True)
+
+
+class ProfileStore:
+    """
+    Keeps ``DatasetProfile`` objects by id.
+
+    A profile's result, column metadata, sketches and correlation blocks are
+    rows of a SQLite database in ``directory``; its downsampled rows are a
+    Parquet file beside it, written in ``ROW_GROUP_ROWS`` row groups so a
+    page reads only what it shows. Every call opens its own connection, so
+    the store can be used from any thread.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._database = os.path.join(directory, "profiles.sqlite")
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "ProfileStore":
+        """Create a store configured from application settings."""
+        return cls(config.profile_dir or os.path.join(tempfile.gettempdir(), "analytica-profiles"))
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._database, timeout=30)
+
+    def _rows_path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.parquet")
+
+    def exists(self, profile_id: str) -> bool:
+        with closing(self._connect()) as connection:
+            return connection.execute("SELECT 1 FROM profiles WHERE id = ?", (profile_id,)).fetchone() is not None
+
+    def put(self, profile_id: str, filename: str, profile: DatasetProfile) -> None:
+        """Store (or replace) a profile; its rows file is written first, so a stored profile always has one."""
+        self._write_rows(profile_id, profile.sample)
+        result = profile.result
+        ranks = {name: rank for rank, name in enumerate(profile.correlation_columns)}
+        columns = [
+            (
+                profile_id,
+                position,
+                column["name"],
+                column["dtype"],
+                column.get("inferred_semantic"),
+                result["missing"].get(column["name"]),
+                ranks.get(column["name"]),
+                _sketch_bytes(profile.sketches[column["name"]]) if column["name"] in profile.sketches else None,
+            )
+            for position, column in enumerate(result["columns"])
+        ]
+        blocks = [
+            (profile_id, block_row, block_col, _array_bytes(block))
+            for (block_row, block_col), block in profile.correlation_blocks.items()
+        ]
+        with closing(self._connect()) as connection, connection:
+            self._delete_rows(connection, profile_id)
+            connection.execute(
+                "INSERT INTO profiles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    profile_id,
+                    filename,
+                    time.time(),
+                    result["meta"]["rows"],
+                    len(profile.sample) if profile.sample is not None else 0,
+                    encode_result(result),
+                    orjson.dumps(profile.pairs),
+                ),
+            )
+            connection.executemany("INSERT INTO profile_columns VALUES (?, ?, ?, ?, ?, ?, ?, ?)", columns)
+            connection.executemany("INSERT INTO correlation_blocks VALUES (?, ?, ?, ?)", blocks)
+
+    def get(self, profile_id: str) -> Optional[DatasetProfile]:
+        """The stored profile without its rows (see ``rows``), or ``None``."""
+        with closing(self._connect()) as connection:
+            found = connection.execute("SELECT result, pairs FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+            if found is None:
+                return None
+            columns = connection.execute(
+                "SELECT name, correlation_rank, sketch FROM profile_columns WHERE profile_id = ? ORDER BY position",
+                (profile_id,),
+            ).fetchall()
+            blocks = connection.execute(
+                "SELECT block_row, block_col, block FROM correlation_blocks WHERE profile_id = ?", (profile_id,)
+            ).fetchall()
+        ranked = sorted((rank, name) for name, rank, _ in columns if rank is not None)
+        return DatasetProfile(
+            orjson.loads(found[0]),
+            [name for _, name in ranked],
+            {(block_row, block_col): _array(block) for block_row, block_col, block in blocks},
+            orjson.loads(found[1]),
+            {name: _sketch(sketch) for name, _, sketch in columns if sketch is not None},
+        )
+
+    def summary(self, profile_id: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """
+        A profile's description and its analysis as stored (JSON), or ``None``.
+
+        The description lists every column with its dtype, semantic type and
+        missing values, and ``correlation_rank`` for the columns a re-analysis
+        can correlate.
+        """
+        with closing(self._connect()) as connection:
+            found = connection.execute(
+                "SELECT filename, created_at, rows, sample_rows, json_array_length(pairs), result "
+                "FROM profiles WHERE id = ?",
+                (profile_id,),
+            ).fetchone()
+            if found is None:
+                return None
+            columns = connection.execute(
+                "SELECT name, dtype, semantic, missing, correlation_rank, sketch IS NOT NULL "
+                "FROM profile_columns WHERE profile_id = ? ORDER BY position",
+                (profile_id,),
+            ).fetchall()
+        filename, created_at, rows, sample_rows, pairs, result = found
+        return {
+            "id": profile_id,
+            "filename": filename,
+            "created_at": created_at,
+            "rows": rows,
+            "sample_rows": sample_rows,
+            "correlation_columns": sum(rank is not None for *_, rank, _ in columns),
+            "top_correlations": pairs,
+            "columns": [
+                {
+                    "name": name,
+                    "dtype": dtype,
+                    "inferred_semantic": semantic,
+                    "missing": missing,
+                    "numeric": bool(numeric),
+                    "correlation_rank": rank,
+                }
+                for name, dtype, semantic, missing, rank, numeric in columns
+            ],
+        }, result
+
+    def rows(self, profile_id: str, offset: int, limit: int) -> Optional[Tuple[int, pd.DataFrame]]:
+        """
+        Up to ``limit`` rows of a profile's downsampled copy from ``offset``, with its total row count.
+
+        The frame is indexed by the rows' positions in the dataset. Returns
+        ``None`` for unknown profiles.
+        """
+        try:
+            parquet = pq.ParquetFile(self._rows_path(profile_id))
+        except (OSError, pa.ArrowInvalid):
+            return None
+        with parquet:
+            total = parquet.metadata.num_rows
+            groups: List[int] = []
+            start = first = 0
+            for group in range(parquet.num_row_groups):
+                group_rows = parquet.metadata.row_group(group).num_rows
+                if start < offset + limit and start + group_rows > offset:
+                    if not groups:
+                        first = start
+                    groups.append(group)
+                start += group_rows
+            if not groups or limit <= 0:
+                return total, parquet.schema_arrow.empty_table().to_pandas()
+            table = parquet.read_row_groups(groups).slice(offset - first, limit)
+        return total, table.to_pandas()
+
+    def delete(self, profile_id: str) -> bool:
+        """Forget a profile; returns whether it was known."""
+        with closing(self._connect()) as connection, connection:
+            found = self._delete_rows(connection, profile_id)
+        try:
+            os.unlink(self._rows_path(profile_id))
+            found = True
+        except OSError:
+            pass
+        return found
+
+    @staticmethod
+    def _delete_rows(connection: sqlite3.Connection, profile_id: str) -> bool:
+        found = connection.execute("DELETE FROM profiles WHERE id = ?", (profile_id,)).rowcount > 0
+        for table in _TABLES[1:]:
+            connection.execute(f"DELETE FROM {table} WHERE profile_id = ?", (profile_id,))
+        return found
+
+    def _write_rows(self, profile_id: str, sample: Optional[pd.DataFrame]) -> None:
+        table = _sample_table(sample if sample is not None else pd.DataFrame())
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_ROWS)
+            os.replace(tmp_path, self._rows_path(profile_id))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of store occupancy."""
+        with closing(self._connect()) as connection:
+            count = connection.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+        disk_bytes = sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+        return {"entries": count, "disk_bytes": disk_bytes, "directory": self.directory}
+
+
+profile_store = ProfileStore.from_settings(settings)
@@ -0,0 +1,167 @@
+"""Content-addressed cache of serialized analysis results."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..config import Settings, settings
+
+
+def make_cache_key(content_digest: str, **params: Any) -> str:
+    """Derive a cache key from the upload's content hash and the analysis parameters."""
+    material = json.dumps({"content": content_digest, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache mapping keys to serialized (JSON) analysis results.
+
+    The in-process tier is an LRU bounded by total payload bytes. The optional
+    on-disk tier stores one file per key under ``directory`` so results survive
+    restarts; it is bounded by ``disk_max_bytes`` with oldest-first eviction.
+    The directory is scanned once, at startup, and its size tracked from then
+    on, so a put never lists the directory. Disk reads and writes block:
+    async callers run ``get`` and ``put`` in a thread.
+    """
+
+    def __init__(self, max_bytes: int, directory: Optional[str] = None, disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+        # On-disk entries (key -> bytes), oldest written first
+        self._disk_entries: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+        self._disk_lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._scan_disk()
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "ResultCache":
+        """Create a cache configured from application settings."""
+        return cls(
+            max_bytes=config.result_cache_max_bytes,
+            directory=config.result_cache_dir or None,
+            disk_max_bytes=config.result_cache_disk_max_bytes,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 or bool(self.directory)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached payload for ``key`` or ``None``."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return payload
+
+        payload = self._read_disk(key)
+        with self._lock:
+            if payload is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._insert(key, payload)
+        return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        """Store a payload in every enabled tier."""
+        with self._lock:
+            self._insert(key, payload)
+        self._write_disk(key, payload)
+
+    def _insert(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = payload
+        self._size += len(payload)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self._counters["evictions"] += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory or "", f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "rb") as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def _scan_disk(self) -> None:
+        """Index the entries already on disk, oldest first."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, entry.name[:-len(".json")], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk_entries[key] = size
+            self._disk_size += size
+
+    def _write_disk(self, key: str, payload: bytes) -> None:
+        if not self.directory:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._disk_lock:
+            self._disk_size += len(payload) - self._disk_entries.pop(key, 0)
+            self._disk_entries[key] = len(payload)
+            if self.disk_max_bytes > 0:
+                self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Remove the oldest entries until the tier fits ``disk_max_bytes`` (called holding ``_disk_lock``)."""
+        while self._disk_size > self.disk_max_bytes and self._disk_entries:
+            key, size = self._disk_entries.popitem(last=False)
+            self._disk_size -= size
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                continue
+            with self._lock:
+                self._counters["disk_evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache counters and occupancy."""
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "disk_enabled": bool(self.directory),
+                "disk_entries": len(self._disk_entries),
+                "disk_bytes": self._disk_size,
+            }
+
+
+result_cache = ResultCache.from_settings(settings)
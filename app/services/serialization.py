@@ -0,0 +1,148 @@
+"""Fast JSON encoding and content negotiation for analysis responses."""
+
+import datetime
+import decimal
+import gzip
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+import pandas as pd
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered without it
+    brotli = None
+
+LAYOUTS = {"records", "columnar"}
+NUMERIC_STAT_FIELDS = ("count", "mean", "std", "min", "p1", "p5", "p25", "median", "p75", "p95", "p99", "max")
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """Encode the pandas/NumPy/stdlib values orjson does not handle natively."""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime() if value.nanosecond == 0 else value.isoformat()
+    if isinstance(value, (pd.Timedelta, datetime.timedelta)):
+        return pd.Timedelta(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def to_columnar(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Re-shape ``correlations`` and ``numeric_stats`` into compact column-oriented blocks.
+
+    ``correlations`` becomes ``{"columns": [...], "matrix": [[...], ...]}`` and
+    ``numeric_stats`` becomes ``{"columns": [...], "<stat>": [...], ...}``,
+    dropping the repeated keys of the nested-dict layout.
+    """
+    correlation_columns = list(result["correlations"])
+    stat_columns = list(result["numeric_stats"])
+    confidence = {}
+    if any("confidence" in stats for stats in result["numeric_stats"].values()):
+        # Sampled analyses: the confidence interval of each estimate, one mapping per column
+        confidence["confidence"] = [result["numeric_stats"][column].get("confidence") for column in stat_columns]
+    return {
+        **result,
+        "layout": "columnar",
+        "correlations": {
+            "columns": correlation_columns,
+            "matrix": np.array(
+                [[result["correlations"][row][col] for col in correlation_columns] for row in correlation_columns],
+                dtype="float64",
+            ).reshape(len(correlation_columns), len(correlation_columns)),
+        },
+        "numeric_stats": {
+            "columns": stat_columns,
+            **{
+                field: [result["numeric_stats"][column][field] for column in stat_columns]
+                for field in NUMERIC_STAT_FIELDS
+            },
+            **confidence,
+        },
+    }
+
+
+def encode_result(result: Dict[str, Any], layout: str = "records") -> bytes:
+    """
+    Encode an analysis result as JSON with orjson.
+
+    The result is trusted internal output, so it is not re-validated against
+    ``AnalyzeResponse``. NumPy arrays and scalars are encoded directly, NaN and
+    infinities become ``null`` and timestamps ISO 8601 strings.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unsupported response layout: {layout}")
+    if layout == "columnar":
+        result = to_columnar(result)
+    return orjson.dumps(result, default=_default, option=_ORJSON_OPTIONS)
+
+
+def encode_entry(entry: Dict[str, Any], result: Optional[bytes] = None) -> bytes:
+    """
+    Encode a JSON object around an analysis result.
+
+    An already encoded ``result`` is spliced in as the last member,
+    ``"result"``, without decoding and re-encoding it.
+    """
+    encoded = orjson.dumps(entry, default=_default, option=_ORJSON_OPTIONS)
+    if result is not None:
+        encoded = encoded[:-1] + (b',"result":' if entry else b'"result":') + result + b"}"
+    return encoded
+
+
+def encode_line(entry: Dict[str, Any], result: Optional[bytes] = None) -> bytes:
+    """Encode one line of an NDJSON stream (see ``encode_entry``)."""
+    return encode_entry(entry, result) + b"\n"
+
+
+def available_encodings() -> List[str]:
+    """Content codings this server can produce, in order of preference."""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    weights = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip().lower()] = quality
+    return weights
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the preferred content coding the client accepts (``q > 0``), or ``None`` for identity."""
+    if not accept_encoding:
+        return None
+    weights = _parse_accept_encoding(accept_encoding)
+    candidates = [
+        (weights.get(coding, weights.get("*", 0.0)), -rank, coding)
+        for rank, coding in enumerate(available_encodings())
+    ]
+    quality, _, coding = max(candidates)
+    return coding if quality > 0 else None
+
+
+def compress(body: bytes, encoding: Optional[str], min_bytes: int = 0) -> Tuple[bytes, Optional[str]]:
+    """Compress ``body`` with the negotiated coding; small bodies are sent as-is."""
+    if encoding is None or len(body) < min_bytes:
+        return body, None
+    if encoding == "br":
+        return brotli.compress(body, quality=5), "br"
+    return gzip.compress(body, compresslevel=6), "gzip"
@@ -0,0 +1,141 @@
+"""Bounded worker pool that keeps CPU-heavy analysis off the event loop."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from ..config import Settings, settings
+
+T = TypeVar("T")
+
+POOL_KINDS = {"thread", "process"}
+
+
+class WorkerPoolSaturated(Exception):
+    """Raised when the pool already has ``max_in_flight`` jobs admitted."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Analysis worker pool is saturated.")
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable[..., T], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[float, T]:
+    """Run ``fn`` inside a worker and report the wall-clock time it started."""
+    started_at = time.time()
+    return started_at, fn(*args, **kwargs)
+
+
+class AnalysisWorkerPool:
+    """
+    Runs blocking callables in a thread or process pool with admission control.
+
+    At most ``max_in_flight`` jobs are admitted at once (running plus queued);
+    further submissions fail fast with ``WorkerPoolSaturated`` instead of
+    queueing without bound.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_in_flight: int = 8, retry_after: int = 1):
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Unsupported worker pool kind: {kind}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_in_flight = max(1, max_in_flight)
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "AnalysisWorkerPool":
+        """Create a pool configured from application settings."""
+        return cls(
+            kind=config.worker_pool_kind,
+            max_workers=config.worker_pool_size,
+            max_in_flight=config.max_in_flight_analyses,
+            retry_after=config.worker_retry_after_seconds,
+        )
+
+    @property
+    def executor(self) -> Executor:
+        """Underlying executor, created lazily on first use."""
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="analysis"
+                    )
+            return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run ``fn(*args, **kwargs)`` in the pool, or raise if the pool is saturated.
+
+        The job's slot is released when the job itself finishes (or is
+        cancelled before it starts), not when the caller stops waiting: a
+        request abandoned mid-analysis keeps counting against ``max_in_flight``
+        until its worker is actually free.
+        """
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self._rejected += 1
+                raise WorkerPoolSaturated(self.retry_after)
+            self._in_flight += 1
+
+        submitted_at = time.time()
+        try:
+            future = self.executor.submit(_timed_call, fn, args, kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        started_at, result = await asyncio.wrap_future(future)
+        self._record_wait(max(0.0, started_at - submitted_at))
+        return result
+
+    def _release(self, _future: Optional[Future]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+
+    def _record_wait(self, wait: float) -> None:
+        with self._lock:
+            self._wait_count += 1
+            self._wait_total += wait
+            self._wait_last = wait
+            self._wait_max = max(self._wait_max, wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool load and queueing behaviour."""
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.max_workers,
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.max_workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_seconds_last": self._wait_last,
+                "wait_seconds_max": self._wait_max,
+                "wait_seconds_avg": self._wait_total / self._wait_count if self._wait_count else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Shut down the underlying executor, if one was started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+worker_pool = AnalysisWorkerPool.from_settings(settings)
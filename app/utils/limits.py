@@ -0,0 +1,72 @@
+from typing import Callable
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Room for the multipart framing and form fields around an upload's bytes
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadLimitMiddleware:
+    """
+    Rejects request bodies over a path's upload limit (413) before the app parses them.
+
+    ``max_bytes`` maps a request path to the largest upload it accepts; the
+    body may exceed it by ``MULTIPART_OVERHEAD_BYTES``. A larger declared
+    Content-Length is refused without reading the body. Otherwise the body is
+    counted as it arrives and the request is failed as soon as the count
+    crosses the limit, so at most one received chunk beyond it is read.
+    Routes still check each file against their own, finer limits.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: Callable[[str], int]):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        max_bytes = self.max_bytes(scope["path"])
+        limit = max_bytes + MULTIPART_OVERHEAD_BYTES
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > limit:
+            await self._reject(scope, receive, send, max_bytes)
+            return
+
+        received = 0
+        exceeded = started = False
+
+        async def counted_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal started
+            if exceeded:
+                return  # the app's error for the cut-off body is replaced by the 413
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, counted_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await self._reject(scope, receive, send, max_bytes)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, max_bytes: int) -> None:
+        response = JSONResponse(status_code=413, content={"detail": f"File too large. Max {max_bytes} bytes."})
+        await response(scope, receive, send)
@@ -0,0 +1,82 @@
+"""Benchmark streaming Excel ingestion against the previous ``pd.read_excel`` path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_excel
+    python -m benchmarks.bench_excel --shapes wide text --rows 1000 10000
+
+For each shape, the workbook is loaded three ways: ``pd.read_excel``, the
+read-only typed reader (``read_excel_frame``) and batch by batch
+(``iter_excel_batches``). The table shows the best time and the peak traced
+memory of each. It also checks that the typed reader returns the same frame
+as ``read_excel``.
+"""
+
+import argparse
+import gc
+import io
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+import pandas as pd
+
+from app.services.analyzer.excel import iter_excel_batches, read_excel_frame
+from benchmarks.datasets import SHAPES, encode, make_frame, supports
+
+
+def read_excel(raw: bytes) -> pd.DataFrame:
+    return pd.read_excel(io.BytesIO(raw))
+
+
+def typed_reader(raw: bytes) -> pd.DataFrame:
+    return read_excel_frame(io.BytesIO(raw))
+
+
+def streamed(raw: bytes) -> int:
+    """Consume every batch, keeping only the running row count."""
+    return sum(len(batch) for batch in iter_excel_batches(io.BytesIO(raw)))
+
+
+def measure(fn: Callable[[bytes], Any], raw: bytes, repeat: int) -> Tuple[float, int]:
+    """Best wall time over ``repeat`` runs and the peak traced memory of one extra run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(raw)
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(raw)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shapes", nargs="+", choices=sorted(SHAPES), default=sorted(SHAPES))
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'case':<20} {'read_excel s':>12} {'typed s':>9} {'stream s':>9} {'speedup':>8} "
+          f"{'read_excel MiB':>15} {'typed MiB':>10} {'stream MiB':>11}  same")
+    for shape in args.shapes:
+        for rows in args.rows:
+            if not supports(shape, rows, "xlsx"):
+                continue
+            raw = encode(make_frame(shape, rows, args.seed), "xlsx")
+            same = read_excel(raw).equals(typed_reader(raw))
+            (legacy, legacy_peak), (typed, typed_peak), (stream, stream_peak) = (
+                measure(fn, raw, args.repeat) for fn in (read_excel, typed_reader, streamed)
+            )
+            print(f"{shape + '/' + str(rows):<20} {legacy:>12.3f} {typed:>9.3f} {stream:>9.3f} {legacy / typed:>7.1f}x "
+                  f"{legacy_peak / 2 ** 20:>15.1f} {typed_peak / 2 ** 20:>10.1f} {stream_peak / 2 ** 20:>11.1f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Benchmark loading and analysis across dataset shapes, sizes and upload formats.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline run --output results.json
+    python -m benchmarks.bench_pipeline run --shapes wide --rows 10000000 --formats parquet
+    python -m benchmarks.bench_pipeline run --shapes wide --shard-workers 4
+    python -m benchmarks.bench_pipeline compare baseline.json results.json
+
+Each case runs in a fresh process so peak RSS is per case. Timings are the
+median of ``--repeat`` runs: ``load_dataframe_from_upload``, the whole of
+``analyze_dataframe`` and each of its stages. Peak traced memory comes from
+one extra, untimed run under ``tracemalloc``. With ``--shard-workers`` the
+analysis shards columns across that many processes (every shape is sharded).
+``compare`` exits non-zero when a metric regressed beyond the thresholds.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.services.analyzer import analyze_dataframe, load_dataframe_from_upload, shutdown_shard_executors
+from app.services.analyzer.instrumentation import run_recorded
+from benchmarks.datasets import FORMATS, SHAPES, encode, make_frame, supports
+
+DEFAULT_ROWS = (1_000, 100_000, 1_000_000)
+MAX_PREVIEW_ROWS = 20
+MAX_CORR_COLS = 12
+
+
+def _median_seconds(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def _peak_traced_bytes(fn: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(shape: str, rows: int, file_format: str, seed: int, repeat: int, shard_workers: int = 0) -> Dict[str, Any]:
+    """Benchmark one (shape, rows, format) case; meant to run in its own process."""
+    df = make_frame(shape, rows, seed)
+    filename = f"{shape}.{file_format}"
+    raw = encode(df, file_format)
+    del df
+    gc.collect()
+
+    load = lambda: load_dataframe_from_upload(filename, raw)
+    load_seconds, loaded = _median_seconds(load, repeat)
+
+    analyze = lambda: run_recorded(
+        analyze_dataframe, loaded, max_preview_rows=MAX_PREVIEW_ROWS, max_corr_cols=MAX_CORR_COLS, filename=filename,
+        shard_workers=shard_workers, shard_min_columns=1,
+    )
+    analyze_runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, stages = analyze()
+        analyze_runs.append((time.perf_counter() - start, stages))
+    stage_names = list(analyze_runs[0][1])
+    analyze_peak_traced_bytes = _peak_traced_bytes(analyze)
+    shutdown_shard_executors()
+
+    return {
+        "shape": shape,
+        "rows": rows,
+        "cols": int(loaded.shape[1]),
+        "format": file_format,
+        "upload_bytes": len(raw),
+        "load_seconds": load_seconds,
+        "analyze_seconds": statistics.median(seconds for seconds, _ in analyze_runs),
+        "stages": {
+            name: statistics.median(stages[name]["wall_seconds"] for _, stages in analyze_runs)
+            for name in stage_names
+        },
+        "load_peak_traced_bytes": _peak_traced_bytes(load),
+        "analyze_peak_traced_bytes": analyze_peak_traced_bytes,
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+    }
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": pa.__version__,
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    cases = [
+        (shape, rows, file_format)
+        for shape, rows, file_format in itertools.product(args.shapes, args.rows, args.formats)
+        if supports(shape, rows, file_format)
+    ]
+    results: Dict[str, Dict[str, Any]] = {}
+    context = multiprocessing.get_context("spawn")
+    for shape, rows, file_format in cases:
+        case_id = f"{shape}/{rows}/{file_format}"
+        # Not a multiprocessing.Pool: its daemonic workers could not start shard processes
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results[case_id] = pool.submit(
+                run_case, shape, rows, file_format, args.seed, args.repeat, args.shard_workers
+            ).result()
+        case = results[case_id]
+        print(f"{case_id:<32} load {case['load_seconds']:>9.4f}s  analyze {case['analyze_seconds']:>9.4f}s  "
+              f"peak rss {case['peak_rss_bytes'] / 2 ** 20:>8.1f} MiB", flush=True)
+
+    report = {
+        "environment": _environment(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "shard_workers": args.shard_workers,
+        "cases": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            return _report_regressions(json.load(fh), report, args.threshold, args.min_seconds, args.min_bytes)
+    return 0
+
+
+def _metrics(case: Dict[str, Any]) -> Dict[str, Tuple[float, str]]:
+    metrics = {
+        "load_seconds": (case["load_seconds"], "s"),
+        "analyze_seconds": (case["analyze_seconds"], "s"),
+        "load_peak_traced_bytes": (case["load_peak_traced_bytes"], "B"),
+        "analyze_peak_traced_bytes": (case["analyze_peak_traced_bytes"], "B"),
+    }
+    metrics.update({f"stage.{name}": (seconds, "s") for name, seconds in case["stages"].items()})
+    return metrics
+
+
+def find_regressions(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+    min_seconds: float,
+    min_bytes: int
+) -> List[Dict[str, Any]]:
+    """Metrics of cases present in both reports that grew by more than ``threshold`` (and the absolute floor)."""
+    regressions = []
+    for case_id, case in current["cases"].items():
+        if case_id not in baseline["cases"]:
+            continue
+        before = _metrics(baseline["cases"][case_id])
+        for metric, (value, unit) in _metrics(case).items():
+            if metric not in before:
+                continue
+            previous = before[metric][0]
+            floor = min_seconds if unit == "s" else min_bytes
+            if value - previous > floor and value > previous * (1 + threshold):
+                regressions.append({
+                    "case": case_id,
+                    "metric": metric,
+                    "baseline": previous,
+                    "current": value,
+                    "ratio": value / previous if previous else float("inf"),
+                })
+    return regressions
+
+
+def _report_regressions(baseline, current, threshold, min_seconds, min_bytes) -> int:
+    regressions = find_regressions(baseline, current, threshold, min_seconds, min_bytes)
+    for regression in regressions:
+        print(f"REGRESSION {regression['case']:<32} {regression['metric']:<32} "
+              f"{regression['baseline']:.6g} -> {regression['current']:.6g} ({regression['ratio']:.2f}x)")
+    print(f"{len(regressions)} regression(s) beyond {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    with open(args.current) as fh:
+        current = json.load(fh)
+    return _report_regressions(baseline, current, args.threshold, args.min_seconds, args.min_bytes)
+
+
+def _add_threshold_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative growth flagged as a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="ignore timing changes smaller than this")
+    parser.add_argument("--min-bytes", type=int, default=1024 * 1024, help="ignore memory changes smaller than this")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmark matrix")
+    run_parser.add_argument("--shapes", nargs="+", choices=sorted(SHAPES), default=sorted(SHAPES))
+    run_parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS))
+    run_parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--shard-workers", type=int, default=0, help="shard columns across this many processes")
+    run_parser.add_argument("--output", help="write the JSON report here")
+    run_parser.add_argument("--baseline", help="compare against this stored report after running")
+    _add_threshold_arguments(run_parser)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two stored reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    _add_threshold_arguments(compare_parser)
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark batched trend fitting against the previous per-column polyfit loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_trends
+"""
+
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from app.services.analyzer.context import AnalysisContext
+from app.services.analyzer.trends import TrendAnalyzer
+from app.services.analyzer.utils import calculate_r_squared
+
+
+def make_frame(rows: int, columns: int, seed: int = 0) -> pd.DataFrame:
+    """Random-walk columns with ~5% missing values."""
+    rng = np.random.default_rng(seed)
+    data = rng.normal(size=(rows, columns)).cumsum(axis=0)
+    data[rng.random(data.shape) < 0.05] = np.nan
+    return pd.DataFrame(data, columns=[f"c{i}" for i in range(columns)])
+
+
+def per_column_polyfit(df: pd.DataFrame) -> None:
+    """The per-column loop TrendAnalyzer used before the batched pass."""
+    x_values = np.arange(len(df), dtype="float64")
+    for _, series in df.select_dtypes(include=np.number).items():
+        y_values = series.astype("float64").to_numpy()
+        valid_mask = np.isfinite(x_values) & np.isfinite(y_values)
+        valid_x, valid_y = x_values[valid_mask], y_values[valid_mask]
+        slope, intercept = np.polyfit(valid_x, valid_y, 1)
+        calculate_r_squared(valid_y, slope * valid_x + intercept)
+        np.nanpercentile(valid_y, 75) - np.nanpercentile(valid_y, 25)
+
+
+def batched(df: pd.DataFrame) -> None:
+    TrendAnalyzer(AnalysisContext(df)).analyze_trends()
+
+
+def best_of(fn: Callable[[pd.DataFrame], None], df: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--columns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'columns':>8} {'polyfit s':>10} {'batched s':>10} {'speedup':>8}")
+    for columns in args.columns:
+        df = make_frame(args.rows, columns)
+        legacy = best_of(per_column_polyfit, df, args.repeat)
+        vectorized = best_of(batched, df, args.repeat)
+        print(f"{columns:>8} {legacy:>10.4f} {vectorized:>10.4f} {legacy / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Deterministic synthetic datasets for the benchmarks, in every upload format the API accepts."""
+
+import io
+import zlib
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+# Excel sheets top out at 1,048,576 rows, and writing them is slow well before that
+MAX_XLSX_CELLS = 1_000_000
+FORMATS = ("csv", "tsv", "parquet", "xlsx")
+
+
+def _rng(shape: str, rows: int, seed: int) -> np.random.Generator:
+    """A generator whose stream depends only on (shape, rows, seed)."""
+    return np.random.default_rng([seed, zlib.crc32(shape.encode("utf-8")), rows])
+
+
+def _walks(rng: np.random.Generator, rows: int, columns: int) -> np.ndarray:
+    return rng.normal(size=(rows, columns)).cumsum(axis=0)
+
+
+def narrow(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """A handful of numeric columns plus a low-cardinality category."""
+    data = _walks(rng, rows, 4)
+    df = pd.DataFrame(data, columns=["price", "quantity", "score", "revenue"])
+    df["region"] = rng.choice(["north", "south", "east", "west"], size=rows)
+    return df
+
+
+def wide(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """200 numeric columns."""
+    return pd.DataFrame(_walks(rng, rows, 200), columns=[f"c{i}" for i in range(200)])
+
+
+def nan_heavy(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Numeric columns with 40% of values missing, plus a mostly empty text column."""
+    data = _walks(rng, rows, 12)
+    data[rng.random(data.shape) < 0.4] = np.nan
+    df = pd.DataFrame(data, columns=[f"m{i}" for i in range(12)])
+    df["note"] = np.where(rng.random(rows) < 0.9, None, "checked")
+    return df
+
+
+def datetime_indexed(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """A minute-resolution timestamp column driving trends, with a linear signal."""
+    df = pd.DataFrame({"order_date": pd.date_range("2020-01-01", periods=rows, freq="min")})
+    base = np.linspace(0, 100, rows)
+    for i in range(6):
+        df[f"metric_{i}"] = base * (i + 1) + rng.normal(scale=10, size=rows)
+    return df
+
+
+def high_cardinality_text(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Unique identifiers, free text and a Zipf-distributed category next to two numeric columns."""
+    return pd.DataFrame({
+        "user_id": [f"u{value:012d}" for value in rng.permutation(rows)],
+        "comment": [f"comment {value}" for value in rng.integers(0, rows, size=rows)],
+        "product": [f"p{value}" for value in np.minimum(rng.zipf(1.5, size=rows), 5000)],
+        "amount": rng.gamma(2.0, 50.0, size=rows),
+        "visits": rng.poisson(3, size=rows),
+    })
+
+
+SHAPES: Dict[str, Callable[[int, np.random.Generator], pd.DataFrame]] = {
+    "narrow": narrow,
+    "wide": wide,
+    "nan_heavy": nan_heavy,
+    "datetime": datetime_indexed,
+    "text": high_cardinality_text,
+}
+
+
+def make_frame(shape: str, rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build the dataset for ``shape`` with ``rows`` rows; identical across runs and machines."""
+    return SHAPES[shape](rows, _rng(shape, rows, seed))
+
+
+def supports(shape: str, rows: int, file_format: str) -> bool:
+    """Whether the case is practical: XLSX is limited to ``MAX_XLSX_CELLS`` cells."""
+    return file_format != "xlsx" or rows * make_frame(shape, 1).shape[1] <= MAX_XLSX_CELLS
+
+
+def encode(df: pd.DataFrame, file_format: str) -> bytes:
+    """Serialize a frame the way a client would upload it."""
+    buffer = io.BytesIO()
+    if file_format == "csv":
+        df.to_csv(buffer, index=False)
+    elif file_format == "tsv":
+        df.to_csv(buffer, index=False, sep="\t")
+    elif file_format == "parquet":
+        df.to_parquet(buffer, index=False)
+    elif file_format == "xlsx":
+        df.to_excel(buffer, index=False)
+    else:
+        raise ValueError(f"Unsupported benchmark format: {file_format}")
+    return buffer.getvalue()
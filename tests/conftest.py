@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    """A small mixed frame: a datetime axis, numeric columns with gaps, and text."""
+    rng = np.random.default_rng(0)
+    rows = 500
+    a = rng.normal(size=rows)
+    a[::37] = np.nan
+    return pd.DataFrame({
+        "order_date": pd.date_range("2024-01-01", periods=rows, freq="h"),
+        "a": a,
+        "b": np.arange(rows, dtype="float64") * 0.5 + rng.normal(size=rows),
+        "c": rng.integers(0, 9, rows),
+        "s": rng.choice(["x", "y", "z"], rows),
+    })
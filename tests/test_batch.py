@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+import orjson
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _lines(response):
+    return [orjson.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_reports_a_failing_file_and_analyzes_the_others(frame):
+    content = frame.to_csv(index=False).encode()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zipped:
+        zipped.writestr("half.csv", frame.head(250).to_csv(index=False))
+
+    response = client.post(
+        "/v1/analyze/batch",
+        params={"compare": "true"},
+        files=[
+            ("files", ("full.csv", content, "text/csv")),
+            ("files", ("empty.csv", b"", "text/csv")),
+            ("files", ("parts.zip", archive.getvalue(), "application/zip")),
+        ],
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    *files, last = _lines(response)
+    by_index = {line["index"]: line for line in files}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[1] == {
+        "index": 1, "filename": "empty.csv", "status": 400, "detail": "Could not parse file: No columns to parse from file",
+    }
+    assert by_index[0]["status"] == by_index[2]["status"] == 200
+    assert by_index[2]["filename"] == "half.csv"
+    single = client.post("/v1/analyze/upload", files={"file": ("full.csv", content, "text/csv")}).json()
+    assert by_index[0]["result"]["numeric_stats"] == single["numeric_stats"]
+    assert last["comparison"]["files"] == ["full.csv", "half.csv"]
+    assert last["comparison"]["rows"] == [500, 250]
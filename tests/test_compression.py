@@ -0,0 +1,44 @@
+import gzip
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _upload(name, content, **kwargs):
+    return client.post("/v1/analyze/upload", files={"file": (name, content, "text/csv")}, **kwargs)
+
+
+def _analysis(result):
+    return {key: result[key] for key in ("columns", "missing", "numeric_stats", "correlations", "trends", "preview")}
+
+
+@pytest.mark.parametrize("suffix, compress", [
+    (".gz", gzip.compress),
+    (".zst", lambda content: pa.compress(content, codec="zstd", asbytes=True)),
+])
+def test_compressed_csv_uploads_analyze_like_plain_text(frame, suffix, compress):
+    content = frame.to_csv(index=False).encode()
+    plain = _upload("data.csv", content)
+
+    compressed = _upload(f"data.csv{suffix}", compress(content))
+
+    assert compressed.status_code == 200
+    assert _analysis(compressed.json()) == _analysis(plain.json())
+    assert compressed.json()["meta"]["rows"] == len(frame)
+
+
+def test_gzip_response_round_trips(frame):
+    content = frame.to_csv(index=False).encode()
+    for layout in ("records", "columnar"):
+        identity = _upload("data.csv", content, params={"layout": layout}, headers={"Accept-Encoding": "identity"})
+        encoded = _upload("data.csv", content, params={"layout": layout}, headers={"Accept-Encoding": "gzip"})
+
+        assert "Content-Encoding" not in identity.headers
+        assert encoded.headers["Content-Encoding"] == "gzip"
+        assert encoded.headers["ETag"] == identity.headers["ETag"][:-1] + '-gzip"'
+        assert encoded.json() == identity.json()  # decoded by the client
@@ -0,0 +1,41 @@
+import pytest
+
+from app.services.analyzer import DataFrameAnalyzer
+
+
+@pytest.mark.parametrize("engine", ["pandas", "arrow"])
+def test_full_analysis_computes_each_stage_once(frame, engine):
+    analyzer = DataFrameAnalyzer(frame, "frame.csv", engine=engine)
+    analyzer.analyze(max_preview_rows=5, max_corr_cols=12)
+
+    counts = analyzer.context.stage_counts
+    for stage in ("numeric_stats", "quantiles", "numeric_matrix", "correlations", "top_correlations", "trends"):
+        assert counts[stage] == 1, stage
+    assert max(counts.values()) == 1
+
+
+def test_skipped_stages_are_not_computed(frame):
+    analyzer = DataFrameAnalyzer(frame, "frame.csv")
+    analyzer.analyze(max_preview_rows=5, max_corr_cols=12, stages=frozenset({"columns", "preview"}))
+
+    assert sum(analyzer.context.stage_counts.values()) == 0
+
+
+def test_stats_only_skips_correlations_and_trends(frame):
+    analyzer = DataFrameAnalyzer(frame, "frame.csv")
+    result = analyzer.analyze(max_preview_rows=5, max_corr_cols=12, stages=frozenset({"stats"}))
+
+    counts = analyzer.context.stage_counts
+    assert counts["numeric_stats"] == 1
+    for stage in ("correlations", "correlation_engine", "top_correlations", "trends", "time_series"):
+        assert counts[stage] == 0, stage
+    assert result["correlations"] == {} and result["trends"] == []
+
+
+def test_repeated_analysis_reuses_the_context(frame):
+    analyzer = DataFrameAnalyzer(frame, "frame.csv")
+    first = analyzer.analyze(max_preview_rows=5, max_corr_cols=12)
+    second = analyzer.analyze(max_preview_rows=5, max_corr_cols=3)
+
+    assert max(analyzer.context.stage_counts.values()) == 1
+    assert list(second["correlations"]) == list(first["correlations"])[:3]
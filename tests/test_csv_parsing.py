@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.analyzer import (
+    DataFrameLoader, analyze_delimited_stream, analyze_sample, analyze_upload_file,
+)
+
+OPTIONS = {"max_preview_rows": 5, "max_corr_cols": 12}
+
+
+@pytest.fixture
+def gappy_csv(tmp_path):
+    """Blank and "NA"-style cells in text and numeric columns, spread over many stream blocks."""
+    rng = np.random.default_rng(0)
+    rows = 20_000
+    frame = pd.DataFrame({
+        "n": rng.normal(size=rows).round(4),
+        "s": rng.choice(["a", "b", "c"], rows),
+        "k": rng.integers(0, 100, rows),
+    }).astype({"n": object, "s": object})
+    frame.loc[::7, "s"] = ""
+    frame.loc[3::11, "s"] = "NA"
+    frame.loc[5::13, "s"] = "None"
+    frame.loc[::17, "n"] = ""
+    path = tmp_path / "gappy.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_missing_values_agree_across_engines(gappy_csv):
+    exact = analyze_upload_file("gappy.csv", gappy_csv, **OPTIONS)
+    assert exact["missing"]["s"] > 0 and exact["missing"]["n"] > 0
+
+    results = {
+        "arrow engine": analyze_upload_file("gappy.csv", gappy_csv, engine="arrow", **OPTIONS),
+        "pyarrow csv engine": analyze_upload_file(
+            "gappy.csv", gappy_csv, csv_options={"engine": "pyarrow", "block_size": 16 * 1024}, **OPTIONS
+        ),
+        "pyarrow csv, arrow engine": analyze_upload_file(
+            "gappy.csv", gappy_csv, engine="arrow", csv_options={"engine": "pyarrow"}, **OPTIONS
+        ),
+        "streaming": analyze_delimited_stream("gappy.csv", gappy_csv, block_size=16 * 1024, **OPTIONS),
+        "sampled": analyze_sample("gappy.csv", gappy_csv, sample_rows=100_000, block_size=16 * 1024, **OPTIONS),
+    }
+    for name, result in results.items():
+        assert result["missing"] == exact["missing"], name
+
+
+def test_streaming_widens_integers_that_turn_fractional(tmp_path):
+    rows = ["k,v"] + [f"{i},{i % 10}" for i in range(50_000)] + ["1.5,3"] + [f"{i},1" for i in range(10)]
+    path = tmp_path / "late.csv"
+    path.write_text("\n".join(rows) + "\n")
+
+    exact = analyze_upload_file("late.csv", str(path), **OPTIONS)
+    streamed = analyze_delimited_stream("late.csv", str(path), block_size=16 * 1024, **OPTIONS)
+
+    assert streamed["meta"]["rows"] == exact["meta"]["rows"] == 50_011
+    for stat in ("count", "mean", "min", "max"):
+        assert streamed["numeric_stats"]["k"][stat] == pytest.approx(exact["numeric_stats"]["k"][stat])
+
+
+def test_streaming_reads_later_text_in_numeric_columns_as_missing(tmp_path):
+    rows = ["k,when"] + [f"{i},2024-01-01 00:00:00" for i in range(50_000)] + ["oops,never"]
+    path = tmp_path / "text.csv"
+    path.write_text("\n".join(rows) + "\n")
+
+    batches = list(DataFrameLoader().iter_delimited_batches(str(path), ".csv", block_size=16 * 1024))
+
+    assert sum(len(batch) for batch in batches) == 50_001
+    assert batches[-1]["k"].isna().sum() == 1
+    assert batches[-1]["when"].isna().sum() == 1
+
+
+def test_streaming_from_a_file_object_with_projection(tmp_path):
+    rows = ["a,k,b"] + [f"x,{i},y" for i in range(50_000)] + ["x,2.25,y"]
+    path = tmp_path / "projected.csv"
+    path.write_text("\n".join(rows) + "\n")
+
+    with open(path, "rb") as source:
+        batches = list(DataFrameLoader().iter_delimited_batches(source, ".csv", block_size=16 * 1024, columns=["k"]))
+
+    values = pd.concat([batch["k"].astype("float64") for batch in batches])
+    assert len(values) == 50_001 and values.iloc[-1] == 2.25
+
+
+def test_pyarrow_csv_engine_does_not_resize_the_cpu_pool(gappy_csv):
+    import pyarrow as pa
+
+    before = pa.cpu_count()
+    loaded = DataFrameLoader({"engine": "pyarrow", "threads": before + 3}).load_from_upload("gappy.csv", gappy_csv)
+
+    assert len(loaded) == 20_000
+    assert pa.cpu_count() == before
+
+
+@pytest.fixture
+def repeated_header_csv(tmp_path):
+    rows = ["a,a,b,a.1,s"] + [f"{i},{i * 2},{i % 7},{-i},t{i % 3}" for i in range(5_000)]
+    path = tmp_path / "repeated.csv"
+    path.write_text("\n".join(rows) + "\n")
+    return str(path)
+
+
+def test_streaming_renames_repeated_headers_like_pandas(repeated_header_csv):
+    exact = analyze_upload_file("repeated.csv", repeated_header_csv, **OPTIONS)
+    streamed = analyze_delimited_stream("repeated.csv", repeated_header_csv, block_size=16 * 1024, **OPTIONS)
+
+    names = [column["name"] for column in exact["columns"]]
+    assert names == ["a", "a.2", "b", "a.1", "s"]
+    assert [column["name"] for column in streamed["columns"]] == names
+    assert streamed["numeric_stats"]["a.2"]["max"] == exact["numeric_stats"]["a.2"]["max"] == 9_998
+    assert streamed["missing"] == exact["missing"]
+
+
+def test_pandas_and_pyarrow_csv_engines_agree(repeated_header_csv):
+    pandas_engine = analyze_upload_file("repeated.csv", repeated_header_csv, **OPTIONS)
+    pyarrow_engine = analyze_upload_file(
+        "repeated.csv", repeated_header_csv, csv_options={"engine": "pyarrow"}, **OPTIONS
+    )
+
+    for section in ("meta", "missing", "numeric_stats", "correlations", "top_correlations", "preview"):
+        assert pyarrow_engine[section] == pandas_engine[section], section
+    assert [column["name"] for column in pyarrow_engine["columns"]] == [
+        column["name"] for column in pandas_engine["columns"]
+    ]
@@ -0,0 +1,115 @@
+import asyncio
+import io
+import pickle
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import analyze
+from app.services.analyzer.incremental import _AppendedRows
+from app.services.dataset_store import DatasetStore, dataset_store
+
+client = TestClient(app)
+
+
+def _csv(frame) -> bytes:
+    return frame.to_csv(index=False).encode()
+
+
+def _put(dataset_id, content):
+    return client.put(f"/v1/analyze/datasets/{dataset_id}", files={"file": ("data.csv", content, "text/csv")})
+
+
+def _append(dataset_id, content):
+    return client.post(f"/v1/analyze/datasets/{dataset_id}/rows", files={"file": ("rows.csv", content, "text/csv")})
+
+
+def _summary(result):
+    stats = {
+        column: {key: pytest.approx(value) for key, value in values.items() if key in ("count", "mean", "std", "min", "max")}
+        for column, values in result["numeric_stats"].items()
+    }
+    axis = {key: result["time_series"][key] for key in ("column", "unit", "points", "rows", "duplicates")}
+    return result["meta"]["rows"], result["missing"], [column["name"] for column in result["columns"]], stats, axis
+
+
+def test_appended_rows_match_a_full_rebuild(frame):
+    head, tail = frame.iloc[:300], frame.iloc[300:]
+    assert _put("parity-a", _csv(head)).headers["X-Analytica-Dataset"] == "created"
+    appended = _append("parity-a", _csv(tail))
+    assert appended.status_code == 200
+    assert appended.headers["X-Analytica-Dataset"] == "appended"
+
+    _put("parity-b", _csv(head))
+    grown = _put("parity-b", _csv(frame))
+    assert grown.headers["X-Analytica-Dataset"] == "appended"
+
+    rebuilt = _put("parity-c", _csv(frame))
+    assert rebuilt.headers["X-Analytica-Dataset"] == "created"
+    expected = _summary(rebuilt.json())
+    assert _summary(appended.json()) == expected
+    assert _summary(grown.json()) == expected
+
+
+def test_grown_file_whose_last_row_was_unfinished_is_appended(frame):
+    content = _csv(frame)
+    cut = content.index(b"\n", len(content) // 2)  # the prefix stops just before a line break
+    _put("unfinished", content[:cut])
+
+    grown = _put("unfinished", content)
+
+    assert grown.headers["X-Analytica-Dataset"] == "appended"
+    assert _summary(grown.json()) == _summary(_put("unfinished-rebuilt", content).json())
+
+
+def test_appended_rows_read_like_the_header_and_new_bytes_joined(tmp_path):
+    path = tmp_path / "grown.csv"
+    path.write_bytes(b"a,b\n1,2\n3,4\n5,6\n")
+    expected = io.BytesIO(b"a,b\n3,4\n5,6\n")
+
+    with open(path, "rb") as fh:
+        rows = _AppendedRows(b"a,b\n", fh, 8)
+        assert rows.read(6) == expected.read(6)
+        assert rows.seek(2) == 2 and rows.read() == b"b\n3,4\n5,6\n"
+        assert rows.seek(-4, io.SEEK_END) == 8 and rows.read(2) == b"5,"
+        assert rows.seek(0) == 0 and io.BufferedReader(rows).read() == expected.getvalue()
+
+
+def test_delete_waits_for_an_update_in_progress(frame):
+    _put("busy", _csv(frame))
+
+    async def scenario():
+        lock = dataset_store.lock("busy")
+        await lock.acquire()
+        deletion = asyncio.create_task(analyze.delete_dataset("busy"))
+        await asyncio.sleep(0.05)
+        assert not deletion.done() and dataset_store.get("busy") is not None
+        lock.release()
+        return await deletion
+
+    assert asyncio.run(scenario()).status_code == 204
+    assert dataset_store.get("busy") is None
+
+
+def test_appending_other_columns_conflicts(frame):
+    assert _put("mismatch", _csv(frame.iloc[:300])).status_code == 200
+
+    response = _append("mismatch", _csv(frame.iloc[300:].rename(columns={"a": "renamed"})))
+
+    assert response.status_code == 409
+    assert _append("mismatch", _csv(frame.iloc[300:])).status_code == 200
+
+
+def test_appending_to_an_unknown_dataset_is_not_found(frame):
+    assert _append("unknown", _csv(frame)).status_code == 404
+
+
+def test_failed_disk_write_leaves_no_temporary_file(tmp_path):
+    store = DatasetStore(max_entries=4, directory=str(tmp_path))
+
+    with pytest.raises((pickle.PicklingError, AttributeError, TypeError)):
+        store.put("broken", lambda: None)
+
+    assert list(tmp_path.iterdir()) == []
+    assert store.get("broken") is None
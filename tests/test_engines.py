@@ -0,0 +1,86 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.services.analyzer import DataFrameAnalyzer
+from app.services.analyzer.api import analyze_upload_file
+
+
+def _time_fields(result):
+    return [trend.get("unit") for trend in result["trends"]], result["time_series"]
+
+
+@pytest.fixture
+def frame(frame):
+    # Not named like a date, so only the column's type marks it as the time axis
+    return frame.rename(columns={"order_date": "at"})
+
+
+@pytest.fixture
+def expected(frame):
+    result = DataFrameAnalyzer(frame, "frame.csv").analyze(max_preview_rows=5, max_corr_cols=12)
+    units, time_series = _time_fields(result)
+    assert set(units) == {"hour"} and time_series is not None
+    return result
+
+
+def test_arrow_engine_fits_trends_over_timestamps(frame, expected):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    result = DataFrameAnalyzer.from_arrow(table, "frame.csv").analyze(max_preview_rows=5, max_corr_cols=12)
+
+    assert _time_fields(result) == _time_fields(expected)
+    assert result["trends"] == pytest.approx(expected["trends"])
+
+
+def test_arrow_engine_fits_trends_over_dates(frame):
+    daily = frame.assign(at=frame["at"].dt.floor("D"))
+    table = pa.Table.from_pandas(daily, preserve_index=False)
+    table = table.set_column(0, "at", table["at"].cast(pa.date32()))
+    result = DataFrameAnalyzer.from_arrow(table, "frame.csv").analyze(max_preview_rows=5, max_corr_cols=12)
+
+    assert {trend.get("unit") for trend in result["trends"]} == {"day"}
+
+
+@pytest.mark.parametrize("parquet_fast_path", [True, False])
+def test_parquet_upload_matches_pandas_engine(frame, expected, tmp_path, parquet_fast_path):
+    path = tmp_path / "frame.parquet"
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), path)
+    result = analyze_upload_file(
+        "frame.parquet", str(path), max_preview_rows=5, max_corr_cols=12,
+        engine="arrow", parquet_fast_path=parquet_fast_path,
+    )
+
+    assert _time_fields(result) == _time_fields(expected)
+
+
+def test_pyarrow_csv_timestamps_are_datetimes(frame, expected, tmp_path):
+    path = tmp_path / "frame.csv"
+    frame.to_csv(path, index=False)
+    result = analyze_upload_file(
+        "frame.csv", str(path), max_preview_rows=5, max_corr_cols=12,
+        engine="arrow", csv_options={"engine": "pyarrow"},
+    )
+
+    assert _time_fields(result) == _time_fields(expected)
+
+
+def test_arrow_engine_rounds_integers_beyond_float_precision():
+    table = pa.table({"big": pa.array([2**60 + 1, 2**60 + 3, 5, 7, None], pa.int64()), "x": [1.0, 2, 3, 4, 5]})
+    arrow = DataFrameAnalyzer.from_arrow(table, "big.csv").analyze(max_preview_rows=5, max_corr_cols=12)
+    pandas = DataFrameAnalyzer(table.to_pandas(), "big.csv").analyze(max_preview_rows=5, max_corr_cols=12)
+
+    assert arrow["numeric_stats"]["big"] == pytest.approx(pandas["numeric_stats"]["big"])
+    assert arrow["correlations"]["big"] == pytest.approx(pandas["correlations"]["big"])
+
+
+def test_arrow_engine_reads_repeated_csv_headers(tmp_path):
+    path = tmp_path / "repeated.csv"
+    path.write_text("a,a,b\n" + "".join(f"{i},{i * 2},{i % 5}\n" for i in range(100)))
+    options = {"max_preview_rows": 5, "max_corr_cols": 12}
+
+    arrow = analyze_upload_file("repeated.csv", str(path), engine="arrow", **options)
+    pandas = analyze_upload_file("repeated.csv", str(path), **options)
+
+    assert [column["name"] for column in arrow["columns"]] == ["a", "a.1", "b"]
+    for column, stats in pandas["numeric_stats"].items():
+        assert arrow["numeric_stats"][column] == pytest.approx(stats), column
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.analyzer import analyze_excel_stream, analyze_upload_file
+from app.services.analyzer.excel import iter_excel_batches, read_excel_frame
+
+OPTIONS = {"max_preview_rows": 5, "max_corr_cols": 12}
+
+
+@pytest.fixture
+def workbook(tmp_path, frame):
+    """The shared frame as a sheet, with gaps that only turn up after the first batches."""
+    frame = frame.copy()
+    frame["c"] = frame["c"].astype("float64")
+    frame.loc[450, "c"] = np.nan
+    frame.loc[::9, "s"] = None
+    path = tmp_path / "data.xlsx"
+    frame.to_excel(path, index=False)
+    return str(path)
+
+
+def test_batches_concatenate_to_the_full_read(workbook):
+    full = read_excel_frame(workbook)
+    batches = list(iter_excel_batches(workbook, batch_rows=64))
+
+    assert [len(batch) for batch in batches] == [64] * 7 + [52]
+    pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), full, check_dtype=False)
+    limited = pd.concat(iter_excel_batches(workbook, batch_rows=64, max_rows=100, columns=["b", "a"]), ignore_index=True)
+    pd.testing.assert_frame_equal(limited, full[["b", "a"]].head(100), check_dtype=False)
+
+
+def test_streamed_excel_analysis_matches_a_full_read(workbook):
+    exact = analyze_upload_file("data.xlsx", workbook, **OPTIONS)
+    streamed = analyze_excel_stream("data.xlsx", workbook, batch_rows=64, **OPTIONS)
+
+    assert streamed["meta"] == exact["meta"]
+    assert streamed["missing"] == exact["missing"]
+    # The first batch has no gap in "c", so its preview keeps integers
+    pd.testing.assert_frame_equal(pd.DataFrame(streamed["preview"]), pd.DataFrame(exact["preview"]), check_dtype=False)
+    for column, stats in exact["numeric_stats"].items():
+        for key in ("count", "mean", "std", "min", "max"):
+            assert streamed["numeric_stats"][column][key] == pytest.approx(stats[key])
+    assert streamed["time_series"] == pytest.approx(exact["time_series"])
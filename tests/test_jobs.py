@@ -0,0 +1,38 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _wait(job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(f"/v1/analyze/jobs/{job_id}")
+        if response.json()["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return response
+        time.sleep(0.05)
+
+
+def test_finished_job_with_missing_dates_is_served(frame):
+    frame.loc[3, "order_date"] = None
+    submitted = client.post(
+        "/v1/analyze/jobs", files={"file": ("dates.csv", frame.to_csv(index=False).encode(), "text/csv")}
+    )
+    assert submitted.status_code == 202
+    assert submitted.json()["result"] is None
+
+    response = _wait(submitted.json()["id"])
+
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "succeeded", job["error"]
+    assert set(job["progress"].values()) == {"done"}
+    assert job["result"]["meta"]["rows"] == len(frame)
+    assert job["result"]["missing"]["order_date"] == 1
+
+
+def test_unknown_job_is_not_found():
+    assert client.get("/v1/analyze/jobs/unknown").status_code == 404
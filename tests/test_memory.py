@@ -0,0 +1,34 @@
+import pytest
+
+from app.services.analyzer import DataFrameAnalyzer
+
+
+@pytest.fixture(params=["numpy", "pyarrow"])
+def loaded(request, frame):
+    return frame if request.param == "numpy" else frame.convert_dtypes(dtype_backend="pyarrow")
+
+
+def _analyze(frame, optimize_memory):
+    analyzer = DataFrameAnalyzer(frame, "frame.csv", optimize_memory=optimize_memory)
+    return analyzer, analyzer.analyze(max_preview_rows=5, max_corr_cols=12)
+
+
+def test_optimization_leaves_results_unchanged(loaded):
+    optimizer, optimized = _analyze(loaded, True)
+    _, plain = _analyze(loaded, False)
+
+    assert optimizer.memory["after_bytes"] < optimizer.memory["before_bytes"]
+    assert str(optimizer.df["c"].dtype) != str(loaded["c"].dtype)
+    assert optimized["columns"] == plain["columns"]
+    assert optimized["missing"] == plain["missing"]
+    assert optimized["numeric_stats"] == plain["numeric_stats"]
+    assert optimized["correlations"] == plain["correlations"]
+    assert optimized["trends"] == plain["trends"]
+
+
+def test_columns_report_dtypes_as_loaded(loaded):
+    _, result = _analyze(loaded, True)
+
+    dtypes = {column["name"]: column["dtype"] for column in result["columns"]}
+    assert dtypes["c"] == str(loaded["c"].dtype)
+    assert dtypes["s"] == str(loaded["s"].dtype)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.routers import analyze
+from app.services.profile_store import ProfileStore
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch, tmp_path):
+    """A fresh profile store per test, so the first upload of a file is never a hit."""
+    monkeypatch.setattr(analyze, "profile_store", ProfileStore(str(tmp_path)))
+
+
+def _profile(content, name="profiled.csv"):
+    return client.post("/v1/analyze/profiles", files={"file": (name, content, "text/csv")})
+
+
+def test_profile_is_saved_and_re_ranked_without_the_upload(frame):
+    content = frame.to_csv(index=False).encode()
+    created = _profile(content)
+    assert created.status_code == 200 and created.headers["X-Analytica-Cache"] == "miss"
+    profile = created.json()
+    again = _profile(content)
+    assert again.headers["X-Analytica-Cache"] == "hit" and again.json()["id"] == profile["id"]
+    assert profile["rows"] == profile["sample_rows"] == len(frame)
+    single = client.post("/v1/analyze/upload", files={"file": ("profiled.csv", content, "text/csv")}).json()
+    assert profile["result"]["numeric_stats"] == single["numeric_stats"]
+
+    url = f"/v1/analyze/profiles/{profile['id']}"
+    ranked = client.get(f"{url}/analysis", params={"max_corr_cols": 2, "top_correlations": 1, "percentiles": "10,90"})
+    assert ranked.status_code == 200
+    result = ranked.json()
+    ranks = {column["name"]: column["correlation_rank"] for column in profile["columns"]}
+    assert set(result["correlations"]) == {name for name, rank in ranks.items() if rank is not None and rank < 2}
+    assert result["top_correlations"] == single["top_correlations"][:1]
+    for column in ("a", "b", "c"):
+        ordered = np.sort(frame[column].dropna().to_numpy())
+        value = result["quantiles"][column]["90%"]
+        low, high = (np.searchsorted(ordered, value, side) / len(ordered) for side in ("left", "right"))
+        assert low - settings.quantile_error <= 0.9 <= high + settings.quantile_error
+
+    page = client.get(f"{url}/rows", params={"offset": 5, "limit": 3}).json()
+    assert page["total"] == len(frame) and page["row_numbers"] == [5, 6, 7]
+    assert [row["b"] for row in page["rows"]] == pytest.approx(frame["b"].iloc[5:8].tolist())
+
+    assert client.delete(url).status_code == 204
+    assert client.get(url).status_code == 404
+
+
+def test_re_ranking_beyond_what_the_profile_kept_is_rejected(monkeypatch, frame):
+    # A profile keeps at least what the analysis itself reports
+    for name in ("profile_correlation_columns", "max_numeric_cols_for_corr"):
+        monkeypatch.setattr(settings, name, 2)
+    for name in ("profile_top_correlations", "correlation_top_k"):
+        monkeypatch.setattr(settings, name, 1)
+    profile = _profile(frame.to_csv(index=False).encode(), "narrow.csv").json()
+    url = f"/v1/analyze/profiles/{profile['id']}/analysis"
+
+    assert client.get(url, params={"max_corr_cols": 2, "top_correlations": 1}).status_code == 200
+    assert client.get(url, params={"max_corr_cols": 3}).status_code == 422
+    assert client.get(url, params={"top_correlations": 2}).status_code == 422
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.services.analyzer.constants import REPORTED_QUANTILES
+from app.services.analyzer.quantiles import QUANTILE_FIELDS
+
+client = TestClient(app)
+ERROR = 0.01
+
+
+@pytest.fixture
+def skewed():
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({"normal": rng.normal(50, 10, 40_000), "skewed": rng.exponential(2.0, 40_000)})
+
+
+def _assert_within_rank_error(result, frame):
+    for column in frame.columns:
+        ordered = np.sort(frame[column].to_numpy())
+        stats = result["numeric_stats"][column]
+        for probability in REPORTED_QUANTILES:
+            rank = np.searchsorted(ordered, stats[QUANTILE_FIELDS[probability]]) / len(ordered)
+            assert abs(rank - probability) <= ERROR, (column, probability, rank)
+
+
+@pytest.mark.parametrize("overrides", [
+    {},
+    {"shard_workers": 2, "shard_min_columns": 2},
+    {"streaming_threshold_bytes": 1},
+], ids=["in-memory", "sharded", "streamed"])
+def test_sketched_quantiles_stay_within_the_rank_error(monkeypatch, request, skewed, overrides):
+    monkeypatch.setattr(settings, "quantile_mode", "sketch")
+    monkeypatch.setattr(settings, "quantile_error", ERROR)
+    for name, value in overrides.items():
+        monkeypatch.setattr(settings, name, value)
+
+    response = client.post(
+        "/v1/analyze/upload", params={"mode": "exact"},
+        files={"file": (f"{request.node.callspec.id}.csv", skewed.to_csv(index=False).encode(), "text/csv")},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Analytica-Cache"] == "miss"
+    _assert_within_rank_error(response.json(), skewed)
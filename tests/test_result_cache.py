@@ -0,0 +1,52 @@
+import os
+
+from app.services.result_cache import ResultCache
+
+
+def test_memory_tier_is_bounded_by_bytes():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.put("c", b"12345")
+
+    assert cache.get("a") is None
+    assert cache.get("c") == b"12345"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    ResultCache(max_bytes=0, directory=str(tmp_path), disk_max_bytes=1000).put("k", b"{}")
+
+    reopened = ResultCache(max_bytes=0, directory=str(tmp_path), disk_max_bytes=1000)
+
+    assert reopened.get("k") == b"{}"
+    assert reopened.stats()["disk_entries"] == 1
+
+
+def test_disk_tier_evicts_oldest_without_rescanning(tmp_path, monkeypatch):
+    old = tmp_path / "old.json"
+    old.write_bytes(b"x" * 40)
+    os.utime(old, (1, 1))
+    cache = ResultCache(max_bytes=0, directory=str(tmp_path), disk_max_bytes=100)
+    assert cache.stats()["disk_bytes"] == 40
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("the cache directory was listed on put")
+
+    monkeypatch.setattr(os, "scandir", no_scan)
+    cache.put("first", b"y" * 40)
+    cache.put("second", b"z" * 40)
+
+    assert not old.exists()
+    assert cache.get("first") == b"y" * 40 and cache.get("second") == b"z" * 40
+    stats = cache.stats()
+    assert stats["disk_bytes"] == 80 and stats["disk_evictions"] == 1
+
+
+def test_rewriting_a_key_replaces_its_size(tmp_path):
+    cache = ResultCache(max_bytes=0, directory=str(tmp_path), disk_max_bytes=100)
+    cache.put("k", b"a" * 60)
+    cache.put("k", b"b" * 60)
+
+    assert cache.stats()["disk_bytes"] == 60
+    assert cache.get("k") == b"b" * 60
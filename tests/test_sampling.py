@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.analyzer.api import analyze_sample
+from app.services.analyzer.sampling import RowSampler
+
+client = TestClient(app)
+
+
+def _fold(sampler, frame, batch_rows=37):
+    for start in range(0, len(frame), batch_rows):
+        sampler.update(frame.iloc[start:start + batch_rows].copy())
+    return sampler
+
+
+def test_reservoir_is_uniform_without_replacement():
+    frame = pd.DataFrame({"v": np.arange(1_000, dtype="float64")})
+    picks = np.zeros(10)
+    for seed in range(300):
+        sample = _fold(RowSampler(100, seed=seed), frame).sample()
+        positions = sample.index.to_numpy()
+        assert len(positions) == 100 and len(set(positions)) == 100
+        assert (np.diff(positions) > 0).all()
+        assert (sample["v"].to_numpy() == positions).all()
+        picks += np.bincount(positions // 100, minlength=10)
+
+    # Every tenth of the rows holds a tenth of the picks
+    assert np.allclose(picks / picks.sum(), 0.1, atol=0.01)
+
+
+def test_sampler_counts_every_row_exactly(frame):
+    sampler = _fold(RowSampler(50, max_preview_rows=5), frame.copy())
+
+    assert sampler.rows == len(frame)
+    assert sampler.null_counts.to_dict() == frame.isna().sum().to_dict()
+    assert sampler.minimum["a"] == frame["a"].min() and sampler.maximum["b"] == frame["b"].max()
+    assert sampler.preview.index.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_sampled_estimates_carry_covering_intervals(tmp_path):
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame({"x": rng.normal(10.0, 2.0, 50_000), "y": rng.exponential(3.0, 50_000)})
+    path = tmp_path / "large.csv"
+    frame.to_csv(path, index=False)
+
+    result = analyze_sample("large.csv", str(path), max_preview_rows=5, max_corr_cols=12, sample_rows=5_000)
+
+    sample = result["meta"]["sample"]
+    assert sample["rows"] == 5_000 and sample["fraction"] == 0.1
+    for column in ("x", "y"):
+        stats = result["numeric_stats"][column]
+        assert stats["count"] == 50_000
+        assert stats["max"] == frame[column].max()
+        low, high = stats["confidence"]["mean"]
+        assert low <= stats["mean"] <= high
+        assert low <= frame[column].mean() <= high
+        low, high = stats["confidence"]["median"]
+        assert low <= frame[column].median() <= high
+
+
+def test_sample_mode_upload_with_repeated_headers():
+    content = "a,a,b\n" + "".join(f"{i},{i * 2},{i % 5}\n" for i in range(2_000))
+    response = client.post(
+        "/v1/analyze/upload", params={"mode": "sample"}, files={"file": ("repeated.csv", content.encode(), "text/csv")}
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert [column["name"] for column in result["columns"]] == ["a", "a.1", "b"]
+    assert result["meta"]["rows"] == 2_000
+    assert "sample" in result["meta"]
@@ -0,0 +1,49 @@
+import pytest
+
+from app.services.analyzer.api import analyze_delimited_stream
+from app.services.analyzer.selection import restrict_results
+
+FULL_STAGES = frozenset({"columns", "preview", "stats", "correlations", "trends", "insights"})
+
+
+@pytest.fixture
+def csv_path(frame, tmp_path):
+    path = tmp_path / "frame.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def _stream(path, stages=None, progress=None):
+    return analyze_delimited_stream(
+        "frame.csv", path, max_preview_rows=5, max_corr_cols=12, block_size=2048, stages=stages, progress=progress,
+    )
+
+
+@pytest.mark.parametrize("stages", [{"stats"}, {"correlations"}, {"trends"}, {"columns", "insights"}])
+def test_selected_stages_match_the_full_analysis(csv_path, stages):
+    stages = frozenset(stages)
+    expected = restrict_results(_stream(csv_path), stages)
+
+    assert _stream(csv_path, stages) == expected
+
+
+def test_unselected_stages_are_not_run(csv_path):
+    reported = []
+    _stream(csv_path, frozenset({"stats"}), reported.append)
+
+    assert "stats" in reported
+    assert not {"correlations", "trends", "insights"} & set(reported)
+
+
+def test_schema_only_stops_after_the_preview(frame, csv_path):
+    batches = []
+    full = _stream(csv_path, progress=batches.append)
+    parsed = []
+    result = _stream(csv_path, frozenset({"columns", "preview"}), parsed.append)
+
+    # "load" is reported before every batch and before finding there are no more
+    assert parsed.count("load") == 2 < batches.count("load")
+    assert result["meta"]["rows"] == len(frame)
+    assert result["columns"] == full["columns"]
+    assert result["preview"] == full["preview"]
+    assert result["meta"]["stages"] == ["columns", "preview"]
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.analyzer import analyze_delimited_stream, analyze_upload_file
+from app.services.analyzer.timeseries import PeriodSums, TimeAxis
+from app.services.analyzer.trends import datetime_axis
+
+OPTIONS = {"max_preview_rows": 5, "max_corr_cols": 12}
+
+
+@pytest.fixture
+def daily_csv(tmp_path):
+    """400 days: a level shift on day 200, a weekly cycle on a slow rise, and noise."""
+    rng = np.random.default_rng(0)
+    days = np.arange(400)
+    frame = pd.DataFrame({
+        "order_date": pd.date_range("2024-01-01", periods=400, freq="D"),
+        "step": np.where(days < 200, 10.0, 30.0) + rng.normal(0, 1, 400),
+        "weekly": 5 * np.sin(2 * np.pi * days / 7) + 0.01 * days + rng.normal(0, 0.5, 400),
+        "noise": rng.normal(0, 1, 400),
+    })
+    path = tmp_path / "daily.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_change_point_is_found_at_a_level_shift(daily_csv):
+    time_series = analyze_upload_file("daily.csv", daily_csv, **OPTIONS)["time_series"]
+
+    assert time_series["unit"] == "day" and time_series["points"] == 400
+    [point] = time_series["change_points"]
+    assert point["column"] == "step"
+    assert point["at"] == "2024-07-19T00:00:00"  # day 200
+    assert point["level_before"] == pytest.approx(10, abs=0.5)
+    assert point["level_after"] == pytest.approx(30, abs=0.5)
+
+
+def test_weekly_cycle_is_found_without_change_points(daily_csv):
+    time_series = analyze_upload_file("daily.csv", daily_csv, **OPTIONS)["time_series"]
+
+    [cycle] = time_series["seasonality"]
+    assert cycle["column"] == "weekly" and cycle["period"] == 7
+    assert cycle["strength"] > 0.9
+    assert all(point["column"] == "step" for point in time_series["change_points"])
+
+
+def test_streaming_time_series_matches_in_memory(daily_csv):
+    exact = analyze_upload_file("daily.csv", daily_csv, **OPTIONS)
+    streamed = analyze_delimited_stream("daily.csv", daily_csv, block_size=2_000, **OPTIONS)
+
+    sections = ("change_points", "seasonality")
+    for section in sections:
+        assert len(streamed["time_series"][section]) == len(exact["time_series"][section]) == 1
+        assert streamed["time_series"][section][0] == pytest.approx(exact["time_series"][section][0])
+    assert {key: value for key, value in streamed["time_series"].items() if key not in sections} == {
+        key: value for key, value in exact["time_series"].items() if key not in sections
+    }
+    step = next(trend for trend in streamed["trends"] if trend["column"] == "step")
+    expected = next(trend for trend in exact["trends"] if trend["column"] == "step")
+    assert step["recent_slope"] == pytest.approx(expected["recent_slope"])
+    assert step["segments"] == expected["segments"]
+
+
+def test_period_sums_coarsen_and_merge_like_a_time_axis():
+    rng = np.random.default_rng(2)
+    timestamps = datetime_axis(pd.Series(pd.date_range("2020-01-01", periods=30_000, freq="h")))
+    timestamps[::97] = np.nan
+    matrix = rng.normal(size=(30_000, 2))
+    axis = TimeAxis("t", timestamps)
+
+    halves = [PeriodSums("t", "hour", 2), PeriodSums("t", "hour", 2)]
+    for half, rows in zip(halves, (slice(0, 15_000), slice(15_000, None))):
+        for start in range(rows.start, rows.stop or 30_000, 1_000):
+            half.update(timestamps[start:start + 1_000], matrix[start:start + 1_000])
+    assert halves[0].unit == "day" and halves[1].unit == "day"
+    halves[0].merge(halves[1])
+    merged = halves[0].axis()
+
+    assert (merged.unit, merged.first_period, merged.points) == (axis.unit, axis.first_period, axis.points)
+    assert (merged.rows, merged.duplicates) == (axis.rows, 0)
+    np.testing.assert_allclose(halves[0].means(), axis.resample(matrix))
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import io
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.routers import analyze
+from app.utils.limits import MULTIPART_OVERHEAD_BYTES, UploadLimitMiddleware
+
+CHUNK = 64 * 1024
+
+
+def _echo_app(limit: int) -> UploadLimitMiddleware:
+    inner = FastAPI()
+
+    @inner.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return UploadLimitMiddleware(inner, max_bytes=lambda path: limit)
+
+
+def _multipart(size: int) -> bytes:
+    return (
+        b'--x\r\nContent-Disposition: form-data; name="file"; filename="a.csv"\r\n'
+        b"Content-Type: text/csv\r\n\r\n" + b"1" * size + b"\r\n--x--\r\n"
+    )
+
+
+def _send_chunked(asgi_app, body: bytes):
+    """POST ``body`` without a Content-Length, one chunk per message; returns (status, bytes the app read)."""
+    messages = []
+    read = 0
+
+    async def receive():
+        nonlocal read
+        chunk = body[read:read + CHUNK]
+        read += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": read < len(body)}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/upload", "raw_path": b"/upload", "query_string": b"",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=x")],
+        "http_version": "1.1", "scheme": "http", "server": ("test", 80), "client": ("test", 1), "root_path": "",
+    }
+    asyncio.run(asgi_app(scope, receive, send))
+    return next(m["status"] for m in messages if m["type"] == "http.response.start"), read
+
+
+def test_streamed_upload_is_cut_off_at_the_limit():
+    limit = 256 * 1024
+    status, read = _send_chunked(_echo_app(limit), _multipart(4 * 1024 * 1024))
+
+    assert status == 413
+    assert read <= limit + MULTIPART_OVERHEAD_BYTES + CHUNK
+
+
+def test_upload_within_the_limit_passes():
+    status, _ = _send_chunked(_echo_app(256 * 1024), _multipart(128 * 1024))
+
+    assert status == 200
+
+
+def test_declared_oversized_upload_is_rejected_unread(monkeypatch):
+    monkeypatch.setattr(settings, "max_upload_bytes", 1024)
+    monkeypatch.setattr(settings, "max_streaming_upload_bytes", 1024)
+
+    async def spool(*args, **kwargs):
+        raise AssertionError("the upload reached the route")
+
+    monkeypatch.setattr(analyze, "_spool_to_tempfile", spool)
+    response = TestClient(app).post(
+        "/v1/analyze/upload", files={"file": ("a.csv", b"a\n" + b"1\n" * (MULTIPART_OVERHEAD_BYTES + 1024), "text/csv")}
+    )
+
+    assert response.status_code == 413
+    assert response.json() == {"detail": "File too large. Max 1024 bytes."}
+
+
+def test_batch_uploads_use_the_batch_limit(monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_bytes", 10)
+
+    assert analyze.max_request_upload_bytes("/v1/analyze/batch") == 10
+    assert analyze.max_request_upload_bytes("/v1/analyze/upload") == max(
+        settings.max_upload_bytes, settings.max_streaming_upload_bytes
+    )
+
+
+def test_empty_upload_is_a_parse_error():
+    client = TestClient(app)
+    for params in ({"mode": "exact"}, {"streaming": "true"}):
+        response = client.post("/v1/analyze/upload", params=params, files={"file": ("a.csv", b"", "text/csv")})
+
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Could not parse file: No columns to parse from file"}
+
+
+def test_spooled_chunks_are_written_off_the_event_loop(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "upload_chunk_bytes", CHUNK)
+    offloaded = []
+
+    async def run_in_threadpool(fn, *args):
+        offloaded.append(len(args[0]))
+        return fn(*args)
+
+    monkeypatch.setattr(analyze, "run_in_threadpool", run_in_threadpool)
+    body = b"1" * (CHUNK * 2 + 10)
+    upload = UploadFile(io.BytesIO(body), filename="a.csv")
+    hasher = hashlib.sha256()
+
+    path = asyncio.run(analyze._spool_to_tempfile(upload, ".csv", hasher, len(body), str(tmp_path)))
+
+    assert offloaded == [CHUNK, CHUNK, 10]
+    assert open(path, "rb").read() == body and hasher.hexdigest() == hashlib.sha256(body).hexdigest()
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.worker_pool import AnalysisWorkerPool, WorkerPoolSaturated
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_job_finishes():
+    pool = AnalysisWorkerPool(max_workers=1, max_in_flight=1)
+    started, release = threading.Event(), threading.Event()
+
+    def job():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run(job))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The worker is still busy, so the pool is still full
+        assert pool.stats()["in_flight"] == 1
+        with pytest.raises(WorkerPoolSaturated):
+            await pool.run(job)
+
+    try:
+        asyncio.run(scenario())
+        release.set()
+        _wait_for(lambda: pool.stats()["in_flight"] == 0)
+        assert pool.stats()["completed"] == 1
+        assert pool.stats()["rejected"] == 1
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_slots_are_released_after_success_and_failure():
+    pool = AnalysisWorkerPool(max_workers=2, max_in_flight=2)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        assert await pool.run(sum, [1, 2, 3]) == 6
+        with pytest.raises(RuntimeError):
+            await pool.run(fail)
+
+    try:
+        asyncio.run(scenario())
+        _wait_for(lambda: pool.stats()["in_flight"] == 0)
+        assert pool.stats()["completed"] == 2
+    finally:
+        pool.shutdown()